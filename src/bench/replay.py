@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+"""
+Provisioning benchmark, replaying AWS API calls recorded by a real run.
+
+Record once against AWS, then replay without network as often as needed:
+
+    SPACEL_CACHE_DIR=$(mktemp -d) spacel provision --orbit ... --app ... \\
+        --api-record deploy.json
+    python bench/replay.py --fixture deploy.json --orbit ... --app ... \\
+        --lambda-bucket ... --lambda-region ... --latency 0.05
+
+The fixture must come from a run with the same orbit, app and buckets.
+Each sample starts with empty local caches, so the recording must too:
+calls skipped by warm caches (fingerprints, uploads, availability zones,
+orbit outputs, certificates) aren't recorded, and replay would stop with
+MissingResponseError. The spacel agent AMI is not looked up.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from functools import partial
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SRC_DIR)
+
+import spacel.cli.provision  # noqa
+import spacel.provision.cloudformation  # noqa
+from spacel.aws import ApiProfiler, ApiReplayer, ClientCache  # noqa
+from spacel.cli.helper import ClickHelper  # noqa
+from spacel.cli.provision import _provision  # noqa
+from spacel.provision import UploadIndex  # noqa
+from spacel.provision.polling import PollingScheduler  # noqa
+
+AMI = 'ami-123456'
+
+
+class StubAmiFinder(object):
+    """
+    Finds the same AMI everywhere, without fetching a manifest.
+    """
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def spacel_ami(self, region):
+        return AMI
+
+
+def latencies(values):
+    parsed = {}
+    for value in values:
+        operation, seconds = value.split('=', 1)
+        parsed[operation] = float(seconds)
+    return parsed
+
+
+def run(args, app):
+    replayer = ApiReplayer.load(args.fixture, latency=args.latency,
+                                latencies=latencies(args.operation_latency))
+    profiler = ApiProfiler()
+    # Replayer first: the profiler is registered in front of it.
+    clients = ClientCache(hooks=(replayer, profiler))
+    poller = partial(PollingScheduler, initial=args.poll, maximum=args.poll,
+                     jitter=0)
+
+    cache_dir = tempfile.mkdtemp()
+    saved_env = os.environ.get('SPACEL_CACHE_DIR')
+    saved_ami_finder = spacel.cli.provision.AmiFinder
+    saved_poller = spacel.provision.cloudformation.PollingScheduler
+    os.environ['SPACEL_CACHE_DIR'] = cache_dir
+    spacel.cli.provision.AmiFinder = StubAmiFinder
+    spacel.provision.cloudformation.PollingScheduler = poller
+    start = time.time()
+    try:
+        result = _provision(clients, UploadIndex(), None, app,
+                            args.lambda_bucket, args.lambda_region,
+                            args.template_bucket, args.template_region,
+                            None, None, 'stable', False, False, False, False)
+    finally:
+        elapsed = time.time() - start
+        spacel.provision.cloudformation.PollingScheduler = saved_poller
+        spacel.cli.provision.AmiFinder = saved_ami_finder
+        if saved_env is None:
+            del os.environ['SPACEL_CACHE_DIR']
+        else:
+            os.environ['SPACEL_CACHE_DIR'] = saved_env
+        shutil.rmtree(cache_dir)
+    return elapsed, result, profiler
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip(),
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixture', required=True,
+                        help='Calls recorded with --api-record.')
+    parser.add_argument('--orbit', required=True, help='Orbit name/path.')
+    parser.add_argument('--app', required=True, help='App name/path.')
+    parser.add_argument('--region', action='append', default=[],
+                        help='Regions, as recorded.')
+    parser.add_argument('--lambda-bucket')
+    parser.add_argument('--lambda-region')
+    parser.add_argument('--template-bucket')
+    parser.add_argument('--template-region')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Simulated latency of every call, in seconds.')
+    parser.add_argument('--operation-latency', action='append', default=[],
+                        metavar='OPERATION=SECONDS',
+                        help='Simulated latency of an operation.')
+    parser.add_argument('--poll', type=float, default=0.01,
+                        help='Stack polling interval, in seconds.')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Samples.')
+    args = parser.parse_args()
+
+    helper = ClickHelper()
+    helper.setup_logging('WARNING')
+    orbit = helper.orbit(args.orbit, args.region)
+    app = helper.app(orbit, args.app)
+
+    samples = []
+    for _ in range(args.repeat):
+        elapsed, result, profiler = run(args, app)
+        summary = profiler.summary()
+        samples.append(elapsed)
+        print('%.2fs (exit %s): %s API calls, %.2fs in calls' % (
+            elapsed, result, sum(call['calls'] for call in summary['calls']),
+            summary['seconds']))
+
+    samples.sort()
+    print('min %.2fs, median %.2fs, max %.2fs' % (
+        samples[0], samples[len(samples) // 2], samples[-1]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+"""
+CLI startup benchmark.
+
+Every measurement runs in a fresh interpreter, so nothing is already
+imported. Results can be saved and compared between revisions:
+
+    python bench/startup.py --json before.json
+    python bench/startup.py --compare before.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = (
+    'spacel.main',
+    'spacel.cli',
+    'spacel.cli.secret',
+    'spacel.cli.provision',
+    'spacel.security',
+    'spacel.provision',
+    'boto3',
+)
+
+COMMANDS = (
+    ('spacel --help', ['-m', 'spacel.main', '--help']),
+    ('spacel secret --help', ['-m', 'spacel.main', 'secret', '--help']),
+    ('spacel provision --help', ['-m', 'spacel.main', 'provision', '--help']),
+)
+
+IMPORT_SCRIPT = '''
+import time
+start = time.time()
+import %s
+print(time.time() - start)
+'''
+
+
+def run_python(args):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = SRC_DIR
+    env['PYTHONDONTWRITEBYTECODE'] = ''
+    start = time.time()
+    output = subprocess.check_output([sys.executable] + args, env=env,
+                                     cwd=SRC_DIR)
+    return time.time() - start, output
+
+
+def time_import(module):
+    _, output = run_python(['-c', IMPORT_SCRIPT % module])
+    return float(output.decode('utf-8').strip())
+
+
+def time_command(args):
+    elapsed, _ = run_python(args)
+    return elapsed
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        'min': samples[0],
+        'median': samples[len(samples) // 2],
+        'max': samples[-1]
+    }
+
+
+def benchmark(repeat):
+    # Warm up bytecode caches, so the first sample isn't an outlier:
+    time_command(COMMANDS[-1][1])
+
+    results = {}
+    for module in MODULES:
+        results['import %s' % module] = summarize(
+            [time_import(module) for _ in range(repeat)])
+    for label, args in COMMANDS:
+        results[label] = summarize([time_command(args) for _ in range(repeat)])
+    return results
+
+
+def report(results, baseline=None):
+    width = max(len(label) for label in results)
+    header = '%-*s %10s %10s' % (width, 'benchmark', 'min(ms)', 'median(ms)')
+    if baseline:
+        header += ' %10s' % 'delta(ms)'
+    print(header)
+    for label in sorted(results):
+        stats = results[label]
+        line = '%-*s %10.1f %10.1f' % (width, label, stats['min'] * 1000,
+                                       stats['median'] * 1000)
+        before = (baseline or {}).get(label)
+        if before:
+            line += ' %+10.1f' % ((stats['median'] - before['median']) * 1000)
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Samples per benchmark.')
+    parser.add_argument('--json', help='Save results to this file.')
+    parser.add_argument('--compare', help='Compare to results in this file.')
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as compare_in:
+            baseline = json.load(compare_in)['results']
+
+    results = benchmark(args.repeat)
+    report(results, baseline)
+
+    if args.json:
+        with open(args.json, 'w') as json_out:
+            json.dump({
+                'python': sys.version.split()[0],
+                'time': time.time(),
+                'results': results
+            }, json_out, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+"""
+Template render benchmark: time and allocations per render.
+
+    python bench/templates.py --repeat 200
+"""
+
+import argparse
+import os
+import sys
+import time
+from copy import deepcopy
+
+from mock import MagicMock
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SRC_DIR)
+
+from spacel.aws import AmiFinder  # noqa
+from spacel.model import Orbit, SpaceApp, SpaceServicePort  # noqa
+from spacel.provision.app.alarm import AlarmFactory  # noqa
+from spacel.provision.app.app_spot import AppSpotTemplateDecorator  # noqa
+from spacel.provision.app.cloudwatch_logs import CloudWatchLogsDecorator  # noqa
+from spacel.provision.app.db import CacheFactory, RdsFactory  # noqa
+from spacel.provision.app.ingress_resource import IngressResourceFactory  # noqa
+from spacel.provision.template import (AppTemplate, BastionTemplate,
+                                       VpcTemplate)  # noqa
+from spacel.security import AcmCertificates, KmsKeyFactory  # noqa
+
+try:
+    import tracemalloc
+except ImportError:  # pragma: no cover
+    tracemalloc = None
+
+REGION = 'us-west-2'
+AZS = ['us-west-2a', 'us-west-2b', 'us-west-2c']
+
+
+def fixtures():
+    orbit = Orbit('bench-orbit', [REGION], domain='bench.com')
+    orbit_region = orbit.regions[REGION]
+    orbit_region.az_keys = AZS
+    orbit_region.bastion_sg = 'sg-123456'
+    for index, orbit_az in enumerate(orbit_region.azs.values()):
+        subnet = 'subnet-%06d' % index
+        orbit_az.private_elb_subnet = subnet
+        orbit_az.private_instance_subnet = subnet
+        orbit_az.public_elb_subnet = subnet
+        orbit_az.public_instance_subnet = subnet
+
+    app = SpaceApp(orbit, 'bench-app')
+    app_region = app.regions[REGION]
+    app_region.public_ports[80] = SpaceServicePort(80)
+    return orbit_region, app_region
+
+
+def templates():
+    ami_finder = MagicMock(spec=AmiFinder)
+    ami_finder.spacel_ami.return_value = 'ami-123456'
+    kms_key = MagicMock(spec=KmsKeyFactory)
+    kms_key.get_key.return_value = None
+    app = AppTemplate(ami_finder, MagicMock(spec=AlarmFactory),
+                      MagicMock(spec=CacheFactory), MagicMock(spec=RdsFactory),
+                      MagicMock(spec=AppSpotTemplateDecorator),
+                      MagicMock(spec=AcmCertificates), kms_key,
+                      MagicMock(spec=CloudWatchLogsDecorator),
+                      MagicMock(spec=IngressResourceFactory))
+    return app, VpcTemplate(), BastionTemplate(ami_finder)
+
+
+def measure(func, repeat):
+    func()  # Warm caches.
+    start = time.time()
+    for _ in range(repeat):
+        func()
+    elapsed = (time.time() - start) / repeat
+
+    allocated = None
+    if tracemalloc:
+        tracemalloc.start()
+        func()
+        _, allocated = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return elapsed, allocated
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--repeat', type=int, default=100,
+                        help='Renders per benchmark.')
+    args = parser.parse_args()
+
+    orbit_region, app_region = fixtures()
+    app, vpc, bastion = templates()
+    parsed = app.get('elb-service')
+
+    benchmarks = (
+        ('get elb-service', lambda: app.get('elb-service')),
+        ('deepcopy elb-service (old get)', lambda: deepcopy(parsed)),
+        ('AppTemplate.app', lambda: app.app(app_region)),
+        ('VpcTemplate.vpc', lambda: vpc.vpc(orbit_region)),
+        ('BastionTemplate.bastion', lambda: bastion.bastion(orbit_region)),
+    )
+
+    width = max(len(label) for label, _ in benchmarks)
+    print('%-*s %10s %12s' % (width, 'benchmark', 'time(us)', 'peak(KiB)'))
+    for label, func in benchmarks:
+        elapsed, allocated = measure(func, args.repeat)
+        if allocated is None:
+            peak = '%12s' % 'n/a'
+        else:
+            peak = '%12.1f' % (allocated / 1024.0)
+        print('%-*s %10.1f %s' % (width, label, elapsed * 1e6, peak))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,2 +1,6 @@
 from .ami import AmiFinder
+from .azs import AvailabilityZones
 from .clients import ClientCache
+from .limiter import RateLimiter
+from .profiler import ApiProfiler
+from .replay import ApiRecorder, ApiReplayer
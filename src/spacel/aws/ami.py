@@ -1,19 +1,46 @@
 import json
 import logging
+import threading
 import time
 
-from six.moves.urllib.request import urlopen
+from six.moves.urllib.error import HTTPError
+from six.moves.urllib.request import Request, urlopen
+
+from spacel.cache import DiskCache
 
 SPACEL_URL = 'https://ami.pbl.io/spacel/%s.json'
 
+# Manifests change on release, revalidate after:
+DEFAULT_TTL = 60 * 60
+DEFAULT_TIMEOUT = 10
+
 logger = logging.getLogger('spacel.aws.ami')
 
 
 class AmiFinder(object):
-    def __init__(self, channel=None, cache_bust=None):
+    """
+    Finds AMIs from a published manifest, cached in memory and on disk.
+
+    A cached manifest is revalidated (ETag/Last-Modified) once it is older
+    than `ttl`; if the manifest can't be fetched, a stale copy is used.
+    """
+
+    def __init__(self, channel=None, cache_bust=None, cache=None,
+                 ttl=DEFAULT_TTL, timeout=DEFAULT_TIMEOUT):
+        """
+        :param channel: Release channel.
+        :param cache_bust: Fetch manifests once per run, bypassing caches.
+        :param cache: DiskCache (defaults to `ami`).
+        :param ttl: Age of a cached manifest before revalidating, in seconds.
+        :param timeout: Fetch timeout, in seconds.
+        """
         self._channel = channel or 'stable'
         self.cache_bust = cache_bust
-        self._cache = {}
+        self._cache = cache or DiskCache('ami')
+        self._ttl = ttl
+        self._timeout = timeout
+        self._manifests = {}
+        self._lock = threading.Lock()
 
     def spacel_ami(self, region):
         ami = self._ami(SPACEL_URL, region)
@@ -22,15 +49,62 @@ class AmiFinder(object):
 
     def _ami(self, url, region):
         url %= self._channel
-        if not self.cache_bust:
-            manifest = self._cache.get(url)
-            if manifest:
-                return manifest.get(region)
-            logger.debug('AMI manifest %s not cached, fetching...', url)
+        return self._manifest(url).get(region)
+
+    def _manifest(self, url):
+        # Concurrent lookups wait for a single fetch:
+        with self._lock:
+            manifest = self._manifests.get(url)
+            if manifest is None:
+                manifest = self._load(url)
+                self._manifests[url] = manifest
+            return manifest
+
+    def _load(self, url):
+        cached = self._cache.get(url)
+        if cached and not self.cache_bust:
+            if time.time() - cached['time'] < self._ttl:
+                return cached['manifest']
+            logger.debug('AMI manifest %s expired, revalidating...', url)
         else:
-            url += '?cache=%s' % time.time()
-        opened = urlopen(url)
-        manifest = json.loads(opened.read().decode('utf-8'))
-        if not self.cache_bust:
-            self._cache[url] = manifest
-        return manifest.get(region)
+            logger.debug('Fetching AMI manifest %s...', url)
+
+        try:
+            if self.cache_bust:
+                fetched = self._fetch('%s?cache=%s' % (url, time.time()))
+            else:
+                fetched = self._fetch(url, cached)
+        except (IOError, ValueError) as e:
+            if not cached:
+                raise
+            logger.warning('Unable to fetch AMI manifest %s, using cached: '
+                           '%s', url, e)
+            return cached['manifest']
+
+        fetched['time'] = time.time()
+        self._cache.set(url, fetched)
+        return fetched['manifest']
+
+    def _fetch(self, url, cached=None):
+        headers = {}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        try:
+            opened = urlopen(Request(url, headers=headers),
+                             timeout=self._timeout)
+        except HTTPError as e:
+            if cached and e.code == 304:
+                logger.debug('AMI manifest %s not modified.', url)
+                return dict(cached)
+            raise
+
+        info = opened.info()
+        return {
+            'manifest': json.loads(opened.read().decode('utf-8')),
+            'etag': info.get('ETag'),
+            'last_modified': info.get('Last-Modified')
+        }
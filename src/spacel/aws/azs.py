@@ -0,0 +1,62 @@
+import logging
+import threading
+
+from spacel.cache import DiskCache
+
+logger = logging.getLogger('spacel.aws.azs')
+
+# AZs rarely change, but new ones do launch:
+DEFAULT_TTL = 7 * 24 * 60 * 60
+
+
+class AvailabilityZones(object):
+    """
+    Resolves the availability zones of a region, caching results in memory
+    and on disk.
+    """
+
+    def __init__(self, clients, cache=None, ttl=DEFAULT_TTL, refresh=False):
+        """
+        :param clients: ClientCache.
+        :param cache: DiskCache (defaults to `azs`).
+        :param ttl: Maximum age of cached AZs, in seconds.
+        :param refresh: Ignore cached AZs, query every region once.
+        """
+        self._clients = clients
+        self._cache = cache or DiskCache('azs', ttl=ttl)
+        self._refresh = refresh
+        self._azs = {}
+        self._lock = threading.Lock()
+
+    def azs(self, region):
+        """
+        Get availability zones of a region.
+        :param region: AWS region.
+        :return: Sorted AZ names.
+        """
+        with self._lock:
+            azs = self._azs.get(region)
+            if azs is not None:
+                return azs
+
+            key = self._key(region)
+            if not self._refresh:
+                azs = self._cache.get(key)
+            if azs is None:
+                azs = self._describe(region)
+                self._cache.set(key, azs)
+            self._azs[region] = azs
+            return azs
+
+    def _describe(self, region):
+        logger.debug('Querying availability zones in %s...', region)
+        ec2 = self._clients.ec2(region)
+        response = ec2.describe_availability_zones(Filters=[
+            {'Name': 'state', 'Values': ['available']},
+            {'Name': 'zone-type', 'Values': ['availability-zone']}
+        ])
+        return sorted(az['ZoneName'] for az in response['AvailabilityZones'])
+
+    def _key(self, region):
+        # AZ names and availability vary between accounts:
+        return '%s:%s' % (self._clients.account(region), region)
@@ -1,18 +1,55 @@
 from collections import defaultdict
 import logging
+import threading
 
 import boto3
+from botocore.config import Config
 
 logger = logging.getLogger('spacel.aws.clients')
 
+# Connections kept open per client; regions and apps share clients:
+MAX_POOL_CONNECTIONS = 50
+MAX_ATTEMPTS = 10
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 60
+
 
 class ClientCache(object):
     """
     Lazy instantiation container for AWS clients.
+
+    Clients share one session, and are safe to use across threads.
     """
 
-    def __init__(self):
+    def __init__(self, session=None,
+                 max_pool_connections=MAX_POOL_CONNECTIONS,
+                 retry_mode='adaptive',
+                 max_attempts=MAX_ATTEMPTS,
+                 connect_timeout=CONNECT_TIMEOUT,
+                 read_timeout=READ_TIMEOUT,
+                 hooks=()):
+        """
+        :param session: boto3 Session (defaults to a new session).
+        :param max_pool_connections: Connection pool size of each client.
+        :param retry_mode: botocore retry mode (`adaptive`, `standard`).
+        :param max_attempts: Maximum attempts of each request.
+        :param connect_timeout: Connect timeout, in seconds.
+        :param read_timeout: Read timeout, in seconds.
+        :param hooks: Installed into each new client, i.e. `RateLimiter`.
+        """
+        self._session = session or boto3.Session()
+        self._config = Config(max_pool_connections=max_pool_connections,
+                              connect_timeout=connect_timeout,
+                              read_timeout=read_timeout,
+                              retries={
+                                  'mode': retry_mode,
+                                  'max_attempts': max_attempts
+                              })
+        self._hooks = hooks
         self._clients = defaultdict(dict)
+        self._lock = threading.Lock()
+        self._account = None
+        self._account_lock = threading.Lock()
 
     def ec2(self, region):
         """
@@ -30,13 +67,16 @@ class ClientCache(object):
         """
         return self._client('cloudformation', region)
 
-    def s3(self, region):
+    def s3(self, region, resource=True):
         """
         Get S3 client.
         :param region:  AWS region.
+        :param resource: Get a resource instead of a plain client.
         :return: S3 Client.
         """
-        return self._resource('s3', region)
+        if resource:
+            return self._resource('s3', region)
+        return self._client('s3', region)
 
     def kms(self, region):
         """
@@ -62,6 +102,26 @@ class ClientCache(object):
         """
         return self._client('acm', region)
 
+    def sts(self, region):
+        """
+        Get STS client.
+        :param region:  AWS region.
+        :return: STS Client.
+        """
+        return self._client('sts', region)
+
+    def account(self, region):
+        """
+        Get the account id of the session's credentials, looked up once.
+        :param region: AWS region, for the first lookup.
+        :return: AWS account id.
+        """
+        with self._account_lock:
+            if not self._account:
+                sts = self.sts(region)
+                self._account = sts.get_caller_identity()['Account']
+            return self._account
+
     def logs(self, region):
         """
         Get AWS CloudWatch Logs client.
@@ -71,21 +131,34 @@ class ClientCache(object):
         return self._client('logs', region)
 
     def _client(self, client_type, region):
-        client_cache = self._clients[client_type]
-        cached = client_cache.get(region)
-        if cached:
-            return cached
-        logger.debug('Connecting to %s in %s.', client_type, region)
-        client = boto3.client(client_type, region)
-        client_cache[region] = client
-        return client
+        return self._cached(client_type, region, resource=False)
 
     def _resource(self, client_type, region):
-        client_cache = self._clients[client_type]
+        return self._cached(client_type, region, resource=True)
+
+    def _cached(self, client_type, region, resource):
+        client_cache = self._clients[(client_type, resource)]
         cached = client_cache.get(region)
         if cached:
             return cached
-        logger.debug('Connecting to %s in %s.', client_type, region)
-        client = boto3.resource(client_type, region)
-        client_cache[region] = client
-        return client
+        # Sessions aren't thread-safe, and regions are provisioned
+        # concurrently: only connect once.
+        with self._lock:
+            cached = client_cache.get(region)
+            if cached:
+                return cached
+            logger.debug('Connecting to %s in %s.', client_type, region)
+            if resource:
+                client = self._session.resource(client_type, region,
+                                                config=self._config)
+                self._install(client.meta.client, client_type, region)
+            else:
+                client = self._session.client(client_type, region,
+                                              config=self._config)
+                self._install(client, client_type, region)
+            client_cache[region] = client
+            return client
+
+    def _install(self, client, client_type, region):
+        for hook in self._hooks:
+            hook.install(client, client_type, region)
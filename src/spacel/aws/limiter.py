@@ -0,0 +1,151 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+
+logger = logging.getLogger('spacel.aws.limiter')
+
+# Error codes returned when AWS wants us to slow down:
+THROTTLE_CODES = ('Throttling', 'ThrottlingException', 'RequestLimitExceeded')
+
+# Requests per second, per service and region:
+DEFAULT_RATE = 8.0
+
+
+class TokenBucket(object):
+    """
+    Token bucket: allows bursts, enforces an average rate.
+
+    Tokens are reserved before sleeping, so concurrent callers queue up
+    instead of waking up together.
+    """
+
+    def __init__(self, rate, burst, clock=time.time, sleep=time.sleep):
+        """
+        :param rate: Tokens added per second.
+        :param burst: Maximum tokens.
+        :param clock: Time source.
+        :param sleep: Sleep function.
+        """
+        self._rate = float(rate)
+        self._burst = float(burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self._burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Take a token, waiting if the bucket is empty.
+        :return: Seconds waited.
+        """
+        with self._lock:
+            now = self._clock()
+            elapsed = max(0.0, now - self._updated)
+            self._tokens = min(self._burst,
+                               self._tokens + elapsed * self._rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self._rate if self._tokens < 0 else 0.0
+        if wait:
+            self._sleep(wait)
+        return wait
+
+
+class RateLimiter(object):
+    """
+    Limits AWS API requests per service and region, across threads.
+
+    Installed into clients by `ClientCache`: every request attempt (retries
+    included) takes a token, throttled responses are counted.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=None, clock=time.time,
+                 sleep=time.sleep):
+        """
+        :param rate: Requests per second, per service and region (0 to only
+         count requests).
+        :param burst: Requests allowed at once (defaults to `2 * rate`).
+        :param clock: Time source.
+        :param sleep: Sleep function.
+        """
+        self._rate = rate
+        self._burst = burst or max(1.0, 2 * rate)
+        self._clock = clock
+        self._sleep = sleep
+        self._buckets = {}
+        self._stats = defaultdict(lambda: {
+            'requests': 0,
+            'throttles': 0,
+            'waited': 0.0
+        })
+        self._lock = threading.Lock()
+
+    def install(self, client, service, region):
+        """
+        Hook a client's requests.
+        :param client: botocore client.
+        :param service: Service name.
+        :param region: AWS region.
+        """
+        key = (service, region)
+        events = client.meta.events
+        events.register('before-send', self._before_send(key))
+        events.register('needs-retry', self._needs_retry(key))
+
+    def stats(self):
+        """
+        Get request statistics.
+        :return: {(service, region): {requests, throttles, waited}}
+        """
+        with self._lock:
+            return {key: dict(stats) for key, stats in self._stats.items()}
+
+    def log_stats(self):
+        """
+        Log request statistics, for tuning the rate.
+        """
+        for (service, region), stats in sorted(self.stats().items()):
+            level = logging.INFO if stats['throttles'] else logging.DEBUG
+            logger.log(level,
+                       '%s in %s: %s requests, %s throttled, waited %.1fs.',
+                       service, region, stats['requests'], stats['throttles'],
+                       stats['waited'])
+
+    def _bucket(self, key):
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if not bucket:
+                bucket = TokenBucket(self._rate, self._burst,
+                                     clock=self._clock, sleep=self._sleep)
+                self._buckets[key] = bucket
+            return bucket
+
+    def _before_send(self, key):
+        def before_send(**_):
+            waited = 0.0
+            if self._rate > 0:
+                waited = self._bucket(key).acquire()
+            with self._lock:
+                stats = self._stats[key]
+                stats['requests'] += 1
+                stats['waited'] += waited
+            # Never short-circuit the request:
+            return None
+
+        return before_send
+
+    def _needs_retry(self, key):
+        def needs_retry(response=None, **_):
+            if response is None:
+                return None
+            parsed = response[1] or {}
+            error_code = parsed.get('Error', {}).get('Code')
+            if error_code in THROTTLE_CODES:
+                with self._lock:
+                    self._stats[key]['throttles'] += 1
+            # Retry decisions are left to botocore:
+            return None
+
+        return needs_retry
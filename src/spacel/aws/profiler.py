@@ -0,0 +1,198 @@
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from spacel.aws.limiter import THROTTLE_CODES
+
+logger = logging.getLogger('spacel.aws.profiler')
+
+# Upper bounds of latency buckets, in seconds:
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+
+# Request context key, set by `before-call`:
+CONTEXT_KEY = 'spacel_profiler'
+
+
+class ApiProfiler(object):
+    """
+    Counts AWS API calls and their latency, per service, operation and
+    region.
+
+    Installed into clients by `ClientCache`: a call is timed from
+    `before-call` to `after-call`, retries and backoff included.
+    """
+
+    def __init__(self, clock=time.time):
+        """
+        :param clock: Time source.
+        """
+        self._clock = clock
+        self._start = clock()
+        self._stats = defaultdict(lambda: {
+            'calls': 0,
+            'errors': 0,
+            'retries': 0,
+            'throttles': 0,
+            'seconds': 0.0,
+            'max': 0.0,
+            'histogram': [0] * len(BUCKETS)
+        })
+        self._lock = threading.Lock()
+
+    def install(self, client, service, region):
+        """
+        Hook a client's calls.
+        :param client: botocore client.
+        :param service: Service name.
+        :param region: AWS region.
+        """
+        events = client.meta.events
+        # Before anything that short-circuits the call (i.e. Stubber):
+        events.register_first('before-call.*.*', self._before_call)
+        events.register('after-call', self._after_call(service, region))
+        events.register('after-call-error',
+                        self._after_call_error(service, region))
+        events.register('needs-retry', self._needs_retry(service, region))
+
+    def stats(self):
+        """
+        Get call statistics.
+        :return: {(service, operation, region): {calls, errors, retries,
+         throttles, seconds, max, histogram}}
+        """
+        with self._lock:
+            return {key: dict(stats, histogram=list(stats['histogram']))
+                    for key, stats in self._stats.items()}
+
+    def summary(self):
+        """
+        Get call statistics as JSON, i.e. for trending.
+        :return: Dict with elapsed time, API time and calls.
+        """
+        calls = []
+        for (service, operation, region), stats in sorted(
+                self.stats().items()):
+            histogram = stats.pop('histogram')
+            stats.update({
+                'service': service,
+                'operation': operation,
+                'region': region,
+                'p50': self._percentile(histogram, 50, stats['max']),
+                'p90': self._percentile(histogram, 90, stats['max']),
+                'histogram': dict(('%g' % bound, count)
+                                  for bound, count in zip(BUCKETS, histogram)
+                                  if count)
+            })
+            calls.append(stats)
+        return {
+            'elapsed': self._clock() - self._start,
+            'seconds': sum(call['seconds'] for call in calls),
+            'calls': calls
+        }
+
+    def log_summary(self):
+        """
+        Log a table of calls, slowest operations first.
+        """
+        summary = self.summary()
+        calls = sorted(summary['calls'], key=lambda c: -c['seconds'])
+        if not calls:
+            return
+        lines = ['%-16s %-36s %-14s %6s %6s %6s %8s %6s %6s' % (
+            'service', 'operation', 'region', 'calls', 'retry', 'thrtl',
+            'total', 'p50', 'p90')]
+        for call in calls:
+            lines.append('%-16s %-36s %-14s %6d %6d %6d %7.1fs %6s %6s' % (
+                call['service'], call['operation'], call['region'],
+                call['calls'], call['retries'], call['throttles'],
+                call['seconds'], self._seconds(call['p50']),
+                self._seconds(call['p90'])))
+        logger.info('%s API calls, %.1fs in calls over %.1fs (calls in '
+                    'parallel add up):\n%s',
+                    sum(call['calls'] for call in calls), summary['seconds'],
+                    summary['elapsed'], '\n'.join(lines))
+
+    def write(self, path):
+        """
+        Write the summary as JSON.
+        :param path: Output path.
+        """
+        with open(path, 'w') as profile_out:
+            json.dump(self.summary(), profile_out, indent=2, sort_keys=True)
+
+    @staticmethod
+    def _percentile(histogram, p, maximum):
+        # Upper bound of the bucket holding the percentile:
+        total = sum(histogram)
+        if not total:
+            return None
+        rank = total * p / 100.0
+        seen = 0
+        for bound, count in zip(BUCKETS, histogram):
+            seen += count
+            if seen >= rank:
+                return min(bound, maximum)
+        return maximum  # pragma: no cover
+
+    @staticmethod
+    def _seconds(seconds):
+        if seconds is None:
+            return '-'
+        return '%.2fs' % seconds
+
+    def _before_call(self, model=None, context=None, **_):
+        if context is not None and model is not None:
+            context[CONTEXT_KEY] = (model.name, self._clock())
+
+    def _after_call(self, service, region):
+        def after_call(parsed=None, http_response=None, context=None, **_):
+            parsed = parsed or {}
+            metadata = parsed.get('ResponseMetadata', {})
+            error = http_response is not None and \
+                http_response.status_code >= 300
+            self._record(service, region, context,
+                         retries=metadata.get('RetryAttempts', 0),
+                         error=error)
+
+        return after_call
+
+    def _after_call_error(self, service, region):
+        def after_call_error(context=None, **_):
+            self._record(service, region, context, retries=0, error=True)
+
+        return after_call_error
+
+    def _needs_retry(self, service, region):
+        def needs_retry(response=None, operation=None, **_):
+            if response is None or operation is None:
+                return None
+            parsed = response[1] or {}
+            error_code = parsed.get('Error', {}).get('Code')
+            if error_code in THROTTLE_CODES:
+                with self._lock:
+                    key = (service, operation.name, region)
+                    self._stats[key]['throttles'] += 1
+            # Retry decisions are left to botocore:
+            return None
+
+        return needs_retry
+
+    def _record(self, service, region, context, retries, error):
+        started = (context or {}).pop(CONTEXT_KEY, None)
+        if not started:
+            return
+        operation, start = started
+        seconds = self._clock() - start
+        bucket = next(index for index, bound in enumerate(BUCKETS)
+                      if seconds <= bound)
+        with self._lock:
+            stats = self._stats[(service, operation, region)]
+            stats['calls'] += 1
+            stats['retries'] += retries
+            stats['seconds'] += seconds
+            stats['max'] = max(stats['max'], seconds)
+            stats['histogram'][bucket] += 1
+            if error:
+                stats['errors'] += 1
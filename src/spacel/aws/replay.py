@@ -0,0 +1,222 @@
+import base64
+import datetime
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+
+import six
+from botocore.awsrequest import AWSResponse
+from dateutil.tz import tzutc
+
+logger = logging.getLogger('spacel.aws.replay')
+
+# Request context key for the call's target, set by `before-parameter-build`:
+CONTEXT_KEY = 'spacel_replay'
+
+DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
+
+# Parameters that tell apart concurrent calls to the same operation:
+TARGET_PARAMS = ('StackName', 'Bucket', 'KeyId')
+
+
+class MissingResponseError(LookupError):
+    """
+    A replayed call has no recorded response.
+    """
+
+
+def _target(params):
+    for param in TARGET_PARAMS:
+        target = params.get(param)
+        if target:
+            return target
+    return None
+
+
+def _before_build(params=None, context=None, **_):
+    if context is not None and params is not None:
+        context[CONTEXT_KEY] = _target(params)
+
+
+def _encode(value):
+    if isinstance(value, dict):
+        return dict((k, _encode(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    if isinstance(value, datetime.datetime):
+        utc = value.tzinfo is not None
+        if utc:
+            value = value.astimezone(tzutc())
+        return {'__datetime__': value.strftime(DATETIME_FORMAT),
+                '__utc__': utc}
+    # Before strings: on Python 2, `str` is bytes.
+    if isinstance(value, six.binary_type) and \
+            not isinstance(value, six.text_type):
+        return {'__bytes__': base64.b64encode(value).decode('utf-8')}
+    if isinstance(value, six.string_types) or value is None or \
+            isinstance(value, (bool, int, float)):
+        return value
+    # Streams can only be read once, by the caller:
+    return None
+
+
+def _decode(value):
+    if isinstance(value, dict):
+        if '__datetime__' in value:
+            decoded = datetime.datetime.strptime(value['__datetime__'],
+                                                 DATETIME_FORMAT)
+            if value.get('__utc__'):
+                decoded = decoded.replace(tzinfo=tzutc())
+            return decoded
+        if '__bytes__' in value:
+            return base64.b64decode(value['__bytes__'])
+        return dict((k, _decode(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    return value
+
+
+class ApiRecorder(object):
+    """
+    Records AWS API calls and their responses, for `ApiReplayer`.
+
+    Installed into clients by `ClientCache`. Request parameters aren't
+    recorded, but responses are: treat recordings like credentials.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = []
+
+    def install(self, client, service, region):
+        """
+        Hook a client's calls.
+        :param client: botocore client.
+        :param service: Service name.
+        :param region: AWS region.
+        """
+        events = client.meta.events
+        events.register('before-parameter-build', _before_build)
+        events.register('after-call', self._after_call(service, region))
+
+    def calls(self):
+        """
+        Get recorded calls.
+        :return: List of calls, in order of completion.
+        """
+        with self._lock:
+            return list(self._calls)
+
+    def write(self, path):
+        """
+        Write recorded calls as JSON.
+        :param path: Fixture path.
+        """
+        calls = self.calls()
+        with open(path, 'w') as fixture_out:
+            json.dump({'calls': calls}, fixture_out, indent=1, sort_keys=True)
+        logger.info('Recorded %s API calls to %s.', len(calls), path)
+
+    def _after_call(self, service, region):
+        def after_call(http_response=None, parsed=None, model=None,
+                       context=None, **_):
+            if model is None or http_response is None:
+                return
+            response = dict(parsed or {})
+            response.pop('ResponseMetadata', None)
+            call = {
+                'service': service,
+                'region': region,
+                'operation': model.name,
+                'target': (context or {}).get(CONTEXT_KEY),
+                'status': http_response.status_code,
+                'response': _encode(response)
+            }
+            with self._lock:
+                self._calls.append(call)
+
+        return after_call
+
+
+class ApiReplayer(object):
+    """
+    Answers AWS API calls from calls recorded by `ApiRecorder`, without
+    touching the network.
+
+    Calls are answered in recorded order, per service, region, operation
+    and target (i.e. stack name). Once a sequence runs out, its last
+    response is repeated (i.e. a stack stays complete).
+    """
+
+    def __init__(self, calls, latency=0.0, latencies=None, sleep=time.sleep):
+        """
+        :param calls: Recorded calls.
+        :param latency: Simulated latency of each call, in seconds.
+        :param latencies: Simulated latency by operation (overrides latency).
+        :param sleep: Sleep function.
+        """
+        self._latency = latency
+        self._latencies = latencies or {}
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._responses = defaultdict(deque)
+        for call in calls:
+            key = (call['service'], call['region'], call['operation'],
+                   call.get('target'))
+            self._responses[key].append((call['status'], call['response']))
+
+    @staticmethod
+    def load(path, **kwargs):
+        """
+        Load calls written by `ApiRecorder.write`.
+        :param path: Fixture path.
+        :param kwargs: See `__init__`.
+        :return: ApiReplayer.
+        """
+        with open(path) as fixture_in:
+            return ApiReplayer(json.load(fixture_in)['calls'], **kwargs)
+
+    def install(self, client, service, region):
+        """
+        Answer a client's calls.
+        :param client: botocore client.
+        :param service: Service name.
+        :param region: AWS region.
+        """
+        events = client.meta.events
+        events.register('before-parameter-build', _before_build)
+        # Before anything else that could answer (or send) the call:
+        events.register_first('before-call.*.*',
+                              self._before_call(service, region))
+
+    def _before_call(self, service, region):
+        def before_call(model=None, context=None, **_):
+            operation = model.name
+            target = (context or {}).get(CONTEXT_KEY)
+            status, response = self._next((service, region, operation,
+                                           target))
+            latency = self._latencies.get(operation, self._latency)
+            if latency:
+                self._sleep(latency)
+
+            parsed = _decode(response)
+            parsed['ResponseMetadata'] = {
+                'HTTPStatusCode': status,
+                'RetryAttempts': 0
+            }
+            return AWSResponse(None, status, {}, None), parsed
+
+        return before_call
+
+    def _next(self, key):
+        with self._lock:
+            responses = self._responses.get(key)
+            if not responses:
+                raise MissingResponseError(
+                    'No recorded response for %s %s in %s (%s).'
+                    % (key[0], key[2], key[1], key[3]))
+            if len(responses) > 1:
+                return responses.popleft()
+            return responses[0]
@@ -0,0 +1,145 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger('spacel.cache')
+
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.spacel', 'cache')
+
+
+def cache_dir():
+    """
+    Get the directory for on-disk caches.
+    :return: Directory, from `SPACEL_CACHE_DIR` if set.
+    """
+    return os.environ.get('SPACEL_CACHE_DIR', CACHE_DIR)
+
+
+class KeyedLocks(object):
+    """
+    A lock per key, so work on one key doesn't wait on the others.
+    """
+
+    def __init__(self):
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Get the lock for a key.
+        :param key: Key.
+        :return: Lock, the same for every call with the same key.
+        """
+        with self._lock:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = threading.Lock()
+                self._locks[key] = lock
+            return lock
+
+
+class DiskCache(object):
+    """
+    JSON values persisted to a file, shared between runs.
+    """
+
+    def __init__(self, name, path=None, ttl=None):
+        """
+        :param name: Cache name (file name, without extension).
+        :param path: Cache directory (defaults to `cache_dir()`).
+        :param ttl: Default maximum age of entries, in seconds.
+        """
+        self._path = os.path.join(path or cache_dir(), '%s.json' % name)
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = None
+
+    def get(self, key, ttl=None):
+        """
+        Get a cached value.
+        :param key: Key.
+        :param ttl: Maximum age in seconds (overrides default).
+        :return: Value, None if missing or expired.
+        """
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._read()
+            entry = self._entries.get(key)
+        if not entry:
+            return None
+
+        ttl = ttl or self._ttl
+        if ttl and time.time() - entry['time'] > ttl:
+            logger.debug('Cached %s expired in %s.', key, self._path)
+            return None
+        return entry['value']
+
+    def set(self, key, value):
+        """
+        Cache a value.
+        :param key: Key.
+        :param value: JSON-serializable value.
+        """
+        self._update(key, {'value': value, 'time': time.time()})
+
+    def set_many(self, values):
+        """
+        Cache several values, writing once.
+        :param values: Dict of key to JSON-serializable value.
+        """
+        now = time.time()
+        self._update_many(dict((key, {'value': value, 'time': now})
+                               for key, value in values.items()))
+
+    def delete(self, key):
+        """
+        Remove a cached value.
+        :param key: Key.
+        """
+        self._update(key, None)
+
+    def clear(self):
+        """
+        Remove every cached value.
+        """
+        with self._lock:
+            self._entries = {}
+            self._write(self._entries)
+
+    def _update(self, key, entry):
+        self._update_many({key: entry})
+
+    def _update_many(self, updates):
+        with self._lock:
+            # Re-read: other processes may have updated other keys.
+            entries = self._read()
+            for key, entry in updates.items():
+                if entry:
+                    entries[key] = entry
+                else:
+                    entries.pop(key, None)
+            self._write(entries)
+            self._entries = entries
+
+    def _read(self):
+        try:
+            with open(self._path) as cache_in:
+                return json.load(cache_in)
+        except (IOError, OSError, ValueError):
+            return {}
+
+    def _write(self, entries):
+        cache_path = os.path.dirname(self._path)
+        try:
+            if not os.path.isdir(cache_path):
+                os.makedirs(cache_path)
+            # Write then rename, so readers never see a partial file:
+            fd, temp_path = tempfile.mkstemp(dir=cache_path)
+            with os.fdopen(fd, 'w') as cache_out:
+                json.dump(entries, cache_out, sort_keys=True)
+            os.rename(temp_path, self._path)
+        except (IOError, OSError) as e:
+            logger.warning('Unable to write cache %s: %s', self._path, e)
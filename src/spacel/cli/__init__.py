@@ -1,6 +1,37 @@
+import importlib
+
 import click
-from .provision import provision_cmd
-from .secret import secret_cmd
 
-commands = (provision_cmd, secret_cmd)
-cli = click.CommandCollection(sources=commands)
+# Subcommands are imported when invoked, not to slow down every other command:
+COMMANDS = {
+    'provision': ('spacel.cli.provision', 'provision_cmd',
+                  'Provision/upgrade resources for deployment.'),
+    'secret': ('spacel.cli.secret', 'secret_cmd', 'Encrypt secrets.')
+}
+
+
+class LazyCommands(click.Group):
+    """
+    Group of subcommands, imported on demand from `COMMANDS`.
+    """
+
+    def list_commands(self, ctx):
+        return sorted(COMMANDS)
+
+    def get_command(self, ctx, cmd_name):
+        command = COMMANDS.get(cmd_name)
+        if not command:
+            return None
+        module_name, group_name, _ = command
+        group = getattr(importlib.import_module(module_name), group_name)
+        return group.get_command(ctx, cmd_name)
+
+    def format_commands(self, ctx, formatter):
+        # Help text is listed without importing anything:
+        rows = [(cmd_name, COMMANDS[cmd_name][2])
+                for cmd_name in self.list_commands(ctx)]
+        with formatter.section('Commands'):
+            formatter.write_dl(rows)
+
+
+cli = LazyCommands()
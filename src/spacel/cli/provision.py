@@ -2,22 +2,28 @@ import logging
 
 import click
 
-from spacel.aws import AmiFinder, ClientCache
+from spacel.aws import (AmiFinder, ApiProfiler, ApiRecorder, ClientCache,
+                        RateLimiter)
+from spacel.aws.limiter import DEFAULT_RATE
+from spacel.cache import DiskCache
 from spacel.cli.helper import ClickHelper, LOG_LEVELS
 from spacel.model.aws import VALID_REGIONS
-from spacel.provision import (ChangeSetEstimator, LambdaUploader,
-                              TemplateUploader)
+from spacel.provision import (ChangeSetEstimator, DurationHistory,
+                              LambdaUploader, TemplateFingerprints,
+                              TemplateUploader, UploadIndex)
+from spacel.provision.trace import DeployTrace
 from spacel.provision.app import (AppSpotTemplateDecorator,
                                   CloudWatchLogsDecorator,
-                                  IngressResourceFactory)
+                                  IngressResourceFactory, StackResourceIndex)
 from spacel.provision.app import SpaceElevatorAppFactory
 from spacel.provision.app.alarm import AlarmFactory
 from spacel.provision.app.db import CacheFactory, RdsFactory
 from spacel.provision.orbit.provider import ProviderOrbitFactory
 from spacel.provision.template import (AppTemplate, BastionTemplate,
                                        TablesTemplate, VpcTemplate)
-from spacel.security import (AcmCertificates, KmsCrypto, KmsKeyFactory,
-                             PasswordManager)
+from spacel.security import (AcmCertificates, DataKeyCache, KmsCrypto,
+                             KmsKeyFactory, PasswordManager)
+from spacel.security.acm import DEFAULT_TTL as ACM_TTL
 
 logger = logging.getLogger('spacel')
 
@@ -61,18 +67,53 @@ def provision_cmd():  # pragma: no cover
 @click.option('--log-level', default='INFO', type=click.Choice(LOG_LEVELS),
               envvar='SPACEL_LOG_LEVEL', help='Log level')
 @click.option('--version', type=click.STRING, help='Version to deploy')
-@click.option('--force', is_flag=True, help='Force redeploy.')
+@click.option('--force', is_flag=True,
+              help='Force redeploy, even if templates are unchanged.')
+@click.option('--skip-orbit', is_flag=True, envvar='SPACEL_SKIP_ORBIT',
+              help='Use cached orbit outputs instead of provisioning the '
+                   'orbit, if they are still valid.')
+@click.option('--refresh-cache', is_flag=True, envvar='SPACEL_REFRESH_CACHE',
+              help='Refresh cached AWS lookups (availability zones,'
+                   ' certificates) and deploy stacks whose fingerprint is'
+                   ' unchanged.')
+@click.option('--api-rate', type=click.FLOAT, default=DEFAULT_RATE,
+              envvar='SPACEL_API_RATE',
+              help='AWS API requests per second, per service and region '
+                   '(0 to disable).')
+@click.option('--api-burst', type=click.FLOAT, envvar='SPACEL_API_BURST',
+              help='AWS API requests allowed at once, per service and region.')
+@click.option('--trace-out', type=click.Path(dir_okay=False),
+              envvar='SPACEL_TRACE_OUT',
+              help='Write a deploy timeline: Chrome trace JSON to this path,'
+                   ' CSV next to it.')
+@click.option('--api-profile', type=click.Path(dir_okay=False),
+              envvar='SPACEL_API_PROFILE',
+              help='Write AWS API call statistics to this path, as JSON.')
+@click.option('--api-record', type=click.Path(dir_okay=False),
+              envvar='SPACEL_API_RECORD',
+              help='Record AWS API responses to this path, for replaying in'
+                   ' benchmarks.')
+@click.option('--reuse-data-keys', is_flag=True,
+              envvar='SPACEL_REUSE_DATA_KEYS',
+              help='Encrypt several secrets with each KMS data key.')
 def provision_cli(orbit, app, region, lambda_bucket, lambda_region,
                   template_bucket, template_region, pagerduty_default,
                   pagerduty_api_key, spacel_agent_channel,
                   spacel_agent_cache_bust, log_level,
-                  version, force):  # pragma: no cover
+                  version, force, skip_orbit,
+                  refresh_cache, api_rate, api_burst,
+                  trace_out, api_profile, api_record,
+                  reuse_data_keys):  # pragma: no cover
     provision_services(orbit, app, region,
                        lambda_bucket, lambda_region,
                        template_bucket, template_region,
                        pagerduty_default, pagerduty_api_key,
                        spacel_agent_channel, spacel_agent_cache_bust,
-                       log_level, version, force)
+                       log_level, version, force, skip_orbit=skip_orbit,
+                       refresh_cache=refresh_cache, api_rate=api_rate,
+                       api_burst=api_burst, trace_out=trace_out,
+                       api_profile=api_profile, api_record=api_record,
+                       reuse_data_keys=reuse_data_keys)
 
 
 def provision_services(orbit_path, app_path, regions,
@@ -80,7 +121,10 @@ def provision_services(orbit_path, app_path, regions,
                        template_bucket, template_region,
                        pagerduty_default, pagerduty_api_key,
                        spacel_agent_channel, spacel_agent_cache_bust,
-                       log_level, version, force_redeploy):
+                       log_level, version, force_redeploy, skip_orbit=False,
+                       refresh_cache=False, api_rate=DEFAULT_RATE,
+                       api_burst=None, trace_out=None, api_profile=None,
+                       api_record=None, reuse_data_keys=False):
     helper = ClickHelper()
     helper.setup_logging(log_level)
 
@@ -97,7 +141,11 @@ def provision_services(orbit_path, app_path, regions,
     return provision(app, lambda_bucket, lambda_region, template_bucket,
                      template_region, pagerduty_default, pagerduty_api_key,
                      spacel_agent_channel, spacel_agent_cache_bust,
-                     force_redeploy)
+                     force_redeploy, skip_orbit=skip_orbit,
+                     refresh_cache=refresh_cache, api_rate=api_rate,
+                     api_burst=api_burst, trace_out=trace_out,
+                     api_profile=api_profile, api_record=api_record,
+                     reuse_data_keys=reuse_data_keys)
 
 
 def provision(app,
@@ -109,44 +157,102 @@ def provision(app,
               pagerduty_api_key=None,
               spacel_agent_channel=None,
               spacel_agent_cache_bust=False,
-              force_redeploy=False):  # pragma: no cover
-    clients = ClientCache()
+              force_redeploy=False,
+              skip_orbit=False,
+              refresh_cache=False,
+              api_rate=DEFAULT_RATE,
+              api_burst=None,
+              trace_out=None,
+              api_profile=None,
+              api_record=None,
+              reuse_data_keys=False):  # pragma: no cover
+    limiter = RateLimiter(api_rate, api_burst)
+    profiler = ApiProfiler()
+    hooks = (limiter, profiler)
+    recorder = None
+    if api_record:
+        recorder = ApiRecorder()
+        hooks += (recorder,)
+    clients = ClientCache(hooks=hooks)
+    uploads = UploadIndex()
+    trace = trace_out and DeployTrace() or None
+    data_keys = reuse_data_keys and DataKeyCache() or None
+    try:
+        return _provision(clients, uploads, trace, app, lambda_bucket,
+                          lambda_region, template_bucket, template_region,
+                          pagerduty_default, pagerduty_api_key,
+                          spacel_agent_channel, spacel_agent_cache_bust,
+                          force_redeploy, skip_orbit, refresh_cache,
+                          data_keys=data_keys)
+    finally:
+        limiter.log_stats()
+        uploads.log_stats()
+        profiler.log_summary()
+        if api_profile:
+            profiler.write(api_profile)
+        if recorder:
+            recorder.write(api_record)
+        if trace:
+            trace.write(trace_out)
+
+
+def _provision(clients, uploads, trace, app, lambda_bucket, lambda_region,
+               template_bucket, template_region, pagerduty_default,
+               pagerduty_api_key, spacel_agent_channel,
+               spacel_agent_cache_bust, force_redeploy, skip_orbit,
+               refresh_cache, data_keys=None):  # pragma: no cover
 
     # Lambda function storage
-    lambda_up = LambdaUploader(clients, lambda_region, lambda_bucket)
+    lambda_up = LambdaUploader(clients, lambda_region, lambda_bucket,
+                               index=uploads)
     # CloudFormation template storage
     template_bucket = template_bucket or lambda_bucket
     template_region = template_region or lambda_region
-    template_up = TemplateUploader(clients, template_region, template_bucket)
+    template_up = TemplateUploader(clients, template_region, template_bucket,
+                                   index=uploads)
     alarm_factory = AlarmFactory.get(pagerduty_default,
                                      pagerduty_api_key,
                                      lambda_up)
-    ingress_factory = IngressResourceFactory(clients)
+    stacks = StackResourceIndex(clients)
+    ingress_factory = IngressResourceFactory(clients, stacks=stacks)
     kms_key_factory = KmsKeyFactory(clients)
-    kms_crypto = KmsCrypto(clients, kms_key_factory)
+    kms_key_factory.prefetch(app.regions.values())
+    kms_crypto = KmsCrypto(clients, kms_key_factory, data_keys=data_keys)
     password_manager = PasswordManager(clients, kms_crypto)
     cache_factory = CacheFactory(ingress_factory)
-    rds_factory = RdsFactory(clients, ingress_factory, password_manager)
+    rds_factory = RdsFactory(clients, ingress_factory, password_manager,
+                             stacks=stacks)
     cw_logs = CloudWatchLogsDecorator()
     # Templates:
     ami_finder = AmiFinder(spacel_agent_channel,
                            cache_bust=spacel_agent_cache_bust)
     app_spot = AppSpotTemplateDecorator()
-    acm = AcmCertificates(clients)
+    acm = AcmCertificates(clients, cache=DiskCache('acm', ttl=ACM_TTL),
+                          refresh=refresh_cache)
     app_template = AppTemplate(ami_finder, alarm_factory, cache_factory,
                                rds_factory, app_spot, acm, kms_key_factory,
                                cw_logs, ingress_factory)
     bastion_template = BastionTemplate(ami_finder)
     tables_template = TablesTemplate()
     vpc_template = VpcTemplate()
-    change_sets = ChangeSetEstimator()
+    change_sets = ChangeSetEstimator(history=DurationHistory())
+    # Refreshing ignores fingerprints, without forcing a rolling redeploy:
+    fingerprints = TemplateFingerprints(clients,
+                                        force=force_redeploy or refresh_cache)
     orbit_factory = ProviderOrbitFactory.get(clients, change_sets, template_up,
                                              vpc_template,
                                              bastion_template,
-                                             tables_template)
-    orbit_factory.orbit(app.orbit)
+                                             tables_template,
+                                             fingerprints=fingerprints,
+                                             refresh_cache=refresh_cache,
+                                             trace=trace)
+    if not orbit_factory.orbit(app.orbit, cached=skip_orbit):
+        logger.error('Orbit %s could not be provisioned.', app.orbit.name)
+        return 1
     provisioner = SpaceElevatorAppFactory(clients, change_sets, template_up,
-                                          app_template)
+                                          app_template,
+                                          fingerprints=fingerprints,
+                                          trace=trace)
     if not provisioner.app(app, force_redeploy=force_redeploy):
         return 1
     return 0
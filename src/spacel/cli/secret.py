@@ -4,7 +4,7 @@ import sys
 import click
 from botocore.exceptions import ClientError
 
-from spacel.aws import ClientCache
+from spacel.aws import ApiProfiler, ClientCache
 from spacel.cli.helper import ClickHelper, LOG_LEVELS
 from spacel.model.aws import VALID_REGIONS
 from spacel.security import KmsCrypto, KmsKeyFactory
@@ -32,14 +32,17 @@ def secret_cmd():  # pragma: no cover
 @click.option('--value', type=click.STRING, help='Secret value')
 @click.option('--log-level', default='INFO', type=click.Choice(LOG_LEVELS),
               envvar='SPACEL_LOG_LEVEL', help='Log level')
+@click.option('--api-profile', type=click.Path(dir_okay=False),
+              envvar='SPACEL_API_PROFILE',
+              help='Write AWS API call statistics to this path, as JSON.')
 def secret(orbit, app, region, create_key, modify, key, value,
-           log_level):  # pragma: no cover
+           log_level, api_profile):  # pragma: no cover
     handle_secret(orbit, app, region, create_key, modify, key, value, log_level,
-                  sys.stdin)
+                  sys.stdin, api_profile=api_profile)
 
 
 def handle_secret(orbit_path, app_path, regions, create_key, modify, key, value,
-                  log_level, in_stream):
+                  log_level, in_stream, api_profile=None):
     helper = ClickHelper()
     helper.setup_logging(log_level)
 
@@ -57,7 +60,8 @@ def handle_secret(orbit_path, app_path, regions, create_key, modify, key, value,
         return False
 
     # Perform encryption:
-    cipher_texts = encrypt(app, plaintext, create_key)
+    cipher_texts = encrypt(app, plaintext, create_key,
+                           api_profile=api_profile)
     if not cipher_texts:
         return False
 
@@ -81,23 +85,29 @@ def get_plaintext(key, value, stream_in):
     return value
 
 
-def encrypt(app, plaintext, create_key):
+def encrypt(app, plaintext, create_key, api_profile=None):
     orbit = app.orbit
-    clients = ClientCache()
+    profiler = ApiProfiler()
+    clients = ClientCache(hooks=(profiler,))
     kms_key = KmsKeyFactory(clients)
     kms_crypto = KmsCrypto(clients, kms_key)
     logger.info('Encrypting secret to %s@%s in %s regions...', app.name,
                 orbit.name, len(app.regions))
     payloads = {}
-    for app_region in app.regions.values():
-        try:
-            encrypted_payload = kms_crypto.encrypt(app_region, plaintext,
-                                                   create_key=create_key)
-            payloads[app_region.region] = encrypted_payload
-        except ClientError as e:
-            e_message = e.response['Error'].get('Message', '')
-            logger.error(e_message)
-            return None
+    try:
+        for app_region in app.regions.values():
+            try:
+                encrypted_payload = kms_crypto.encrypt(app_region, plaintext,
+                                                       create_key=create_key)
+                payloads[app_region.region] = encrypted_payload
+            except ClientError as e:
+                e_message = e.response['Error'].get('Message', '')
+                logger.error(e_message)
+                return None
+    finally:
+        profiler.log_summary()
+        if api_profile:
+            profiler.write(api_profile)
     logger.info('Encrypted secret to %s@%s in %s regions...', app.name,
                 orbit.name, len(app.regions))
     return payloads
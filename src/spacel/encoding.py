@@ -0,0 +1,14 @@
+import base64
+
+import six
+
+
+def base64_encode(some_data):
+    if isinstance(some_data, six.string_types):
+        some_data = some_data.encode('utf-8')
+
+    return base64.b64encode(some_data).decode('utf-8').strip()
+
+
+def base64_decode(some_string):
+    return base64.b64decode(some_string)
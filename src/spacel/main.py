@@ -2,8 +2,6 @@
 
 import logging
 
-from colorlog import ColoredFormatter
-
 
 def setup_logging(level=logging.DEBUG):
     root_logger = logging.getLogger()
@@ -16,6 +14,7 @@ def setup_logging(level=logging.DEBUG):
     else:
         date_format = None
 
+    from colorlog import ColoredFormatter
     formatter = ColoredFormatter(
         "%(log_color)s%(asctime)s - %(name)s - %(message)s",
         datefmt=date_format,
@@ -36,7 +35,6 @@ def setup_logging(level=logging.DEBUG):
     logging.getLogger('botocore').setLevel(logging.CRITICAL)
     logging.getLogger('paramiko').setLevel(logging.CRITICAL)
     logging.getLogger('requests').setLevel(logging.CRITICAL)
-    logging.getLogger('tldextract').setLevel(logging.CRITICAL)
     logging.getLogger('spacel').setLevel(logging.DEBUG)
 
 
@@ -1,7 +1,7 @@
-import base64
 import re
 
-import six
+# Live in spacel.encoding, so spacel.security can skip importing this tree:
+from spacel.encoding import base64_encode, base64_decode  # noqa
 
 
 def clean_name(name):
@@ -15,18 +15,9 @@ def bool_param(params, name, default):
     return bool(val)
 
 
-def base64_encode(some_data):
-    if isinstance(some_data, six.string_types):
-        some_data = some_data.encode('utf-8')
-
-    return base64.b64encode(some_data).decode('utf-8').strip()
-
-
-def base64_decode(some_string):
-    return base64.b64decode(some_string)
-
-
 from .app import SpaceElevatorAppFactory
 from .changesets import ChangeSetEstimator
+from .fingerprint import TemplateFingerprints
+from .history import DurationHistory
 from .orbit import ProviderOrbitFactory
-from .s3 import LambdaUploader, TemplateUploader
+from .s3 import LambdaUploader, TemplateUploader, UploadIndex
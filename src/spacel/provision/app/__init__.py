@@ -2,3 +2,4 @@ from .app_spot import AppSpotTemplateDecorator
 from .cloudwatch_logs import CloudWatchLogsDecorator
 from .ingress_resource import IngressResourceFactory
 from .space import SpaceElevatorAppFactory
+from .stack_index import StackResourceIndex
@@ -5,14 +5,14 @@ from spacel.provision.app.cloudwatch_logs_alarm import \
 
 
 class CloudWatchLogsDecorator(BaseTemplateDecorator):
-    def logs(self, app_region, resources):
+    def logs(self, app_region, resources, user_data):
         docker_logs = app_region.logging.get('docker')
         if not docker_logs:
             return
 
         log_group_resource = self._log_group_resource(resources, docker_logs)
         self._iam_resource(resources, log_group_resource)
-        self._log_user_data(resources, log_group_resource)
+        user_data.add_log('docker', {'Ref': log_group_resource})
 
         self._metrics(app_region, resources, log_group_resource)
 
@@ -37,14 +37,6 @@ class CloudWatchLogsDecorator(BaseTemplateDecorator):
                          ['Resource'])
         log_resources.append({'Fn::GetAtt': [log_group_resource, 'Arn']})
 
-    def _log_user_data(self, resources, log_group_resource):
-        user_data = self._lc_user_data(resources)
-        logging_intro = user_data.index('"logging":{') + 1
-        user_data.insert(logging_intro, '\"},')
-        user_data.insert(logging_intro, {'Ref': log_group_resource})
-        user_data.insert(logging_intro, '"group":\"')
-        user_data.insert(logging_intro, '"docker":{')
-
     def _metrics(self, app_region, resources, log_group_resource):
         metrics = app_region.logging['docker'].get('metrics', {})
         app = app_region.app
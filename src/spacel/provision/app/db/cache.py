@@ -12,7 +12,7 @@ REDIS_VERSION = '3.2.4'
 
 
 class CacheFactory(BaseDbTemplateDecorator):
-    def add_caches(self, app_region, template):
+    def add_caches(self, app_region, template, user_data):
         if not app_region.caches:
             logger.debug('No caches specified.')
             return
@@ -21,11 +21,6 @@ class CacheFactory(BaseDbTemplateDecorator):
         orbit_name = app_region.app.orbit.name
         resources = template['Resources']
 
-        # Get UserData components:
-        user_data = self._lc_user_data(resources)
-        # Find the breadcrumb for the cache map:
-        cache_intro = user_data.index('"caches":{') + 1
-
         added_caches = 0
         for name, params in app_region.caches.items():
             # How many replicas?
@@ -80,17 +75,12 @@ class CacheFactory(BaseDbTemplateDecorator):
             }
 
             # Inject a labeled reference to this cache replication group:
-            # Read this backwards, and note the trailing comma.
-            user_data.insert(cache_intro, ',')
-            user_data.insert(cache_intro, '"')
-            user_data.insert(cache_intro, {'Ref': cache_resource})
-            user_data.insert(cache_intro, '"%s":"' % name)
+            user_data.add_cache(name, {'Ref': cache_resource})
             added_caches += 1
 
             self._add_client_resources(resources, app_region, 6379, params,
                                        cache_sg_resource)
 
-        # If we added any caches, remove trailing comma:
         if added_caches:
             resources['CachePolicy'] = {
                 'DependsOn': 'Role',
@@ -107,7 +97,6 @@ class CacheFactory(BaseDbTemplateDecorator):
                     }
                 }
             }
-            del user_data[cache_intro + (4 * added_caches) - 1]
 
     @staticmethod
     def _replicas(params):
@@ -1,10 +1,9 @@
 import logging
 
-from botocore.exceptions import ClientError
-
 from spacel.provision import clean_name, bool_param
 from spacel.provision.app.db.base import BaseDbTemplateDecorator
 from spacel.provision.app.db.rds_alarm import RdsAlarmTriggerFactory
+from spacel.provision.app.stack_index import StackResourceIndex
 
 logger = logging.getLogger('spacel.provision.rds.factory')
 
@@ -25,13 +24,14 @@ DEFAULT_PORTS = {
 
 
 class RdsFactory(BaseDbTemplateDecorator):
-    def __init__(self, clients, ingress, passwords):
+    def __init__(self, clients, ingress, passwords, stacks=None):
         super(RdsFactory, self).__init__(ingress)
         self._clients = clients
+        self._stacks = stacks or StackResourceIndex(clients)
         self._passwords = passwords
         self._alarms = RdsAlarmTriggerFactory()
 
-    def add_rds(self, app_region, template):
+    def add_rds(self, app_region, template, user_data):
         if not app_region.databases:
             logger.debug('No databases specified.')
             return
@@ -42,10 +42,6 @@ class RdsFactory(BaseDbTemplateDecorator):
         app_name = app.name
         orbit_name = app.orbit.name
 
-        user_data = self._lc_user_data(resources)
-        db_intro = user_data.index('"databases":{') + 1
-
-        added_databases = 0
         secret_params = {}
         iam_statements = []
         for name, db_params in app_region.databases.items():
@@ -74,14 +70,7 @@ class RdsFactory(BaseDbTemplateDecorator):
                     ]]}
                 })
 
-                user_data.insert(db_intro, ',')
-                user_data.insert(db_intro, ',"region": "%s"}' % db_global)
-                user_data.insert(db_intro,
-                                 '","password": %s' % encrypted.json())
-                user_data.insert(db_intro, rds_id)
-                user_data.insert(db_intro, '"%s":{"name":"' % name)
-                added_databases += 1
-
+                user_data.add_database(name, rds_id, encrypted, db_global)
                 continue
 
             db_type = db_params.get('type', 'postgres')
@@ -205,14 +194,9 @@ class RdsFactory(BaseDbTemplateDecorator):
                 ]]}
             })
 
-            # Inject a labeled reference to this cache replication group:
-            # Read this backwards, and note the trailing comma.
-            user_data.insert(db_intro, ',')
-            user_data.insert(db_intro, ',"region": "%s"}' % app_region.region)
-            user_data.insert(db_intro, '","password": %s' % encrypted.json())
-            user_data.insert(db_intro, {'Ref': rds_resource})
-            user_data.insert(db_intro, '"%s":{"name":"' % name)
-            added_databases += 1
+            # Inject a labeled reference to this database:
+            user_data.add_database(name, {'Ref': rds_resource}, encrypted,
+                                   app_region.region)
 
             self._add_client_resources(resources, app_region, db_port,
                                        db_params, rds_sg_resource)
@@ -235,30 +219,14 @@ class RdsFactory(BaseDbTemplateDecorator):
                 }
             }
 
-        if added_databases:
-            del user_data[db_intro + (5 * added_databases) - 1]
-
         return secret_params
 
     def _rds_id(self, app, region, rds_resource):
-        app_name = app.name
-        orbit_name = app.orbit.name
-        cloudformation = self._clients.cloudformation(region)
-
-        stack_name = '%s-%s' % (orbit_name, app_name)
-        try:
-            resource = cloudformation.describe_stack_resource(
-                StackName=stack_name,
-                LogicalResourceId=rds_resource)
-            return (resource['StackResourceDetail']
-                    ['PhysicalResourceId'])
-        except ClientError as e:
-            e_message = e.response['Error'].get('Message', '')
-            if 'does not exist' in e_message:
-                logger.debug('App %s not found in %s in %s.', app_name,
-                             orbit_name, region)
-                return None
-            raise e
+        rds_id = self._stacks.resource(region, app.full_name, rds_resource)
+        if not rds_id:
+            logger.debug('App %s not found in %s in %s.', app.name,
+                         app.orbit.name, region)
+        return rds_id
 
     @staticmethod
     def _instance_type(params):
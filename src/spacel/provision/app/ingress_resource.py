@@ -1,9 +1,8 @@
 import logging
 import re
 
-from botocore.exceptions import ClientError
-
 from spacel.provision import clean_name
+from spacel.provision.app.stack_index import StackResourceIndex
 
 IP_BLOCK = re.compile('(\d{1,3})\.(\d{1,3})\.(\d{1,3})\.(\d{1,3}/\d{1,3})')
 logger = logging.getLogger('spacel.provision.ingress_resource')
@@ -16,8 +15,13 @@ AVAILABILITY_NOT_PUBLIC = {
 
 
 class IngressResourceFactory(object):
-    def __init__(self, clients):
+    def __init__(self, clients, stacks=None):
+        """
+        :param clients: ClientCache.
+        :param stacks: StackResourceIndex (shared by factories in a run).
+        """
         self._clients = clients
+        self._stacks = stacks or StackResourceIndex(clients)
 
     def ingress_resources(self, app_region, start_port, clients,
                           protocol='TCP', end_port=None, sg_ref='Sg',
@@ -113,39 +117,20 @@ class IngressResourceFactory(object):
         return ingress_resources
 
     def _app_sg(self, orbit, region, app, sg_ref='Sg'):
-        cloudformation = self._clients.cloudformation(region)
         stack_name = '%s-%s' % (orbit.name, app)
-        try:
-            resource = cloudformation.describe_stack_resource(
-                StackName=stack_name,
-                LogicalResourceId=sg_ref)
-            return (resource['StackResourceDetail']
-                    ['PhysicalResourceId'])
-        except ClientError as e:
-            e_message = e.response['Error'].get('Message', '')
-            if 'does not exist' in e_message:
-                logger.debug('App %s not found in %s in %s.', app,
-                             orbit.name, region)
-                return None
-            raise e
+        sg_id = self._stacks.resource(region, stack_name, sg_ref)
+        if not sg_id:
+            logger.debug('App %s not found in %s in %s.', app, orbit.name,
+                         region)
+        return sg_id
 
     def _app_eips(self, orbit_region, app):
-        eips = []
-        cloudformation = self._clients.cloudformation(orbit_region.region)
         stack_name = '%s-%s' % (orbit_region.orbit.name, app)
-        try:
-            p = cloudformation.get_paginator('list_stack_resources')
-            for page in p.paginate(StackName=stack_name):
-                for s in page['StackResourceSummaries']:
-                    r = s['LogicalResourceId']
-                    if r.startswith('ElasticIp') and not r.endswith('Policy'):
-                        eips.append(s['PhysicalResourceId'])
-            return eips
-        except ClientError as e:
-            e_message = e.response['Error'].get('Message', '')
-            if 'does not exist' in e_message:
-                return eips
-            raise e
+        resources = self._stacks.resources(orbit_region.region, stack_name)
+        if not resources:
+            return []
+        return [resources[r] for r in sorted(resources)
+                if r.startswith('ElasticIp') and not r.endswith('Policy')]
 
     @staticmethod
     def _is_rfc1918(ip_match):
@@ -1,17 +1,23 @@
 import logging
 import uuid
-
+from concurrent.futures import ThreadPoolExecutor
 
 from spacel.provision.cloudformation import BaseCloudFormationFactory
 
 logger = logging.getLogger('spacel')
 
+# Upper bound on regions rendered/submitted at once:
+MAX_WORKERS = 8
+
 
 class SpaceElevatorAppFactory(BaseCloudFormationFactory):
-    def __init__(self, clients, change_sets, uploader, app_template):
-        super(SpaceElevatorAppFactory, self).__init__(clients, change_sets,
-                                                      uploader)
+    def __init__(self, clients, change_sets, uploader, app_template,
+                 max_workers=MAX_WORKERS, fingerprints=None, trace=None):
+        super(SpaceElevatorAppFactory, self).__init__(
+            clients, change_sets, uploader, fingerprints=fingerprints,
+            trace=trace)
         self._app_template = app_template
+        self._max_workers = max_workers
 
     def app(self, app, force_redeploy=False):
         """
@@ -29,21 +35,42 @@ class SpaceElevatorAppFactory(BaseCloudFormationFactory):
             # New token: force redeploy according to UpdatePolicy
             params['UniqueToken'] = unique_token
 
-        for region, app_region in app.regions.items():
-            template, secret_params = self._app_template.app(app_region)
-            if not template and not secret_params:
+        # Render and submit every region concurrently:
+        workers = max(1, min(self._max_workers, len(app.regions)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            region_updates = {
+                region: executor.submit(self._app_region, app_region, params,
+                                        unique_token)
+                for region, app_region in app.regions.items()}
+
+        for region, region_update in region_updates.items():
+            update = region_update.result()
+            if update is False:
                 logger.warning('App %s will not be updated, invalid syntax!',
                                app_name)
                 continue
-
-            secret_params = secret_params or {}
-            # Treat token as a secret: re-use existing value if possible.
-            secret_params['UniqueToken'] = lambda: unique_token
-            updates[region] = self._stack(app_name, region, template,
-                                          parameters=params,
-                                          secret_parameters=secret_params)
+            updates[region] = update
         return self._wait_for_updates(app_name, updates)
 
+    def _app_region(self, app_region, params, unique_token):
+        """
+        Render and submit an app in a single region.
+        :param app_region: SpaceAppRegion.
+        :param params: Stack parameters.
+        :param unique_token: Unique token (for forced redeploys).
+        :return: Stack update, False if template could not be rendered.
+        """
+        template, secret_params = self._app_template.app(app_region)
+        if not template and not secret_params:
+            return False
+
+        secret_params = secret_params or {}
+        # Treat token as a secret: re-use existing value if possible.
+        secret_params['UniqueToken'] = lambda: unique_token
+        return self._stack(app_region.app.full_name, app_region.region,
+                           template, parameters=params,
+                           secret_parameters=secret_params)
+
     def delete_app(self, app):
         """
         Delete an app in all regions.
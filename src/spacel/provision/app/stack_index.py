@@ -0,0 +1,73 @@
+import logging
+
+from botocore.exceptions import ClientError
+
+from spacel.cache import KeyedLocks
+
+logger = logging.getLogger('spacel.provision.app.stack_index')
+
+
+class StackResourceIndex(object):
+    """
+    Physical ids of resources in other stacks (i.e. security groups of other
+    apps), for cross-stack references while rendering templates.
+
+    Each stack's resources are listed once, stacks that don't exist are
+    remembered as such.
+    """
+
+    def __init__(self, clients):
+        """
+        :param clients: ClientCache.
+        """
+        self._clients = clients
+        self._resources = {}
+        self._locks = KeyedLocks()
+
+    def resource(self, region, stack_name, logical_id):
+        """
+        Get the physical id of a stack resource.
+        :param region: AWS region.
+        :param stack_name: Stack name.
+        :param logical_id: Logical resource id.
+        :return: Physical resource id, None if the stack or resource doesn't
+         exist.
+        """
+        resources = self.resources(region, stack_name)
+        if resources is None:
+            return None
+        return resources.get(logical_id)
+
+    def resources(self, region, stack_name):
+        """
+        Get the resources of a stack.
+        :param region: AWS region.
+        :param stack_name: Stack name.
+        :return: Dict of logical id to physical id, None if the stack doesn't
+         exist.
+        """
+        key = (region, stack_name)
+        with self._locks.get(key):
+            if key in self._resources:
+                return self._resources[key]
+
+            resources = self._list_resources(region, stack_name)
+            self._resources[key] = resources
+            return resources
+
+    def _list_resources(self, region, stack_name):
+        cloudformation = self._clients.cloudformation(region)
+        resources = {}
+        try:
+            paginator = cloudformation.get_paginator('list_stack_resources')
+            for page in paginator.paginate(StackName=stack_name):
+                for summary in page['StackResourceSummaries']:
+                    resources[summary['LogicalResourceId']] = \
+                        summary.get('PhysicalResourceId')
+            return resources
+        except ClientError as e:
+            e_message = e.response['Error'].get('Message', '')
+            if 'does not exist' in e_message:
+                logger.debug('Stack %s not found in %s.', stack_name, region)
+                return None
+            raise e
@@ -0,0 +1,143 @@
+import json
+
+import six
+
+from spacel.provision.app.base_decorator import BaseTemplateDecorator
+
+# Sections spliced into the LaunchConfiguration's UserData, after these:
+EIPS_INTRO = 1
+CACHES_BREADCRUMB = '"caches":{'
+DATABASES_BREADCRUMB = '"databases":{'
+LOGGING_BREADCRUMB = '"logging":{'
+
+
+class UserData(BaseTemplateDecorator):
+    """
+    Builds the JSON document passed to instances as UserData.
+
+    Decorators add typed sections, the template's `Fn::Join` is rewritten
+    once by `render`. Entries are rendered newest first: the order UserData
+    has always been rendered in, so existing LaunchConfigurations don't
+    change.
+    """
+
+    def __init__(self):
+        self._eips = []
+        self._caches = []
+        self._databases = []
+        self._logging = []
+        self.systemd = {}
+        self.files = {}
+        self.volumes = {}
+        self.stats = False
+
+    def add_eip(self, allocation_id):
+        """
+        Add an elastic IP for instances to claim.
+        :param allocation_id: Allocation id (i.e. `Fn::GetAtt`).
+        """
+        self._eips.append(['"', allocation_id, '"'])
+
+    def add_cache(self, name, replication_group):
+        """
+        Add a cache.
+        :param name: Cache name.
+        :param replication_group: Replication group id (i.e. `Ref`).
+        """
+        self._caches.append(['"%s":"' % name, replication_group, '"'])
+
+    def add_database(self, name, db_instance, password, region):
+        """
+        Add a database.
+        :param name: Database name.
+        :param db_instance: DB instance id (string or `Ref`).
+        :param password: EncryptedPayload of password.
+        :param region: Region of database.
+        """
+        self._databases.append([
+            '"%s":{"name":"' % name,
+            db_instance,
+            '","password": %s' % password.json(),
+            ',"region": "%s"}' % region
+        ])
+
+    def add_log(self, name, log_group):
+        """
+        Add a log to ship.
+        :param name: Log name.
+        :param log_group: Log group (i.e. `Ref`).
+        """
+        self._logging.append(['"%s":{"group":"' % name, log_group, '"}'])
+
+    def parameter(self):
+        """
+        Render static sections, for the `UserData` parameter.
+        :return: JSON fragment, empty or starting with a comma.
+        """
+        user_data = ''
+        if self.systemd:
+            user_data += ',"systemd":' + json.dumps(self.systemd,
+                                                    sort_keys=True)
+        if self.files:
+            user_data += ',"files":' + json.dumps(self.files, sort_keys=True)
+        if self.volumes:
+            user_data += ',"volumes":' + json.dumps(self.volumes,
+                                                    sort_keys=True)
+        if self.stats:
+            user_data += ',"stats":true'
+        return user_data
+
+    def render(self, resources):
+        """
+        Splice sections into the LaunchConfiguration's UserData.
+        :param resources: CloudFormation template "Resources" section.
+        """
+        user_data = self._lc_user_data(resources)
+
+        splices = {}
+        if self._eips:
+            splices[EIPS_INTRO] = (['"eips":['] + self._join(self._eips) +
+                                   ['],'])
+        for breadcrumb, entries in ((CACHES_BREADCRUMB, self._caches),
+                                    (DATABASES_BREADCRUMB, self._databases),
+                                    (LOGGING_BREADCRUMB, self._logging)):
+            if not entries:
+                continue
+            intro = user_data.index(breadcrumb) + 1
+            fragments = self._join(entries)
+            # Separate from existing entries of the section:
+            if not self._closes(user_data[intro]):
+                fragments.append(',')
+            splices[intro] = fragments
+
+        rendered = []
+        for index, fragment in enumerate(user_data):
+            rendered += splices.get(index, ())
+            rendered.append(fragment)
+        user_data[:] = self._merge(rendered)
+
+    @staticmethod
+    def _join(entries):
+        joined = []
+        for entry in reversed(entries):
+            if joined:
+                joined.append(',')
+            joined += entry
+        return joined
+
+    @staticmethod
+    def _closes(fragment):
+        return (isinstance(fragment, six.string_types)
+                and fragment.startswith('}'))
+
+    @staticmethod
+    def _merge(fragments):
+        # Adjacent strings are joined, leaving the minimal `Fn::Join`:
+        merged = []
+        for fragment in fragments:
+            if (merged and isinstance(fragment, six.string_types)
+                    and isinstance(merged[-1], six.string_types)):
+                merged[-1] += fragment
+            else:
+                merged.append(fragment)
+        return merged
@@ -1,8 +1,14 @@
 import logging
 
+from spacel.provision.dag import critical_path, template_dependencies
+from spacel.provision.history import percentile
+
 logger = logging.getLogger('spacel')
 
-# These could always use tuning:
+# Weight of COSTS against observed durations, in samples:
+PRIOR_SAMPLES = 2
+
+# Prior estimates, refined by observed durations (see DurationHistory):
 COSTS = {
     'AWS::AutoScaling::AutoScalingGroup': {
         'Add': 2,
@@ -115,10 +121,27 @@ class ChangeSetEstimator(object):
     Estimate how long it will take to execute a CF change set.
     """
 
-    def estimate(self, changes):
+    def __init__(self, history=None):
+        """
+        :param history: DurationHistory, learn from previous deploys if set.
+        """
+        self._history = history
+
+    def estimate(self, changes, region=None, template=None):
+        """
+        Estimate a change set.
+        :param changes: Change set "Changes".
+        :param region: Region of change set.
+        :param template: JSON template, to estimate from the critical path
+            rather than the sum of changes.
+        :return: Median estimate, in seconds.
+        """
         # Aggregate changes in a single log message:
         changes_debug = 'Changes to be performed:\n'
-        seconds = 0
+        costs = {}
+        costs_p90 = {}
+        removals = {}
+        removals_p90 = {}
 
         for change in changes:
             resource_change = change.get('ResourceChange')
@@ -130,26 +153,68 @@ class ChangeSetEstimator(object):
                     physical = ''
                 resource_action = resource_change['Action']
                 resource_type = resource_change['ResourceType']
+                logical_id = resource_change['LogicalResourceId']
 
                 # Debug message:
                 changes_debug += '%6s %25s - %s%s\n' % (
                     resource_action,
                     resource_type,
-                    resource_change['LogicalResourceId'],
+                    logical_id,
                     physical)
 
-                seconds += self._estimate(resource_action, resource_type)
+                p50, p90 = self._estimate(resource_action, resource_type,
+                                          region)
+                if resource_action == 'Remove':
+                    removals[logical_id] = p50
+                    removals_p90[logical_id] = p90
+                else:
+                    costs[logical_id] = p50
+                    costs_p90[logical_id] = p90
 
-        changes_debug += 'This should take %s seconds...' % seconds
+        if template is None:
+            seconds = sum(costs.values()) + sum(removals.values())
+            seconds_p90 = sum(costs_p90.values()) + sum(removals_p90.values())
+        else:
+            dependencies = template_dependencies(template)
+            seconds, path = critical_path(dependencies, costs)
+            seconds_p90, _ = critical_path(dependencies, costs_p90)
+            # Removed resources are cleaned up last, in parallel:
+            seconds += max(removals.values() or [0])
+            seconds_p90 += max(removals_p90.values() or [0])
+            if path:
+                bottleneck = max(path, key=costs.get)
+                changes_debug += 'Critical path: %s (bottleneck: %s, %s ' \
+                                 'seconds)\n' % (' -> '.join(path),
+                                                  bottleneck,
+                                                  int(costs[bottleneck]))
+
+        changes_debug += 'This should take %s seconds (p90: %s)...' % (
+            int(seconds), int(seconds_p90))
         logger.info(changes_debug)
         return seconds
 
-    @staticmethod
-    def _estimate(resource_action, resource_type):
+    def observed(self, observations):
+        """
+        Record durations observed while executing change sets.
+        :param observations: List of
+            (resource type, action, region, seconds) tuples.
+        """
+        if self._history:
+            self._history.record(observations)
+
+    def _estimate(self, resource_action, resource_type, region):
+        samples = []
+        if self._history:
+            samples = self._history.durations(resource_type, resource_action,
+                                              region)
+
         basic_cost = COSTS.get(resource_type, {}).get(resource_action)
         if basic_cost:
-            return basic_cost
+            samples = samples + [basic_cost] * PRIOR_SAMPLES
+        elif not samples:
+            logger.warning('No basic cost for %s to %s.', resource_action,
+                           resource_type)
+            return 0, 0
 
-        logger.warning('No basic cost for %s to %s.', resource_action,
-                       resource_type)
-        return 0
+        samples = sorted(samples)
+        return percentile(samples, 50), percentile(samples, 90)
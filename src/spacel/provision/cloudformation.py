@@ -8,15 +8,18 @@ from collections import defaultdict
 
 from botocore.exceptions import ClientError
 
+from spacel.provision.events import StackEventCursor
+from spacel.provision.history import action
+from spacel.provision.polling import PollingScheduler, is_throttle
+from spacel.provision.size import MAX_TEMPLATE_BODY_SIZE, minify, serialize
+from spacel.provision.trace import timestamp
+
 logger = logging.getLogger('spacel.provision.cloudformation')
 
 CAPABILITIES = ('CAPABILITY_IAM',)
 INVALID_STATE_MESSAGE = re.compile('.* is in ([A-Z_]*) state and can not'
                                    ' be updated.')
 
-# https://docs.aws.amazon.com/AWSCloudFormation/latest/UserGuide/cloudformation-limits.html
-MAX_TEMPLATE_BODY_SIZE = 51200
-
 NO_CHANGES = 'The submitted information didn\'t contain changes.' \
              ' Submit different information to create a change set.'
 
@@ -26,25 +29,55 @@ FINAL_STATUS = ('CREATE_COMPLETE', 'DELETE_COMPLETE', 'UPDATE_COMPLETE',
 ROLLBACK_STATUS = ('UPDATE_ROLLBACK_COMPLETE', 'ROLLBACK_COMPLETE',
                    'UPDATE_ROLLBACK_FAILED')
 
+# Times `_stack` waits for a busy stack before giving up:
+MAX_STATE_RETRIES = 3
+
 
 class BaseCloudFormationFactory(object):
     """
     Shared functionality for CloudFormation provisioning.
     """
 
-    def __init__(self, clients, change_sets, uploader, sleep_time=2):
+    def __init__(self, clients, change_sets, uploader, poller=None,
+                 fingerprints=None, trace=None):
         self._clients = clients
         self._change_sets = change_sets
-        self._sleep_time = sleep_time
+        self._poller = poller or PollingScheduler()
         self._uploader = uploader
+        self._fingerprints = fingerprints
+        self._trace = trace
+        # Estimated execution time of submitted change sets:
+        self._estimates = {}
 
     def _stack(self, name, region, json_template, parameters=None,
-               secret_parameters=None):
+               secret_parameters=None, retries=MAX_STATE_RETRIES):
         parameters = parameters or {}
         secret_parameters = secret_parameters or {}
         cf = self._clients.cloudformation(region)
-        template_body = json.dumps(json_template, indent=2, sort_keys=True)
+        template_body = serialize(json_template)
+        if len(template_body) >= MAX_TEMPLATE_BODY_SIZE:
+            # Try to stay inline, uploading to S3 is slower:
+            original_size = len(template_body)
+            template_body = serialize(minify(json_template))
+            if len(template_body) < MAX_TEMPLATE_BODY_SIZE:
+                logger.info('Template for %s minified from %s to %s bytes '
+                            '(limit %s), not uploading.', name,
+                            original_size, len(template_body),
+                            MAX_TEMPLATE_BODY_SIZE)
+
+        fingerprint = None
+        if self._fingerprints:
+            fingerprint = self._fingerprints.fingerprint(template_body,
+                                                         parameters,
+                                                         secret_parameters)
+            if self._fingerprints.unchanged(name, region, fingerprint):
+                logger.debug('Stack %s in %s is unchanged, skipping.', name,
+                             region)
+                return None
+
         if len(template_body) >= MAX_TEMPLATE_BODY_SIZE:
+            logger.info('Template for %s is %s bytes (limit %s), uploading.',
+                        name, len(template_body), MAX_TEMPLATE_BODY_SIZE)
             template_url = self._uploader.upload(template_body, name)
         else:
             template_url = None
@@ -71,6 +104,7 @@ class BaseCloudFormationFactory(object):
                     })
 
         set_name = 'change-%s' % uuid.uuid4()
+        change_set_start = time.time()
         try:
             logger.debug('Updating stack %s in %s.', name, region)
             create_params = {
@@ -86,34 +120,48 @@ class BaseCloudFormationFactory(object):
             cf.create_change_set(**create_params)
 
             # Wait for change set to complete:
-            change_set = cf.describe_change_set(StackName=name,
-                                                ChangeSetName=set_name)
+            backoff = self._poller.backoff()
+            change_set = self._describe_change_set(cf, name, set_name,
+                                                   backoff)
             while change_set['Status'] != 'CREATE_COMPLETE':
                 if change_set['Status'] == 'FAILED':
                     status_reason = change_set.get('StatusReason')
 
                     if status_reason == NO_CHANGES:
                         logger.debug('No changes to be performed.')
+                        self._traced(region, name, 'change set',
+                                     change_set_start, 'NO_CHANGES')
                         cf.delete_change_set(StackName=name,
                                              ChangeSetName=set_name)
+                        if fingerprint:
+                            self._fingerprints.applied(name, region,
+                                                       'NO_CHANGES',
+                                                       fingerprint)
                         return None
                     else:
                         logger.error('Unable to create change set "%s": %s',
                                      set_name, status_reason)
                         return 'failed'
 
-                time.sleep(self._sleep_time)
-                change_set = cf.describe_change_set(StackName=name,
-                                                    ChangeSetName=set_name)
+                backoff.sleep()
+                change_set = self._describe_change_set(cf, name, set_name,
+                                                       backoff)
+
+            self._traced(region, name, 'change set', change_set_start)
 
             # Debug info before executing:
-            self._change_sets.estimate(change_set['Changes'])
+            estimate = self._change_sets.estimate(change_set['Changes'],
+                                                  region=region,
+                                                  template=json_template)
+            self._estimates[(name, region)] = estimate
 
             # Start execution:
             cf.execute_change_set(StackName=name,
                                   ChangeSetName=set_name)
             cf.delete_change_set(StackName=name,
                                  ChangeSetName=set_name)
+            if fingerprint:
+                self._fingerprints.pending(name, region, fingerprint)
             return 'update'
         except ClientError as e:
             e_message = e.response['Error'].get('Message')
@@ -133,31 +181,123 @@ class BaseCloudFormationFactory(object):
                 else:
                     create_params['TemplateBody'] = template_body
                 cf.create_stack(**create_params)
+                if fingerprint:
+                    self._fingerprints.pending(name, region, fingerprint)
                 return 'create'
 
             state_match = INVALID_STATE_MESSAGE.match(e_message)
             if state_match:
                 current_state = state_match.group(1)
 
-                waiter = None
-                if current_state.startswith('CREATE_'):
-                    waiter = cf.get_waiter('stack_create_complete')
-                elif current_state.startswith('UPDATE_'):
-                    waiter = cf.get_waiter('stack_update_complete')
-                elif current_state == 'ROLLBACK_COMPLETE':
+                waitable = (current_state.startswith('CREATE_')
+                            or current_state.startswith('UPDATE_'))
+                if current_state == 'ROLLBACK_COMPLETE':
                     cf.delete_stack(StackName=name)
-                    waiter = cf.get_waiter('stack_delete_complete')
-                else:  # pragma: no cover
-                    logger.warning('Unknown state: %s', current_state)
+                    waitable = True
 
-                if waiter:
+                if waitable:
+                    if retries <= 0:
+                        logger.error('Stack %s in %s is still %s, giving up.',
+                                     name, region, current_state)
+                        return 'failed'
                     logger.debug('Stack %s is %s, waiting...', name,
                                  current_state)
-                    self._impatient(waiter)
-                    waiter.wait(StackName=name)
-                    return self._stack(name, region, json_template)
+                    status = self._wait_for_stack(cf, name)
+                    if not self._updatable(status):
+                        logger.error('Stack %s in %s is %s and can not be '
+                                     'updated.', name, region, status)
+                        return 'failed'
+                    return self._stack(name, region, json_template,
+                                       parameters=parameters,
+                                       secret_parameters=secret_parameters,
+                                       retries=retries - 1)
+                else:  # pragma: no cover
+                    logger.warning('Unknown state: %s', current_state)
             raise e
 
+    def _traced(self, region, name, phase, start, status=None):
+        if self._trace:
+            self._trace.span(region, name, phase, 'phase', start, time.time(),
+                             status)
+
+    @staticmethod
+    def _describe_change_set(cf, name, set_name, backoff):
+        while True:
+            try:
+                return cf.describe_change_set(StackName=name,
+                                              ChangeSetName=set_name)
+            except ClientError as e:
+                if not is_throttle(e):
+                    raise e
+                backoff.throttled()
+                backoff.sleep()
+
+    def _wait_for_stack(self, cf, name):
+        """
+        Wait for a stack to leave an IN_PROGRESS state (or be deleted).
+        :param cf: CloudFormation client.
+        :param name: Stack name.
+        :return: Final stack status, None if deleted.
+        """
+        backoff = self._poller.backoff()
+        while True:
+            try:
+                stack = self._describe_stack(cf, name)
+            except ClientError as e:
+                e_message = e.response['Error'].get('Message', '')
+                if 'does not exist' in e_message:
+                    return None
+                if not is_throttle(e):
+                    raise e
+                backoff.throttled()
+                backoff.sleep()
+                continue
+
+            status = stack['StackStatus']
+            if not status.endswith('_IN_PROGRESS'):
+                return status
+            backoff.sleep()
+
+    def _resource_stopped(self, region, name, event, region_starts,
+                          region_times, region_traced, observations):
+        resource_id = event['LogicalResourceId']
+        resource_type = event['ResourceType']
+        status = event['ResourceStatus']
+        is_stack = resource_id == name and resource_type == CF_STACK
+        if status.endswith('_IN_PROGRESS'):
+            return
+
+        resource_start, resource_action = region_starts[resource_id]
+        event_time = event['Timestamp'].replace(tzinfo=None)
+        resource_time = (event_time - resource_start).total_seconds()
+
+        # Trace every resource that stops, failures included:
+        if self._trace and not is_stack and resource_id not in region_traced:
+            region_traced.add(resource_id)
+            resource_end = timestamp(event_time)
+            self._trace.span(region, name, resource_id, resource_type,
+                             resource_end - resource_time, resource_end,
+                             status)
+
+        if status in FINAL_STATUS and resource_id not in region_times:
+            region_times[resource_id] = resource_time
+            # Learn from changes that completed as planned:
+            if (not is_stack and resource_action
+                    and action(status) == resource_action):
+                observations.append((resource_type, resource_action, region,
+                                     resource_time))
+
+    @staticmethod
+    def _updatable(status):
+        """
+        Check if a stack can take a change set.
+        :param status: Stack status, None if deleted.
+        :return: True if updatable (or creatable).
+        """
+        if status is None:
+            return True
+        return status.endswith('_COMPLETE') and status != 'ROLLBACK_COMPLETE'
+
     @staticmethod
     def _existing_params(cf, name):
         try:
@@ -172,49 +312,65 @@ class BaseCloudFormationFactory(object):
     def _delete_stack(self, name, region):
         cf = self._clients.cloudformation(region)
         cf.delete_stack(StackName=name)
+        if self._fingerprints:
+            self._fingerprints.forget(name, region)
         return 'delete'
 
     @staticmethod
     def _describe_stack(cf, stack_name):
         return cf.describe_stacks(StackName=stack_name)['Stacks'][0]
 
-    def _wait_for_updates(self, name, updates, poll_interval=5):
+    def _wait_for_updates(self, name, updates):
         """
         Wait for updates to complete in a stack.
         :param name: Application name.
         :param updates: Stack update dict of {region:update}.
-        :param poll_interval: Interval to poll for updates/completion.
         :return: True if updates completed.
         """
         start_offset = datetime.timedelta(seconds=5)
         start = datetime.datetime.utcnow() - start_offset
+        wait_start = time.time()
 
         # Collect regions that require updates:
         pending = {}
+        backoffs = {}
+        next_polls = {}
         for region, update in updates.items():
             if not update:
                 continue
             if update == 'failed':
                 logger.debug('Update failed for %s in %s...', name, region)
                 continue
-            pending[region] = start
+            cf = self._clients.cloudformation(region)
+            pending[region] = StackEventCursor(cf, name, since=start)
+            expected = self._estimates.pop((name, region), None)
+            backoffs[region] = self._poller.backoff(expected)
+            next_polls[region] = 0
 
         if not pending:
             return True
 
         resource_starts = defaultdict(dict)
         resource_times = defaultdict(dict)
+        resource_traced = defaultdict(set)
+        observations = []
 
         # Loop until every region is finished:
         rollback_count = 0
         while pending:
-            for region, last_log in pending.copy().items():
-                # Get stack events in this region
-                cf = self._clients.cloudformation(region)
+            for region, cursor in pending.copy().items():
+                if next_polls[region] > time.time():
+                    continue
+                backoff = backoffs[region]
+
+                # Get new stack events in this region, in chronological order:
                 try:
-                    events = (cf.describe_stack_events(StackName=name)
-                              .get('StackEvents', ()))
+                    events = list(cursor.events())
                 except ClientError as e:
+                    if is_throttle(e):
+                        backoff.throttled()
+                        next_polls[region] = time.time() + backoff.next_delay()
+                        continue
                     # Deleting a stack that doesn't exist is fine:
                     if updates[region] == 'delete':
                         e_message = e.response['Error'].get('Message')
@@ -225,13 +381,13 @@ class BaseCloudFormationFactory(object):
 
                 region_starts = resource_starts[region]
                 region_times = resource_times[region]
+                region_traced = resource_traced[region]
 
-                # Iterate events in chronological order:
-                for event in reversed(events):
-                    # Skip events that have been processed:
+                if events:
+                    backoff.progress()
+                next_polls[region] = time.time() + backoff.next_delay()
+                for event in events:
                     event_time = event['Timestamp'].replace(tzinfo=None)
-                    if event_time <= last_log:
-                        continue
 
                     # If this is a "stack complete" event, remove from pending:
                     resource_id = event['LogicalResourceId']
@@ -240,16 +396,20 @@ class BaseCloudFormationFactory(object):
                     is_stack = resource_id == name and resource_type == CF_STACK
                     is_complete = is_stack and status in FINAL_STATUS
                     if is_complete:
-                        del pending[region]
+                        pending.pop(region, None)
+                        self._traced(region, name, 'wait', wait_start, status)
+                        if self._fingerprints:
+                            self._fingerprints.applied(name, region, status)
 
                     # Track the first mention of each resource
                     # Calculate CREATE/UPDATE time for each resource:
                     if resource_id not in region_starts:
-                        region_starts[resource_id] = time.time()
-                    elif (status in FINAL_STATUS
-                          and resource_id not in resource_starts):
-                        resource_start = region_starts.get(resource_id)
-                        region_times[resource_id] = time.time() - resource_start
+                        region_starts[resource_id] = (event_time,
+                                                      action(status))
+                    else:
+                        self._resource_stopped(
+                            region, name, event, region_starts, region_times,
+                            region_traced, observations)
 
                     is_rollback = is_stack and status in ROLLBACK_STATUS
                     if is_rollback:
@@ -266,14 +426,14 @@ class BaseCloudFormationFactory(object):
                                  status_reason,
                                  event_time.strftime('%Y-%m-%d %H:%M:%S'))
 
-                    # Push "start" to the last logged event
-                    if not is_complete:
-                        pending[region] = event_time
-
-            # Wait before retrying each pending region again:
+            # Wait until the next pending region should be polled again:
             if pending:
-                time.sleep(poll_interval)
+                next_poll = min(next_polls[region] for region in pending)
+                delay = next_poll - time.time()
+                if delay > 0:
+                    self._poller.sleep(delay)
 
+        self._change_sets.observed(observations)
         if resource_times:
             times_str = json.dumps(dict(resource_times), indent=2,
                                    sort_keys=True)
@@ -284,13 +444,3 @@ class BaseCloudFormationFactory(object):
         logger.info('Completed all updates in %i seconds, %s rollbacks.',
                     duration, rollback_count)
         return rollback_count == 0
-
-    @staticmethod
-    def _impatient(waiter):
-        """
-        Reduce delay on waiter.
-        :param waiter: Waiter.
-        """
-        # Default polls every 30 seconds; 5 makes more sense to me:
-        waiter.config.delay /= 6
-        waiter.config.max_attempts *= 6
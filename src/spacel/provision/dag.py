@@ -0,0 +1,163 @@
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+logger = logging.getLogger('spacel.provision.dag')
+
+# Upper bound on stacks provisioned at once:
+MAX_WORKERS = 8
+
+
+class StackGraph(object):
+    """
+    Stacks that depend on each other, provisioned in every region as soon as
+    their dependencies are ready in that region.
+    """
+
+    def __init__(self, dependencies):
+        """
+        :param dependencies: Dict of {stack: (stacks it depends on)}.
+        """
+        self._dependencies = dependencies
+        self._check_acyclic()
+
+    def reverse(self):
+        """
+        Get the reversed graph (i.e. for deletion).
+        :return: StackGraph.
+        """
+        reversed_dependencies = {stack: [] for stack in self._dependencies}
+        for stack, dependencies in self._dependencies.items():
+            for dependency in dependencies:
+                reversed_dependencies[dependency].append(stack)
+        return StackGraph({stack: tuple(sorted(dependents))
+                           for stack, dependents in
+                           reversed_dependencies.items()})
+
+    def run(self, regions, func, max_workers=MAX_WORKERS):
+        """
+        Call `func(region, stack)` for every stack in every region, once it
+        has completed for the stack's dependencies in the same region.
+        If `func` raises, dependent stacks in that region are skipped and the
+        first error is raised once everything else has finished.
+        :param regions: Regions.
+        :param func: Function to call.
+        :param max_workers: Maximum concurrent calls.
+        :return: Dict of {(region, stack): result}.
+        """
+        remaining = set((region, stack)
+                        for region in regions
+                        for stack in self._dependencies)
+        results = {}
+        errors = []
+        running = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while True:
+                for task in sorted(remaining):
+                    region, stack = task
+                    if all((region, dependency) in results
+                           for dependency in self._dependencies[stack]):
+                        remaining.discard(task)
+                        running[executor.submit(func, region, stack)] = task
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    task = running.pop(future)
+                    try:
+                        results[task] = future.result()
+                    except Exception as e:
+                        logger.error('Unable to provision %s in %s: %s',
+                                     task[1], task[0], e)
+                        errors.append(e)
+
+        if errors:
+            raise errors[0]
+        return results
+
+    def _check_acyclic(self):
+        visited = set()
+        for stack in self._dependencies:
+            self._visit(stack, visited, ())
+
+    def _visit(self, stack, visited, path):
+        if stack in path:
+            raise ValueError('Dependency cycle: %s' %
+                             ' -> '.join(path + (stack,)))
+        if stack in visited:
+            return
+        for dependency in self._dependencies[stack]:
+            self._visit(dependency, visited, path + (stack,))
+        visited.add(stack)
+
+
+def template_dependencies(template):
+    """
+    Get dependencies between resources of a template, from `DependsOn`,
+    `Ref` and `Fn::GetAtt`.
+    :param template: JSON template.
+    :return: Dict of {resource: set(resources it depends on)}.
+    """
+    resources = template.get('Resources', {})
+    dependencies = {}
+    for name, resource in resources.items():
+        resource_dependencies = set()
+        depends_on = resource.get('DependsOn', ())
+        if not isinstance(depends_on, list):
+            depends_on = [depends_on]
+        resource_dependencies.update(depends_on)
+        _references(resource, resource_dependencies)
+        # Parameters and pseudo-parameters aren't resources:
+        resource_dependencies.intersection_update(resources)
+        resource_dependencies.discard(name)
+        dependencies[name] = resource_dependencies
+    return dependencies
+
+
+def _references(value, found):
+    if isinstance(value, dict):
+        for key, child in value.items():
+            if key == 'Ref':
+                found.add(child)
+            elif key == 'Fn::GetAtt':
+                if isinstance(child, list):
+                    found.add(child[0])
+                else:
+                    found.add(child.split('.', 1)[0])
+            else:
+                _references(child, found)
+    elif isinstance(value, list):
+        for child in value:
+            _references(child, found)
+
+
+def critical_path(dependencies, costs):
+    """
+    Find the longest chain of dependent resources.
+    :param dependencies: Dict of {resource: resources it depends on}.
+    :param costs: Dict of {resource: seconds}, missing resources are free.
+    :return: (seconds, [resources in execution order]).
+    """
+    longest = {}
+
+    def visit(node, path):
+        if node in longest:
+            return longest[node]
+        if node in path:
+            raise ValueError('Dependency cycle: %s' %
+                             ' -> '.join(path + (node,)))
+        best = (0, [])
+        for dependency in sorted(dependencies.get(node, ())):
+            candidate = visit(dependency, path + (node,))
+            if candidate[0] > best[0]:
+                best = candidate
+        result = (best[0] + costs.get(node, 0), best[1] + [node])
+        longest[node] = result
+        return result
+
+    path = (0, [])
+    for node in sorted(dependencies):
+        candidate = visit(node, ())
+        if candidate[0] > path[0]:
+            path = candidate
+    return path[0], [node for node in path[1] if costs.get(node)]
@@ -0,0 +1,61 @@
+import logging
+
+logger = logging.getLogger('spacel.provision.events')
+
+
+class StackEventCursor(object):
+    """
+    Incrementally reads CloudFormation stack events.
+
+    Each poll pages through `describe_stack_events` only until an event that
+    has already been seen, so a poll costs O(new events) rather than
+    re-reading the stack's entire history.
+    """
+
+    def __init__(self, cf, stack_name, since=None):
+        """
+        :param cf: CloudFormation client.
+        :param stack_name: Stack name.
+        :param since: Ignore events at or before this (naive UTC) time.
+        """
+        self._cf = cf
+        self._stack_name = stack_name
+        self._since = since
+        self.last_event_id = None
+
+    def events(self):
+        """
+        Get events since the previous poll.
+        :return: Generator of unseen stack events, in chronological order.
+        """
+        new_events = []
+        request = {'StackName': self._stack_name}
+        while True:
+            page = self._cf.describe_stack_events(**request)
+            caught_up = False
+            # Events are returned newest first:
+            for event in page.get('StackEvents', ()):
+                if self._seen(event):
+                    caught_up = True
+                    break
+                new_events.append(event)
+
+            next_token = page.get('NextToken')
+            if caught_up or not next_token:
+                break
+            request['NextToken'] = next_token
+
+        if new_events:
+            self.last_event_id = new_events[0]['EventId']
+            logger.debug('Read %s new events for %s.', len(new_events),
+                         self._stack_name)
+        for event in reversed(new_events):
+            yield event
+
+    def _seen(self, event):
+        if self.last_event_id and event['EventId'] == self.last_event_id:
+            return True
+        if self._since:
+            event_time = event['Timestamp'].replace(tzinfo=None)
+            return event_time <= self._since
+        return False
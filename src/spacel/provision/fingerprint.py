@@ -0,0 +1,140 @@
+import hashlib
+import json
+import logging
+
+from botocore.exceptions import ClientError
+
+from spacel.cache import DiskCache
+
+logger = logging.getLogger('spacel.provision.fingerprint')
+
+# Statuses that mean the fingerprint is live in CloudFormation:
+APPLIED_STATUS = ('CREATE_COMPLETE', 'UPDATE_COMPLETE', 'NO_CHANGES')
+
+# Stack statuses a fingerprint can still be live in:
+COMPLETE_STATUS = ('CREATE_COMPLETE', 'UPDATE_COMPLETE')
+
+
+class TemplateFingerprints(object):
+    """
+    Remembers the template and parameters last applied to each stack, so
+    unchanged stacks can skip change sets.
+
+    A fingerprint is only trusted while the stack is the one it was applied
+    to, and hasn't been updated since (i.e. from another host): checking
+    costs one `describe_stacks`.
+    """
+
+    def __init__(self, clients, cache=None, force=False):
+        """
+        :param clients: ClientCache.
+        :param cache: Fingerprint storage (defaults to a local DiskCache).
+        :param force: Never consider a stack unchanged.
+        """
+        self._clients = clients
+        self._cache = cache or DiskCache('fingerprints')
+        self._force = force
+        self._pending = {}
+
+    @staticmethod
+    def fingerprint(template_body, parameters, secret_parameters):
+        """
+        Hash a stack update.
+        :param template_body: Serialized template.
+        :param parameters: Parameter dict.
+        :param secret_parameters: Secret parameter dict (only keys are used).
+        :return: Fingerprint.
+        """
+        hasher = hashlib.sha256()
+        hasher.update(template_body.encode('utf-8'))
+        hasher.update(json.dumps(parameters, sort_keys=True).encode('utf-8'))
+        for secret_param in sorted(secret_parameters):
+            hasher.update(secret_param.encode('utf-8'))
+        return hasher.hexdigest()
+
+    def unchanged(self, name, region, fingerprint):
+        """
+        Check if a stack was last left with this fingerprint.
+        :param name: Stack name.
+        :param region: Region.
+        :param fingerprint: Fingerprint.
+        :return: True if stack can be skipped.
+        """
+        if self._force:
+            return False
+        key = self._key(name, region)
+        applied = self._cache.get(key)
+        if not (applied
+                and applied['fingerprint'] == fingerprint
+                and applied['status'] in APPLIED_STATUS
+                and applied.get('stack')):
+            return False
+
+        stack = self._stack(name, region)
+        if stack != applied['stack']:
+            logger.debug('Stack %s in %s changed since last deploy.', name,
+                         region)
+            return False
+        return True
+
+    def pending(self, name, region, fingerprint):
+        """
+        Record a fingerprint that is being applied.
+        :param name: Stack name.
+        :param region: Region.
+        :param fingerprint: Fingerprint.
+        """
+        self._pending[(name, region)] = fingerprint
+
+    def applied(self, name, region, status, fingerprint=None):
+        """
+        Record a fingerprint as applied.
+        :param name: Stack name.
+        :param region: Region.
+        :param status: Final stack status.
+        :param fingerprint: Fingerprint (defaults to the pending fingerprint).
+        """
+        fingerprint = fingerprint or self._pending.pop((name, region), None)
+        if not fingerprint:
+            return
+        stack = status in APPLIED_STATUS and self._stack(name, region)
+        if not stack:
+            self.forget(name, region)
+            return
+        self._cache.set(self._key(name, region), {
+            'fingerprint': fingerprint,
+            'status': status,
+            'stack': stack
+        })
+
+    def forget(self, name, region):
+        """
+        Forget a stack's fingerprint.
+        :param name: Stack name.
+        :param region: Region.
+        """
+        self._pending.pop((name, region), None)
+        self._cache.delete(self._key(name, region))
+
+    def _stack(self, name, region):
+        """
+        Identify the current version of a complete stack.
+        :param name: Stack name.
+        :param region: Region.
+        :return: "StackId@LastUpdatedTime", None if missing or not complete.
+        """
+        cf = self._clients.cloudformation(region)
+        try:
+            stack = cf.describe_stacks(StackName=name)['Stacks'][0]
+        except ClientError as e:
+            e_message = e.response['Error'].get('Message', '')
+            if 'does not exist' in e_message:
+                return None
+            raise e
+        if stack['StackStatus'] not in COMPLETE_STATUS:
+            return None
+        updated = stack.get('LastUpdatedTime') or stack['CreationTime']
+        return '%s@%s' % (stack['StackId'], updated.isoformat())
+
+    def _key(self, name, region):
+        return '%s:%s:%s' % (self._clients.account(region), region, name)
@@ -0,0 +1,96 @@
+import logging
+import math
+import threading
+
+from spacel.cache import DiskCache
+
+logger = logging.getLogger('spacel.provision.history')
+
+# Samples kept per resource type, action and region:
+MAX_SAMPLES = 20
+
+# Samples from every region, used when a region has none:
+ANY_REGION = '*'
+
+# CloudFormation event statuses, by change set action:
+ACTIONS = {
+    'CREATE': 'Add',
+    'UPDATE': 'Modify',
+    'DELETE': 'Remove'
+}
+
+
+def action(status):
+    """
+    Get the change set action of a resource status.
+    :param status: Resource status (i.e. `CREATE_IN_PROGRESS`).
+    :return: Action (i.e. `Add`), None if unknown.
+    """
+    return ACTIONS.get(status.split('_', 1)[0])
+
+
+def percentile(samples, p):
+    """
+    Nearest-rank percentile.
+    :param samples: Sorted samples.
+    :param p: Percentile, 0-100.
+    :return: Sample at percentile.
+    """
+    rank = int(math.ceil(p / 100.0 * len(samples)))
+    return samples[max(rank, 1) - 1]
+
+
+class DurationHistory(object):
+    """
+    Durations of resource changes observed in previous deploys.
+    """
+
+    def __init__(self, cache=None, max_samples=MAX_SAMPLES):
+        """
+        :param cache: Duration storage (defaults to a local DiskCache).
+        :param max_samples: Samples to keep per key, newest are kept.
+        """
+        self._cache = cache or DiskCache('durations')
+        self._max_samples = max_samples
+        self._lock = threading.Lock()
+
+    def durations(self, resource_type, resource_action, region):
+        """
+        Get observed durations.
+        :param resource_type: Resource type.
+        :param resource_action: Change set action (`Add`/`Modify`/`Remove`).
+        :param region: Region, durations of any region are used if none.
+        :return: List of durations in seconds, oldest first.
+        """
+        for sample_region in (region, ANY_REGION):
+            key = self._key(resource_type, resource_action, sample_region)
+            samples = self._cache.get(key)
+            if samples:
+                return samples
+        return []
+
+    def record(self, observations):
+        """
+        Record observed durations.
+        :param observations: List of
+            (resource type, action, region, seconds) tuples.
+        """
+        added = {}
+        for resource_type, resource_action, region, seconds in observations:
+            for sample_region in (region, ANY_REGION):
+                key = self._key(resource_type, resource_action, sample_region)
+                added.setdefault(key, []).append(round(seconds, 1))
+        if not added:
+            return
+
+        with self._lock:
+            updates = {}
+            for key, samples in added.items():
+                existing = self._cache.get(key) or []
+                updates[key] = (existing + samples)[-self._max_samples:]
+            self._cache.set_many(updates)
+        logger.debug('Recorded %s resource durations.', len(observations))
+
+    @staticmethod
+    def _key(resource_type, resource_action, region):
+        return '%s:%s:%s' % (resource_type, resource_action, region)
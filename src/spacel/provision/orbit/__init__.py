@@ -1,3 +1,4 @@
+from .cache import OrbitCache
 from .gdh import GitDeployHooksOrbitFactory
 from .provider import ProviderOrbitFactory
 from .space import SpaceElevatorOrbitFactory
@@ -0,0 +1,106 @@
+import logging
+
+from botocore.exceptions import ClientError
+
+from spacel.cache import DiskCache
+
+logger = logging.getLogger('spacel.provision.orbit.cache')
+
+# Maximum age of a snapshot, even if its stacks are unchanged:
+DEFAULT_TTL = 24 * 60 * 60
+
+AZ_FIELDS = ('private_elb_subnet', 'private_instance_subnet',
+             'public_elb_subnet', 'public_instance_subnet', 'nat_eip')
+REGION_FIELDS = ('vpc_id', 'nat_eips', 'private_cache_subnet_group',
+                 'private_rds_subnet_group', 'public_rds_subnet_group',
+                 'spot_fleet_role', 'bastion_eips', 'bastion_sg')
+
+# Stacks whose outputs are snapshot:
+VERSION_STACKS = ('vpc', 'bastion')
+
+
+class OrbitCache(object):
+    """
+    Snapshots of orbit outputs, so app deploys can skip the orbit.
+
+    Snapshots are only used while the VPC and bastion stacks are unchanged
+    since it was taken: checking that costs one `describe_stacks` per stack
+    and region.
+    """
+
+    def __init__(self, clients, cache=None, ttl=DEFAULT_TTL):
+        self._clients = clients
+        self._cache = cache or DiskCache('orbits', ttl=ttl)
+
+    def save(self, orbit_region):
+        """
+        Snapshot a provisioned orbit region.
+        :param orbit_region: OrbitRegion, updated from CloudFormation.
+        """
+        version = self._version(orbit_region)
+        if not version:
+            return
+        snapshot = {field: getattr(orbit_region, field)
+                    for field in REGION_FIELDS}
+        snapshot['azs'] = {az_key: {field: getattr(orbit_az, field, None)
+                                    for field in AZ_FIELDS}
+                           for az_key, orbit_az in orbit_region.azs.items()}
+        snapshot['version'] = version
+        self._cache.set(self._key(orbit_region), snapshot)
+        logger.debug('Saved %s in %s.', orbit_region.orbit.name,
+                     orbit_region.region)
+
+    def load(self, orbit_region):
+        """
+        Update an orbit region from a snapshot, if still valid.
+        :param orbit_region: OrbitRegion.
+        :return: True if updated.
+        """
+        snapshot = self._cache.get(self._key(orbit_region))
+        if not snapshot:
+            return False
+        version = self._version(orbit_region)
+        if not version or version != snapshot['version']:
+            logger.debug('Snapshot of %s in %s is outdated.',
+                         orbit_region.orbit.name, orbit_region.region)
+            return False
+
+        orbit_region.az_keys = snapshot['azs'].keys()
+        for az_key, az_snapshot in snapshot['azs'].items():
+            orbit_az = orbit_region.azs[az_key]
+            for field, value in az_snapshot.items():
+                setattr(orbit_az, field, value)
+        for field in REGION_FIELDS:
+            setattr(orbit_region, field, snapshot[field])
+        logger.debug('Loaded %s in %s from snapshot.',
+                     orbit_region.orbit.name, orbit_region.region)
+        return True
+
+    def _version(self, orbit_region):
+        # Every stack with cached outputs, the VPC is required:
+        versions = []
+        for stack_suffix in VERSION_STACKS:
+            version = self._stack_version(orbit_region, stack_suffix)
+            if not version:
+                if stack_suffix == 'vpc':
+                    return None
+                version = '-'
+            versions.append(version)
+        return ','.join(versions)
+
+    def _stack_version(self, orbit_region, stack_suffix):
+        cf = self._clients.cloudformation(orbit_region.region)
+        stack_name = '%s-%s' % (orbit_region.orbit.name, stack_suffix)
+        try:
+            stack = cf.describe_stacks(StackName=stack_name)['Stacks'][0]
+        except ClientError as e:
+            e_message = e.response['Error'].get('Message', '')
+            if 'does not exist' in e_message:
+                return None
+            raise e
+        updated = stack.get('LastUpdatedTime') or stack['CreationTime']
+        return '%s:%s' % (stack['StackId'], updated.isoformat())
+
+    @staticmethod
+    def _key(orbit_region):
+        return '%s:%s' % (orbit_region.orbit.name, orbit_region.region)
@@ -1,6 +1,10 @@
 import logging
 from collections import defaultdict
+from botocore.exceptions import BotoCoreError, ClientError
+from concurrent.futures import ThreadPoolExecutor
 
+from spacel.aws import AvailabilityZones
+from spacel.provision.orbit.cache import OrbitCache
 from spacel.provision.orbit.gdh import GitDeployHooksOrbitFactory
 from spacel.provision.orbit.space import SpaceElevatorOrbitFactory
 
@@ -12,30 +16,68 @@ class ProviderOrbitFactory(object):
     Constructs orbital VPCs according to providers.
     """
 
-    def __init__(self, providers):
+    def __init__(self, providers, orbit_cache=None):
         self._providers = providers
+        self._orbit_cache = orbit_cache
 
-    def orbit(self, orbit):
+    def orbit(self, orbit, cached=False):
+        """
+        Provision an orbit, running every provider concurrently.
+        :param orbit: Orbit.
+        :param cached: Use valid snapshots instead of provisioning.
+        :return: True if every provider completed.
+        """
         # Index regions by provider:
         provider_regions = defaultdict(list)
         for region, orbit_region in orbit.regions.items():
             provider = orbit_region.provider
+            if (cached and provider == 'spacel' and self._orbit_cache
+                    and self._orbit_cache.load(orbit_region)):
+                logger.debug('Orbit "%s" is cached in %s.', orbit.name,
+                             region)
+                continue
             logger.debug('Orbit "%s" uses provider: %s', orbit.name, provider)
             provider_regions[provider].append(region)
 
-        # Fire providers sequentially:
         logger.debug('Region provider map: %s', dict(provider_regions))
-        for provider_name, provider_regions in provider_regions.items():
+        providers = {}
+        for provider_name, regions in provider_regions.items():
             provider = self._providers.get(provider_name)
             if not provider:
                 logger.warning('Unknown provider: %s', provider_name)
                 continue
-            provider.orbit(orbit, regions=provider_regions)
+            providers[provider_name] = (provider, regions)
+        if not providers:
+            return True
+
+        # Fire providers concurrently, a failure in one doesn't stop others:
+        with ThreadPoolExecutor(max_workers=len(providers)) as executor:
+            provider_results = {
+                provider_name: executor.submit(provider.orbit, orbit,
+                                               regions=regions)
+                for provider_name, (provider, regions) in providers.items()}
+
+        # AWS errors fail the orbit, anything else is a bug and propagates:
+        completed = True
+        for provider_name, provider_result in provider_results.items():
+            try:
+                provider_result.result()
+            except (BotoCoreError, ClientError):
+                logger.exception('Provider %s failed for orbit "%s".',
+                                 provider_name, orbit.name)
+                completed = False
+        return completed
 
     @staticmethod
-    def get(clients, change_sets, uploader, vpc, bastion, tables):
+    def get(clients, change_sets, uploader, vpc, bastion, tables,
+            fingerprints=None, refresh_cache=False, trace=None):
+        orbit_cache = OrbitCache(clients)
+        azs = AvailabilityZones(clients, refresh=refresh_cache)
         return ProviderOrbitFactory({
             'spacel': SpaceElevatorOrbitFactory(clients, change_sets, uploader,
-                                                vpc, bastion, tables),
+                                                vpc, bastion, tables,
+                                                fingerprints=fingerprints,
+                                                orbit_cache=orbit_cache,
+                                                azs=azs, trace=trace),
             'gdh': GitDeployHooksOrbitFactory(clients, change_sets, uploader)
-        })
+        }, orbit_cache=orbit_cache)
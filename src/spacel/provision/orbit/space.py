@@ -1,30 +1,48 @@
 import logging
 
-from botocore.exceptions import ClientError
-
+from spacel.aws import AvailabilityZones
 from spacel.provision.cloudformation import (BaseCloudFormationFactory)
+from spacel.provision.dag import StackGraph
 
 logger = logging.getLogger('spacel.provision.orbit.spacel')
 
+# Orbit stacks, and the stacks whose outputs they need:
+ORBIT_STACKS = StackGraph({
+    'vpc': (),
+    'tables': (),
+    'bastion': ('vpc',)
+})
+
 
 class SpaceElevatorOrbitFactory(BaseCloudFormationFactory):
     """
     Builds orbital VPCs based on Space Elevator templates.
     """
 
-    def __init__(self, clients, change_sets, uploader, vpc, bastion, tables):
-        super(SpaceElevatorOrbitFactory, self).__init__(clients, change_sets,
-                                                        uploader)
+    def __init__(self, clients, change_sets, uploader, vpc, bastion, tables,
+                 fingerprints=None, orbit_cache=None, azs=None, trace=None):
+        super(SpaceElevatorOrbitFactory, self).__init__(
+            clients, change_sets, uploader, fingerprints=fingerprints,
+            trace=trace)
         self._vpc = vpc
         self._bastion = bastion
         self._tables = tables
+        self._orbit_cache = orbit_cache
+        self._availability_zones = azs or AvailabilityZones(clients)
 
     def orbit(self, orbit, regions=None):
         regions = regions or orbit.regions.keys()
         self._azs(orbit, regions)
-        self._orbit_stack(orbit, regions, 'vpc')
-        self._orbit_stack(orbit, regions, 'tables')
-        self._orbit_stack(orbit, regions, 'bastion')
+
+        # Each stack starts as soon as its inputs are ready in its region:
+        def orbit_stack(region, stack_suffix):
+            self._orbit_stack(orbit, [region], stack_suffix)
+
+        ORBIT_STACKS.run(regions, orbit_stack)
+
+        if self._orbit_cache:
+            for region in regions:
+                self._orbit_cache.save(orbit.regions[region])
 
     def _orbit_stack(self, orbit, regions, stack_suffix):
         stack_name = '%s-%s' % (orbit.name, stack_suffix)
@@ -73,22 +91,7 @@ class SpaceElevatorOrbitFactory(BaseCloudFormationFactory):
             if regions and region not in regions:
                 continue
 
-            ec2 = self._clients.ec2(region)
-            try:
-                vpcs = ec2.describe_vpcs()
-                vpc_id = vpcs['Vpcs'][0]['VpcId']
-                invalid_az = region + '-zzz'
-                ec2.create_subnet(VpcId=vpc_id, CidrBlock='172.31.192.0/20',
-                                  AvailabilityZone=invalid_az)
-            except ClientError as e:
-                message = e.response['Error'].get('Message')
-                if not message or 'Subnets can currently only be created in ' \
-                                  'the following availability zones' not in message:
-                    raise e
-                message_split = message.split(region)
-                # Invalid region echoed, every mention after that is an AZ:
-                azs = sorted([region + s[0] for s in message_split[2:]])
-                orbit_region.az_keys = azs
+            orbit_region.az_keys = self._availability_zones.azs(region)
 
     @staticmethod
     def _orbit_from_vpc(orbit_region, cf_outputs):
@@ -162,23 +165,10 @@ class SpaceElevatorOrbitFactory(BaseCloudFormationFactory):
     def delete_orbit(self, orbit, regions=None):
         regions = regions or orbit.regions
 
-        bastion_name = '%s-bastion' % orbit.name
-        tables_name = '%s-tables' % orbit.name
-        vpc_name = '%s-vpc' % orbit.name
-
-        # Bastions and tables can be deleted concurrently:
-        bastion_updates = {}
-        tables_updates = {}
-        for region in regions:
-            bastion_updates[region] = self._delete_stack(bastion_name, region)
-            tables_updates[region] = self._delete_stack(tables_name, region)
-        self._wait_for_updates(bastion_name, bastion_updates)
-
-        # VPC can be deleted after bastion completes:
-        vpc_updates = {}
-        for region in regions:
-            vpc_updates[region] = self._delete_stack(vpc_name, region)
-        self._wait_for_updates(vpc_name, vpc_updates)
+        # Stacks can be deleted once their dependents are gone:
+        def delete_stack(region, stack_suffix):
+            stack_name = '%s-%s' % (orbit.name, stack_suffix)
+            update = self._delete_stack(stack_name, region)
+            self._wait_for_updates(stack_name, {region: update})
 
-        # Tables should be gone by now, but let's 100%:
-        self._wait_for_updates(tables_name, tables_updates)
+        ORBIT_STACKS.reverse().run(regions, delete_stack)
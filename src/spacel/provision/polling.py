@@ -0,0 +1,111 @@
+import logging
+import random
+import time
+
+from spacel.aws.limiter import THROTTLE_CODES
+
+logger = logging.getLogger('spacel.provision.polling')
+
+# Fraction of an estimated duration to wait between polls:
+EXPECTED_FRACTION = 0.1
+# Delay multiplier after being throttled:
+THROTTLE_FACTOR = 2
+
+
+def is_throttle(client_error):
+    """
+    Check if an error is AWS throttling requests.
+    :param client_error: ClientError.
+    :return: True if throttled.
+    """
+    error_code = client_error.response.get('Error', {}).get('Code')
+    return error_code in THROTTLE_CODES
+
+
+class PollingScheduler(object):
+    """
+    Decides when to poll CloudFormation again.
+
+    Polls start fast and back off exponentially (with jitter) until something
+    changes. An expected duration (i.e. from `ChangeSetEstimator`) caps how
+    slow polling can get, throttling pushes it back out.
+    """
+
+    def __init__(self, initial=1.0, maximum=30.0, factor=1.5, jitter=0.2,
+                 sleep=time.sleep):
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.jitter = jitter
+        self._sleep = sleep
+
+    def backoff(self, expected=None):
+        """
+        Start polling something.
+        :param expected: Expected seconds until completion (optional).
+        :return: Backoff.
+        """
+        return Backoff(self, expected)
+
+    def sleep(self, seconds):
+        """
+        Sleep.
+        :param seconds: Seconds to sleep.
+        """
+        self._sleep(seconds)
+
+
+class Backoff(object):
+    """
+    Polling state for a single resource.
+    """
+
+    def __init__(self, scheduler, expected=None):
+        self._scheduler = scheduler
+        self._delay = scheduler.initial
+        self._maximum = scheduler.maximum
+        if expected:
+            self.expect(expected)
+
+    def expect(self, seconds):
+        """
+        Adjust polling to an expected duration.
+        :param seconds: Expected seconds until completion.
+        """
+        scheduler = self._scheduler
+        expected_delay = seconds * EXPECTED_FRACTION
+        self._maximum = max(scheduler.initial,
+                            min(scheduler.maximum, expected_delay))
+        self._delay = min(self._delay, self._maximum)
+
+    def next_delay(self):
+        """
+        Get the delay until the next poll, backing off for the one after.
+        :return: Delay in seconds.
+        """
+        scheduler = self._scheduler
+        delay = self._delay
+        self._delay = min(self._maximum, delay * scheduler.factor)
+        jitter = scheduler.jitter
+        return delay * random.uniform(1 - jitter, 1 + jitter)
+
+    def progress(self):
+        """
+        Something changed: poll fast again.
+        """
+        self._delay = self._scheduler.initial
+
+    def throttled(self):
+        """
+        AWS is throttling: poll slower, regardless of expectations.
+        """
+        scheduler = self._scheduler
+        self._delay = min(scheduler.maximum, self._delay * THROTTLE_FACTOR)
+        self._maximum = max(self._maximum, self._delay)
+        logger.debug('Throttled, polling every %.1f seconds.', self._delay)
+
+    def sleep(self):
+        """
+        Sleep until the next poll.
+        """
+        self._scheduler.sleep(self.next_delay())
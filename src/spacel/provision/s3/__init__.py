@@ -1,2 +1,3 @@
+from .index import UploadIndex
 from .lambda_uploader import LambdaUploader
 from .template_uploader import TemplateUploader
@@ -2,11 +2,14 @@ import codecs
 import hashlib
 import six
 
+from spacel.provision.s3.index import UploadIndex
+
 
 class BaseUploader(object):
-    def __init__(self, clients, region, bucket):
-        self._s3 = clients.s3(region)
+    def __init__(self, clients, region, bucket, index=None):
+        self._s3 = clients.s3(region, resource=False)
         self._bucket = bucket
+        self._index = index or UploadIndex()
 
     @staticmethod
     def _hash(data):
@@ -21,5 +24,4 @@ class BaseUploader(object):
             return str(script_hash, 'utf-8')
 
     def _upload(self, path, body):
-        s3_object = self._s3.Object(self._bucket, path)
-        s3_object.put(Body=body)
+        return self._index.upload(self._s3, self._bucket, path, body)
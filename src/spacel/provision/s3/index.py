@@ -0,0 +1,91 @@
+import logging
+import threading
+
+from botocore.exceptions import ClientError
+
+from spacel.cache import DiskCache
+
+logger = logging.getLogger('spacel.provision.s3.index')
+
+# Objects can expire from buckets (i.e. lifecycle rules), re-check daily:
+DEFAULT_TTL = 24 * 60 * 60
+
+
+class UploadIndex(object):
+    """
+    Remembers content-addressed objects known to exist in S3, so identical
+    uploads can be skipped.
+    """
+
+    def __init__(self, cache=None, ttl=DEFAULT_TTL):
+        """
+        :param cache: Index storage (defaults to a local DiskCache).
+        :param ttl: Maximum age of on-disk entries, in seconds.
+        """
+        self._cache = cache or DiskCache('uploads', ttl=ttl)
+        self._present = set()
+        self._lock = threading.Lock()
+        self.uploaded = 0
+        self.uploaded_bytes = 0
+        self.skipped = 0
+        self.skipped_bytes = 0
+
+    def upload(self, s3, bucket, path, body):
+        """
+        Upload an object, unless already present.
+        :param s3: S3 client.
+        :param bucket: Bucket.
+        :param path: Key, must be addressed by content.
+        :param body: Object body.
+        :return: True if uploaded.
+        """
+        key = '%s/%s' % (bucket, path)
+        size = len(body)
+        if self._known(key) or self._exists(s3, bucket, path):
+            logger.debug('Skipping upload of s3://%s, already present.', key)
+            self._remember(key, size, uploaded=False)
+            return False
+
+        s3.put_object(Bucket=bucket, Key=path, Body=body)
+        self._remember(key, size, uploaded=True)
+        return True
+
+    def log_stats(self):
+        """
+        Log uploads made and skipped.
+        """
+        if not self.uploaded and not self.skipped:
+            return
+        logger.info('Uploaded %s objects (%s bytes), skipped %s present'
+                    ' (%s bytes saved).', self.uploaded, self.uploaded_bytes,
+                    self.skipped, self.skipped_bytes)
+
+    def _known(self, key):
+        with self._lock:
+            if key in self._present:
+                return True
+        return bool(self._cache.get(key))
+
+    @staticmethod
+    def _exists(s3, bucket, path):
+        try:
+            s3.head_object(Bucket=bucket, Key=path)
+            return True
+        except ClientError as e:
+            # 403 if the caller can't list the bucket: upload to be sure.
+            logger.debug('s3://%s/%s not found: %s', bucket, path,
+                         e.response['Error'].get('Code'))
+            return False
+
+    def _remember(self, key, size, uploaded):
+        with self._lock:
+            new = key not in self._present
+            self._present.add(key)
+            if uploaded:
+                self.uploaded += 1
+                self.uploaded_bytes += size
+            else:
+                self.skipped += 1
+                self.skipped_bytes += size
+        if new:
+            self._cache.set(key, True)
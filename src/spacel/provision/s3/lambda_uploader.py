@@ -6,9 +6,11 @@ from spacel.provision.s3.base import BaseUploader
 
 
 class LambdaUploader(BaseUploader):
-    def __init__(self, clients, region, bucket):
-        super(LambdaUploader, self).__init__(clients, region, bucket)
+    def __init__(self, clients, region, bucket, index=None):
+        super(LambdaUploader, self).__init__(clients, region, bucket,
+                                             index=index)
         self._cache = {}
+        self._zips = {}
         file_path = os.path.dirname(os.path.realpath(__file__))
         self._path = os.path.join(file_path, '..', '..', 'lambda')
 
@@ -34,16 +36,22 @@ class LambdaUploader(BaseUploader):
         # Hash script
         script_hash = self._hash(encoded_script)
 
-        # Package into zipfile:
+        # Upload to S3:
+        zip_path = '%s/%s.zip' % (name, script_hash)
+        self._upload(zip_path, self._zip(script_hash, encoded_script))
+        return self._bucket, zip_path
+
+    def _zip(self, script_hash, encoded_script):
+        cached = self._zips.get(script_hash)
+        if cached:
+            return cached
+
         zip_buffer = BytesIO()
         with ZipFile(zip_buffer, 'w') as zip_file:
             zip_info = ZipInfo('index.js')
             zip_info.compress_type = ZIP_DEFLATED
             zip_info.external_attr = 0o0755 << 16
             zip_file.writestr(zip_info, encoded_script)
-        zip_buffer.seek(0)
-
-        # Upload to S3:
-        zip_path = '%s/%s.zip' % (name, script_hash)
-        self._upload(zip_path, zip_buffer)
-        return self._bucket, zip_path
+        zipped = zip_buffer.getvalue()
+        self._zips[script_hash] = zipped
+        return zipped
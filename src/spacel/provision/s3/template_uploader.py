@@ -6,7 +6,7 @@ class TemplateUploader(BaseUploader):
         template_hash = self._hash(template_body)
         path = '%s/%s.template' % (app_name, template_hash)
         self._upload(path, template_body)
-        presigned_url = self._s3.meta.client.generate_presigned_url(
+        presigned_url = self._s3.generate_presigned_url(
             'get_object', Params={
                 'Bucket': self._bucket,
                 'Key': path
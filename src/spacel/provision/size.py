@@ -0,0 +1,81 @@
+import json
+import logging
+import marshal
+
+logger = logging.getLogger('spacel.provision.size')
+
+# https://docs.aws.amazon.com/AWSCloudFormation/latest/UserGuide/cloudformation-limits.html
+MAX_TEMPLATE_BODY_SIZE = 51200
+
+# Longest description kept by `minify`:
+MAX_DESCRIPTION = 32
+
+
+def serialize(template):
+    """
+    Serialize a template, without whitespace.
+    :param template: JSON template.
+    :return: Template body.
+    """
+    return json.dumps(template, sort_keys=True, separators=(',', ':'))
+
+
+def minify(template):
+    """
+    Shrink a template, without changing resources.
+
+    Descriptions of parameters and outputs are shortened. Logical ids are
+    kept: a template crossing the size limit must not replace resources.
+    :param template: JSON template.
+    :return: Minified copy of template.
+    """
+    template = marshal.loads(marshal.dumps(template))
+    for section in ('Parameters', 'Outputs'):
+        for value in template.get(section, {}).values():
+            description = value.get('Description')
+            if description and len(description) > MAX_DESCRIPTION:
+                value['Description'] = description[:MAX_DESCRIPTION]
+
+    return template
+
+
+class SizeReport(object):
+    """
+    Tracks how many bytes each step of rendering adds to a template.
+
+    Serializing isn't free, steps are only measured with DEBUG logging.
+    """
+
+    def __init__(self, name, template):
+        """
+        :param name: Template name, for logging.
+        :param template: JSON template, before any step.
+        """
+        self._name = name
+        self.enabled = logger.isEnabledFor(logging.DEBUG)
+        self.size = self.enabled and len(serialize(template)) or 0
+        self._base = self.size
+        self.steps = []
+
+    def measure(self, label, template):
+        """
+        Record size added by a step.
+        :param label: Step label (i.e. decorator).
+        :param template: JSON template, after the step.
+        """
+        if not self.enabled:
+            return
+        size = len(serialize(template))
+        self.steps.append((label, size - self.size))
+        self.size = size
+
+    def log(self, budget=MAX_TEMPLATE_BODY_SIZE):
+        """
+        Log bytes added by each step.
+        :param budget: Size before the template must be uploaded.
+        """
+        if not self.enabled:
+            return
+        steps = ', '.join('%s: %+d' % step for step in self.steps)
+        logger.debug('Template %s is %s/%s bytes (base: %s, %s).',
+                     self._name, self.size, budget, self._base, steps)
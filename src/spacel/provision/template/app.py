@@ -5,6 +5,8 @@ import six
 
 from spacel.model.aws import INSTANCE_VOLUMES
 from spacel.provision import base64_encode
+from spacel.provision.app.user_data import UserData
+from spacel.provision.size import SizeReport
 from spacel.provision.template.base import BaseTemplateCache
 
 SSL_SCHEMES = ('HTTPS', 'SSL')
@@ -29,6 +31,7 @@ class AppTemplate(BaseTemplateCache):
         app_template = self.get('elb-service')
 
         app = app_region.app
+        size = SizeReport(app.name, app_template)
         orbit_region = app_region.orbit_region
         orbit = app.orbit
         params = app_template['Parameters']
@@ -67,7 +70,9 @@ class AppTemplate(BaseTemplateCache):
         if instance_min and instance_min == instance_max:
             min_in_service = instance_max - 1
         params['InstanceMinInService']['Default'] = min_in_service
-        params['UserData']['Default'] = self._user_data(params, app_region)
+        user_data = UserData()
+        params['UserData']['Default'] = self._user_data(params, app_region,
+                                                        user_data)
         params['Ami']['Default'] = self._ami.spacel_ami(orbit_region.region)
 
         if app_region.hostnames:
@@ -95,8 +100,6 @@ class AppTemplate(BaseTemplateCache):
             self._elb_subnets(resources, 'PrivateElb', private_elb_subnets)
 
         if app_region.elastic_ips and app_region.instance_max > 0:
-            eip_pos = self._lc_user_data(resources)
-            eip_pos.insert(1, '"eips":[')
             for instance_index in range(1, app_region.instance_max + 1):
                 eip_name = 'ElasticIp%02d' % instance_index
                 # Add resource, output:
@@ -108,14 +111,7 @@ class AppTemplate(BaseTemplateCache):
                 }
                 outputs[eip_name] = {'Value': {'Ref': eip_name}}
 
-                # Append to `eips` list in UserData (reverse!)
-                if instance_index == 1:
-                    eip_pos.insert(2, '],')
-                else:
-                    eip_pos.insert(2, ',')
-                eip_pos.insert(2, '"')
-                eip_pos.insert(2, {'Fn::GetAtt': [eip_name, 'AllocationId']})
-                eip_pos.insert(2, '"')
+                user_data.add_eip({'Fn::GetAtt': [eip_name, 'AllocationId']})
 
             resources['ElasticIpPolicy'] = {
                 'DependsOn': 'Role',
@@ -275,17 +271,29 @@ class AppTemplate(BaseTemplateCache):
                 # No ELB and no static IPs, give up
                 del resources['DnsRecord']
 
+        size.measure('app', app_template)
+
         # Order matters: Alarms _first_ so other decorators can use endpoints:
         self._alarm_factory.add_alarms(app_region, app_template)
+        size.measure('alarms', app_template)
 
-        self._cw_logs.logs(app_region, resources)
+        self._cw_logs.logs(app_region, resources, user_data)
+        size.measure('logs', app_template)
         self._add_kms_iam_policy(app_region, resources)
         self._add_cloudwatch_iam_policy(app_region, resources)
-        self._cache_factory.add_caches(app_region, app_template)
-        secret_params = self._rds_factory.add_rds(app_region, app_template)
+        size.measure('iam', app_template)
+        self._cache_factory.add_caches(app_region, app_template, user_data)
+        size.measure('caches', app_template)
+        secret_params = self._rds_factory.add_rds(app_region, app_template,
+                                                  user_data)
+        size.measure('rds', app_template)
+        user_data.render(resources)
+        size.measure('user_data', app_template)
 
         # Order matters: SpotFleet AFTER Asg/Lc have been fully configured:
         self._spot_decorator.spotify(app_region, app_template)
+        size.measure('spot', app_template)
+        size.log()
 
         return app_template, secret_params
 
@@ -369,9 +377,10 @@ class AppTemplate(BaseTemplateCache):
         }
 
     @staticmethod
-    def _user_data(params, app_region):
-        systemd = {}
-        files = {}
+    def _user_data(params, app_region, user_data=None):
+        user_data = user_data or UserData()
+        systemd = user_data.systemd
+        files = user_data.files
         if app_region.services:
             for service_name, service in app_region.services.items():
                 if isinstance(service.unit_file, six.string_types):
@@ -403,17 +412,9 @@ class AppTemplate(BaseTemplateCache):
                 else:
                     files[file_name] = file_params
 
-        user_data = ''
-        if systemd:
-            user_data += ',"systemd":' + json.dumps(systemd, sort_keys=True)
-        if files:
-            user_data += ',"files":' + json.dumps(files, sort_keys=True)
-
         if app_region.volumes:
             params['VolumeSupport']['Default'] = 'true'
-            user_data += ',"volumes":' + json.dumps(app_region.volumes,
-                                                    sort_keys=True)
+            user_data.volumes = app_region.volumes
 
-        if app_region.cw_stats:
-            user_data += ',"stats":true'
-        return user_data
+        user_data.stats = bool(app_region.cw_stats)
+        return user_data.parameter()
@@ -1,5 +1,5 @@
-from copy import deepcopy
 import json
+import marshal
 import os
 
 from spacel.provision.app.base_decorator import BaseTemplateDecorator
@@ -21,17 +21,28 @@ class BaseTemplateCache(BaseTemplateDecorator):
         """
         Load raw template.
         :param template: Template name.
-        :return: JSON-decoded template.
+        :return: JSON-decoded template, safe to modify.
         """
+        # Templates are cached as frozen marshal snapshots: unmarshalling a
+        # fresh copy is much cheaper than `deepcopy`, and nothing a caller
+        # does to its copy can leak into the cache.
         cached = self._cache.get(template)
-        if cached:
-            return deepcopy(cached)
+        if cached is None:
+            template_path = os.path.join(self._path, '%s.template' % template)
+            with open(template_path) as template_in:
+                loaded = json.loads(template_in.read())
+            cached = marshal.dumps(loaded)
+            self._cache[template] = cached
+        return marshal.loads(cached)
 
-        template_path = os.path.join(self._path, '%s.template' % template)
-        with open(template_path) as template_in:
-            loaded = json.loads(template_in.read())
-            self._cache[template] = loaded
-            return deepcopy(loaded)
+    @staticmethod
+    def _clone(fragment):
+        """
+        Copy a template fragment.
+        :param fragment: JSON-decoded fragment.
+        :return: Copy, safe to modify.
+        """
+        return marshal.loads(marshal.dumps(fragment))
 
     @staticmethod
     def _get_name_tag(resource_props):
@@ -55,7 +66,7 @@ class BaseTemplateCache(BaseTemplateDecorator):
             subnet_param = '%sSubnet%02d' % (subnet_type, az_index)
 
             # Each AZ should be declared as a parameter:
-            params[subnet_param] = deepcopy(base_subnet)
+            params[subnet_param] = BaseTemplateCache._clone(base_subnet)
             params[subnet_param]['Description'] = 'Generated subnet parameter.'
             params[subnet_param]['Default'] = subnet
 
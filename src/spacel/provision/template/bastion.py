@@ -1,5 +1,4 @@
 import logging
-from copy import deepcopy
 
 from spacel.provision.template.base import BaseTemplateCache
 
@@ -52,7 +51,7 @@ class BastionTemplate(BaseTemplateCache):
             base_dns = resources['DnsRecord01']
 
             # Create `bastion01` record for consistency:
-            eip_dns = deepcopy(base_dns)
+            eip_dns = self._clone(base_dns)
             (eip_dns['Properties']
              ['RecordSets'][0]
              ['Name']
@@ -69,7 +68,7 @@ class BastionTemplate(BaseTemplateCache):
                 eip_list.append({'Fn::GetAtt': [eip_name, 'AllocationId']})
 
                 # Add a unique DNS alias:
-                eip_dns = deepcopy(base_dns)
+                eip_dns = self._clone(base_dns)
                 dns_recordset = eip_dns['Properties']['RecordSets'][0]
                 dns_label = 'bastion%02d' % bastion_index
                 dns_recordset['Name']['Fn::Join'][1].insert(0, dns_label)
@@ -1,5 +1,3 @@
-from copy import deepcopy
-
 from spacel.provision.template.base import BaseTemplateCache
 
 
@@ -37,12 +35,12 @@ class VpcTemplate(BaseTemplateCache):
             az_param = 'Az%02d' % az_index
 
             # Each AZ should be declared as a parameter:
-            params[az_param] = deepcopy(base_az)
+            params[az_param] = self._clone(base_az)
             params[az_param]['Description'] = 'Generated AZ parameter.'
             params[az_param]['Default'] = az
 
             # Replicate route tables:
-            rt_clone = deepcopy(resources['PrivateRouteTable01'])
+            rt_clone = self._clone(resources['PrivateRouteTable01'])
             rt_name = self._get_name_tag(rt_clone['Properties'])
             rt_name['Fn::Join'][1][1] = 'Private%02d' % az_index
             private_rt_resource = 'PrivateRouteTable%02d' % az_index
@@ -73,7 +71,7 @@ class VpcTemplate(BaseTemplateCache):
 
             if orbit_region.private_nat_gateway:
                 # Each AZ _can_ have a NAT gateway:
-                nat_eip_clone = deepcopy(base_nat_eip)
+                nat_eip_clone = self._clone(base_nat_eip)
                 nat_eip_clone['Condition'] = 'MultiAzNat'
                 nat_eip_resource = 'NatEip%02d' % az_index
                 resources[nat_eip_resource] = nat_eip_clone
@@ -83,7 +81,7 @@ class VpcTemplate(BaseTemplateCache):
                 }
 
                 # Each AZ _can_ have a NAT gateway:
-                nat_gateway_clone = deepcopy(base_nat_gateway)
+                nat_gateway_clone = self._clone(base_nat_gateway)
                 nat_gateway_clone['Condition'] = 'MultiAzNat'
                 nat_gateway_props = nat_gateway_clone['Properties']
                 nat_gateway_props['SubnetId']['Ref'] = nat_subnet_resource
@@ -93,7 +91,7 @@ class VpcTemplate(BaseTemplateCache):
                 resources[nat_gateway_resource] = nat_gateway_clone
 
                 # Each private route table has a default NAT route:
-                private_default_route_clone = deepcopy(base_default_route)
+                private_default_route_clone = self._clone(base_default_route)
                 private_route_props = private_default_route_clone['Properties']
                 private_route_props['RouteTableId']['Ref'] = private_rt_resource
                 private_route_props['NatGatewayId'] = {
@@ -126,7 +124,7 @@ class VpcTemplate(BaseTemplateCache):
     def _add_subnet(self, resources, outputs, az_index, az, label, cidr,
                     rt=None):
         subnet_resource = '%sSubnet%02d' % (label, az_index)
-        subnet_clone = deepcopy(resources['%sSubnet01' % label])
+        subnet_clone = self._clone(resources['%sSubnet01' % label])
         subnet_props = subnet_clone['Properties']
         subnet_props['CidrBlock']['Fn::Join'][1][1] = '.%d.0/24' % cidr
         subnet_props['AvailabilityZone']['Ref'] = az
@@ -140,7 +138,7 @@ class VpcTemplate(BaseTemplateCache):
             }
 
         base_rta = '%sSubnet01RouteTableAssociation' % label
-        rta_clone = deepcopy(resources[base_rta])
+        rta_clone = self._clone(resources[base_rta])
         rta_props = rta_clone['Properties']
         rta_props['SubnetId']['Ref'] = subnet_resource
         if rt:
@@ -0,0 +1,119 @@
+import calendar
+import csv
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger('spacel.provision.trace')
+
+CSV_FIELDS = ('region', 'stack', 'name', 'category', 'start', 'end',
+              'seconds', 'status')
+
+
+def timestamp(event_time):
+    """
+    Convert a (UTC) datetime to seconds since the epoch.
+    :param event_time: datetime, i.e. of a stack event.
+    :return: Seconds since epoch.
+    """
+    return (calendar.timegm(event_time.utctimetuple()) +
+            event_time.microsecond / 1e6)
+
+
+class DeployTrace(object):
+    """
+    Timeline of a deploy: phases of each stack and the change of each
+    resource, per region.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._spans = []
+
+    def span(self, region, stack, name, category, start, end, status=None):
+        """
+        Record a span.
+        :param region: Region.
+        :param stack: Stack name.
+        :param name: Span name (i.e. resource logical id, phase).
+        :param category: Span category (i.e. resource type, "phase").
+        :param start: Start, seconds since epoch.
+        :param end: End, seconds since epoch.
+        :param status: Final status, if any.
+        """
+        with self._lock:
+            self._spans.append({
+                'region': region,
+                'stack': stack,
+                'name': name,
+                'category': category,
+                'start': start,
+                'end': end,
+                'seconds': round(end - start, 3),
+                'status': status
+            })
+
+    def write(self, path):
+        """
+        Write the trace, as Chrome trace events and CSV (with a `.csv`
+        extension, appended if the trace path already has it).
+        :param path: Trace path.
+        """
+        with self._lock:
+            spans = sorted(self._spans, key=lambda s: s['start'])
+        with open(path, 'w') as trace_out:
+            json.dump(self.trace_events(spans), trace_out, indent=1)
+
+        csv_path = os.path.splitext(path)[0] + '.csv'
+        if csv_path == path:
+            csv_path = path + '.csv'
+        with open(csv_path, 'w') as csv_out:
+            writer = csv.DictWriter(csv_out, CSV_FIELDS)
+            writer.writeheader()
+            writer.writerows(spans)
+        logger.info('Wrote %s spans to %s and %s.', len(spans), path,
+                    csv_path)
+
+    @staticmethod
+    def trace_events(spans):
+        """
+        Convert spans to Chrome trace events: a process per region, a thread
+        per stack phase and resource.
+        :param spans: Spans, sorted by start.
+        :return: Trace event JSON.
+        """
+        if not spans:
+            return {'traceEvents': []}
+        origin = spans[0]['start']
+        pids = {}
+        tids = {}
+        events = []
+        for span in spans:
+            region = span['region']
+            if region not in pids:
+                pids[region] = len(pids) + 1
+                events.append({'name': 'process_name', 'ph': 'M',
+                               'pid': pids[region],
+                               'args': {'name': region}})
+            pid = pids[region]
+
+            thread = (region, span['stack'], span['category'] == 'phase'
+                      and 'phases' or span['name'])
+            if thread not in tids:
+                tids[thread] = len(tids) + 1
+                events.append({'name': 'thread_name', 'ph': 'M',
+                               'pid': pid, 'tid': tids[thread],
+                               'args': {'name': '%s/%s' % thread[1:]}})
+
+            events.append({
+                'name': span['name'],
+                'cat': span['category'],
+                'ph': 'X',
+                'pid': pid,
+                'tid': tids[thread],
+                'ts': int((span['start'] - origin) * 1e6),
+                'dur': int((span['end'] - span['start']) * 1e6),
+                'args': {'stack': span['stack'], 'status': span['status']}
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
@@ -1,4 +1,5 @@
 from .acm import AcmCertificates
+from .data_key import DataKeyCache
 from .kms_crypt import KmsCrypto, EncryptedPayload
 from .kms_key import KmsKeyFactory
 from .password import PasswordManager
@@ -1,64 +1,151 @@
 import logging
-from tldextract import extract
+
+from spacel.cache import KeyedLocks
 
 logger = logging.getLogger('spacel.security.acm')
 
+# Certificates are issued and revoked out of band, don't trust a list long:
+DEFAULT_TTL = 60 * 60
+
+# Trie node key holding a pattern's certificate:
+ARN = ''
+
+
+class CertificateIndex(object):
+    """
+    Certificates of a region, by exact domain and by wildcard pattern.
+
+    Wildcard patterns are stored in a trie of reversed labels (i.e.
+    `*.example.com` as com -> example -> *), where `*` matches exactly one
+    label.
+    """
+
+    def __init__(self, certificates):
+        """
+        :param certificates: Certificate summaries (DomainName and
+         CertificateArn), first listed wins.
+        """
+        self._exact = {}
+        self._wildcards = {}
+        for certificate in certificates:
+            domain = certificate['DomainName']
+            arn = certificate['CertificateArn']
+            if '*' not in domain:
+                self._exact.setdefault(domain, arn)
+                continue
+            node = self._wildcards
+            for label in reversed(domain.split('.')):
+                node = node.setdefault(label, {})
+            node.setdefault(ARN, arn)
+
+    def get(self, hostname):
+        """
+        Find the certificate for a hostname.
+        :param hostname: Hostname.
+        :return: Certificate ARN (exact match, else the wildcard pattern with
+         the fewest wildcards), None if not found.
+        """
+        arn = self._exact.get(hostname)
+        if arn:
+            logger.debug('Found exact match for "%s": %s"', hostname, arn)
+            return arn
+
+        labels = list(reversed(hostname.split('.')))
+        match = self._match(self._wildcards, labels, 0, None)
+        if match:
+            arn, stars = match
+            logger.debug('Found wildcard match for "%s": %s (%s)', hostname,
+                         arn, stars)
+            return arn
+        return None
+
+    def _match(self, node, labels, stars, best):
+        if best and stars >= best[1]:
+            return best
+        if not labels:
+            arn = node.get(ARN)
+            if arn and stars:
+                return arn, stars
+            return best
+
+        # Exact labels first: on a tie, the most specific suffix wins.
+        label, remaining = labels[0], labels[1:]
+        child = node.get(label)
+        if child and label != '*':
+            best = self._match(child, remaining, stars, best)
+        child = node.get('*')
+        if child:
+            best = self._match(child, remaining, stars + 1, best)
+        return best
+
 
 class AcmCertificates(object):
-    def __init__(self, clients):
+    """
+    Resolves ACM certificates for hostnames.
+
+    Each region's issued certificates are listed once, then indexed in
+    memory and (optionally) on disk.
+    """
+
+    def __init__(self, clients, cache=None, refresh=False):
+        """
+        :param clients: ClientCache.
+        :param cache: DiskCache for certificate lists, None to only cache in
+         memory.
+        :param refresh: Ignore cached certificate lists.
+        """
         self._clients = clients
+        self._cache = cache
+        self._refresh = refresh
+        self._indexes = {}
+        self._locks = KeyedLocks()
 
     def get_certificate(self, region, hostname):
         logger.debug('Looking up certificate for "%s".', hostname)
 
-        host_wildcards = self._get_wildcards(hostname)
-        logger.debug('Resolved wildcards: %s', host_wildcards)
-        acm = self._clients.acm(region)
-
-        wildcard_cert = None
-        wildcard_count = 100
-
-        # Iterate certificates:
-        for acm_cert in self._get_certificates(acm):
-            cert_domain = acm_cert['DomainName']
-            cert_arn = acm_cert['CertificateArn']
-
-            # Stop search if exact match is found:
-            if cert_domain == hostname:
-                logger.debug('Found exact match for "%s": %s"', hostname,
-                             cert_arn)
-                return cert_arn
-
-            if cert_domain in host_wildcards:
-                star_count = cert_domain.count('*')
-                if star_count < wildcard_count:
-                    wildcard_count = star_count
-                    wildcard_cert = cert_arn
-
-        if wildcard_cert:
-            logger.debug('Found wildcard match for "%s": %s (%s)', hostname,
-                         wildcard_cert, wildcard_count)
-        return wildcard_cert
-
-    @staticmethod
-    def _get_wildcards(hostname):
-        extracted = extract('http://%s' % hostname)
-        if not extracted.subdomain:
-            return []
-
-        common_domain = [extracted.domain, extracted.suffix]
-
-        wildcards = []
-        # For each subdomain component:
-        split_subdomain = extracted.subdomain.split('.')
-        for subdomain_index in range(len(split_subdomain)):
-            # Replace with wildcard, then concat to remaining bits:
-            wildcard_parts = ['*'] * (subdomain_index + 1) \
-                             + split_subdomain[subdomain_index + 1:]
-            wildcard_parts += common_domain
-            wildcards.append('.'.join(wildcard_parts))
-
-        return wildcards
+        # Regions are listed concurrently, each only once:
+        with self._locks.get(region):
+            index, cached = self._index(region)
+            cert = index.get(hostname)
+            if cert or not cached:
+                return cert
+
+            # Might be newer than the cached list:
+            logger.debug('No certificate for "%s" in cached list, '
+                         'listing %s.', hostname, region)
+            index, _ = self._index(region, refresh=True)
+            return index.get(hostname)
+
+    def _index(self, region, refresh=False):
+        index = self._indexes.get(region)
+        if index is not None and not refresh:
+            return index
+
+        certificates = None
+        key = None
+        if self._cache is not None:
+            key = self._key(region)
+            if not (refresh or self._refresh):
+                certificates = self._cache.get(key)
+
+        cached = certificates is not None
+        if not cached:
+            acm = self._clients.acm(region)
+            certificates = [{'DomainName': c['DomainName'],
+                             'CertificateArn': c['CertificateArn']}
+                            for c in self._get_certificates(acm)]
+            logger.debug('Found %s certificates in %s.', len(certificates),
+                         region)
+            if key:
+                self._cache.set(key, certificates)
+
+        index = CertificateIndex(certificates), cached
+        self._indexes[region] = index
+        return index
+
+    def _key(self, region):
+        # Certificates vary between accounts:
+        return '%s:%s' % (self._clients.account(region), region)
 
     @staticmethod
     def _get_certificates(acm):
@@ -0,0 +1,77 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger('spacel.security.data_key')
+
+DEFAULT_MAX_MESSAGES = 100
+DEFAULT_MAX_BYTES = 1024 * 1024
+DEFAULT_MAX_AGE = 5 * 60
+
+
+class DataKeyCache(object):
+    """
+    Reuses KMS data keys for several payloads, within limits.
+
+    Payloads encrypted with a reused key share its encrypted copy: anyone
+    able to decrypt one can decrypt the others.
+    """
+
+    def __init__(self, max_messages=DEFAULT_MAX_MESSAGES,
+                 max_bytes=DEFAULT_MAX_BYTES, max_age=DEFAULT_MAX_AGE,
+                 clock=time.time):
+        """
+        :param max_messages: Payloads encrypted with a data key.
+        :param max_bytes: Bytes encrypted with a data key.
+        :param max_age: Age of a data key, in seconds.
+        :param clock: Time source.
+        """
+        self._max_messages = max_messages
+        self._max_bytes = max_bytes
+        self._max_age = max_age
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._keys = {}
+
+    def get(self, key, size):
+        """
+        Get a data key to encrypt a payload with.
+        :param key: Key (i.e. KMS alias and region).
+        :param size: Bytes to encrypt.
+        :return: generate_data_key response, None if none can be reused.
+        """
+        with self._lock:
+            entry = self._keys.get(key)
+            if not entry:
+                return None
+            if self._clock() - entry['created'] > self._max_age or \
+                    entry['messages'] >= self._max_messages or \
+                    entry['bytes'] + size > self._max_bytes:
+                logger.debug('Data key for %s used up, discarding.', key)
+                del self._keys[key]
+                return None
+            entry['messages'] += 1
+            entry['bytes'] += size
+            return entry['data_key']
+
+    def put(self, key, data_key, size):
+        """
+        Cache a fresh data key, already used for a payload.
+        :param key: Key (i.e. KMS alias and region).
+        :param data_key: generate_data_key response.
+        :param size: Bytes encrypted.
+        """
+        with self._lock:
+            self._keys[key] = {
+                'data_key': data_key,
+                'created': self._clock(),
+                'messages': 1,
+                'bytes': size
+            }
+
+    def clear(self):
+        """
+        Discard every data key.
+        """
+        with self._lock:
+            self._keys.clear()
@@ -19,9 +19,16 @@ class KmsCrypto(object):
     Uses KMS to encrypt/decrypt data with AES-256.
     """
 
-    def __init__(self, clients, kms_key):
+    def __init__(self, clients, kms_key, data_keys=None):
+        """
+        :param clients: ClientCache.
+        :param kms_key: KmsKeyFactory.
+        :param data_keys: DataKeyCache, to reuse data keys (else one per
+         payload).
+        """
         self._kms_key = kms_key
         self._clients = clients
+        self._data_keys = data_keys
         self._random = Random.new()
 
     def encrypt(self, app_region, plaintext, create_key=True):
@@ -32,22 +39,6 @@ class KmsCrypto(object):
         :param create_key: Create key if missing (else fail).
         :return: EncryptedPayload.
         """
-        region = app_region.region
-        # Get DEK:
-        logger.debug('Fetching fresh data key...')
-        try:
-            alias_name = self._kms_key.get_key_alias(app_region)
-            kms = self._clients.kms(region)
-            data_key = kms.generate_data_key(KeyId=alias_name,
-                                             KeySpec='AES_256')
-        except ClientError as e:
-            e_message = e.response['Error'].get('Message', '')
-            if create_key and 'is not found' in e_message:
-                # Key not found, create and try again:
-                self._kms_key.create_key(app_region)
-                return self.encrypt(app_region, plaintext)
-            raise e
-
         # Encode and pad data:
         encoding = 'bytes'
         if isinstance(plaintext, six.string_types):
@@ -61,6 +52,10 @@ class KmsCrypto(object):
         logger.debug('Padded %s %s to %s.', len(plaintext), encoding,
                      len(padded))
 
+        # Get DEK:
+        region = app_region.region
+        data_key = self._data_key(app_region, len(padded), create_key)
+
         logger.debug('Encrypting data with data key...')
         iv = self._random.read(BLOCK_SIZE)
 
@@ -70,6 +65,33 @@ class KmsCrypto(object):
         encrypted_key = data_key['CiphertextBlob']
         return EncryptedPayload(iv, ciphertext, encrypted_key, region, encoding)
 
+    def _data_key(self, app_region, size, create_key):
+        alias_name = self._kms_key.get_key_alias(app_region)
+        region = app_region.region
+        cache_key = (alias_name, region)
+        if self._data_keys is not None:
+            data_key = self._data_keys.get(cache_key, size)
+            if data_key:
+                logger.debug('Reusing data key...')
+                return data_key
+
+        logger.debug('Fetching fresh data key...')
+        try:
+            kms = self._clients.kms(region)
+            data_key = kms.generate_data_key(KeyId=alias_name,
+                                             KeySpec='AES_256')
+        except ClientError as e:
+            e_message = e.response['Error'].get('Message', '')
+            if create_key and 'is not found' in e_message:
+                # Key not found, create and try again:
+                self._kms_key.create_key(app_region)
+                return self._data_key(app_region, size, False)
+            raise e
+
+        if self._data_keys is not None:
+            self._data_keys.put(cache_key, data_key, size)
+        return data_key
+
     def decrypt_payload(self, payload):
         """
         Decrypt an encrypted payload.
@@ -1,13 +1,29 @@
 import logging
 
 from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
+
+from spacel.cache import KeyedLocks
 
 logger = logging.getLogger('spacel.security.kms_key')
 
 
 class KmsKeyFactory(object):
-    def __init__(self, clients):
+    """
+    Finds (and creates) application keys, caching key metadata by alias and
+    region for the life of the factory.
+    """
+
+    def __init__(self, clients, max_workers=8):
+        """
+        :param clients: ClientCache.
+        :param max_workers: Regions resolved concurrently by `prefetch`.
+        """
         self._clients = clients
+        self._max_workers = max_workers
+        # (alias, region) -> KeyMetadata, None if the key doesn't exist:
+        self._keys = {}
+        self._locks = KeyedLocks()
 
     @staticmethod
     def get_key_alias(app_region):
@@ -28,29 +44,43 @@ class KmsKeyFactory(object):
         """
         alias_name = self.get_key_alias(app_region)
         region = app_region.region
-        logger.debug('Finding key for "%s" in %s.', alias_name, region)
-        try:
-            kms = self._clients.kms(region)
-            existing_key = kms.describe_key(KeyId=alias_name)
-            logger.debug('Found existing key "%s" in %s.', alias_name, region)
-            existing_key = existing_key['KeyMetadata']
-            key_arn = existing_key['Arn']
-            if not existing_key['Enabled']:
-                logger.warning('Key %s is disabled.', key_arn)
+        key = (alias_name, region)
+        with self._locks.get(key):
+            if key in self._keys:
+                existing_key = self._keys[key]
+            else:
+                existing_key = self._describe_key(alias_name, region)
+                self._keys[key] = existing_key
+
+            if existing_key:
+                key_arn = existing_key['Arn']
+                if not existing_key['Enabled']:
+                    logger.warning('Key %s is disabled.', key_arn)
+                    return None
+                return key_arn
+
+            if create:
+                logger.debug('Unable to find key "%s", creating...',
+                             alias_name)
+                return self._create_key(alias_name, region)
+            else:
+                logger.debug('Unable to find key "%s".', alias_name)
                 return None
-            return key_arn
-        except ClientError as e:
-            e_message = e.response['Error'].get('Message', '')
-            if 'Invalid keyId' not in e_message and \
-                            'is not found' not in e_message:
-                raise e
 
-        if create:
-            logger.debug('Unable to find key "%s", creating...', alias_name)
-            return self.create_key(app_region)
-        else:
-            logger.debug('Unable to find key "%s".', alias_name)
-            return None
+    def prefetch(self, app_regions):
+        """
+        Resolve keys for several regions concurrently, without creating.
+        :param app_regions: SpaceAppRegions.
+        :return: Dict of region to KMS key ARN (None if missing or disabled).
+        """
+        app_regions = list(app_regions)
+        workers = max(1, min(self._max_workers, len(app_regions)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            keys = {app_region.region: executor.submit(self.get_key,
+                                                       app_region,
+                                                       create=False)
+                    for app_region in app_regions}
+        return {region: key.result() for region, key in keys.items()}
 
     def create_key(self, app_region):
         """
@@ -60,7 +90,24 @@ class KmsKeyFactory(object):
         """
         alias_name = self.get_key_alias(app_region)
         region = app_region.region
+        with self._locks.get((alias_name, region)):
+            return self._create_key(alias_name, region)
+
+    def _describe_key(self, alias_name, region):
+        logger.debug('Finding key for "%s" in %s.', alias_name, region)
+        try:
+            kms = self._clients.kms(region)
+            existing_key = kms.describe_key(KeyId=alias_name)
+            logger.debug('Found existing key "%s" in %s.', alias_name, region)
+            return existing_key['KeyMetadata']
+        except ClientError as e:
+            e_message = e.response['Error'].get('Message', '')
+            if 'Invalid keyId' not in e_message and \
+                            'is not found' not in e_message:
+                raise e
+        return None
 
+    def _create_key(self, alias_name, region):
         kms = self._clients.kms(region)
         new_key = kms.create_key()
         key_arn = new_key['KeyMetadata']['Arn']
@@ -81,4 +128,5 @@ class KmsKeyFactory(object):
             )
             raise e
         logger.debug('Created key "%s" in %s.', alias_name, region)
+        self._keys[(alias_name, region)] = new_key['KeyMetadata']
         return key_arn
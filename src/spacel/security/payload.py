@@ -1,6 +1,6 @@
 import json
 
-from spacel.provision import base64_encode, base64_decode
+from spacel.encoding import base64_encode, base64_decode
 
 
 class EncryptedPayload(object):
@@ -1,18 +1,29 @@
 import json
+import socket
+import threading
+import time
 import unittest
 from io import BytesIO
 
 from mock import MagicMock, patch
+from six.moves.urllib.error import HTTPError, URLError
 
-from spacel.aws.ami import AmiFinder
+from spacel.aws.ami import AmiFinder, SPACEL_URL
+from spacel.cache import DiskCache
 
 AMI = 'ami-123456'
+OTHER_AMI = 'ami-654321'
 REGION = 'us-west-2'
+URL = SPACEL_URL % 'stable'
+ETAG = '"abc123"'
+LAST_MODIFIED = 'Sat, 17 Oct 2026 12:00:00 GMT'
 
 
 class TestAmiFinder(unittest.TestCase):
     def setUp(self):
-        self.ami_finder = AmiFinder()
+        self.cache = MagicMock(spec=DiskCache)
+        self.cache.get.return_value = None
+        self.ami_finder = AmiFinder(cache=self.cache)
 
     def test_spacel_ami(self):
         self.ami_finder._ami = MagicMock(return_value=AMI)
@@ -28,6 +39,15 @@ class TestAmiFinder(unittest.TestCase):
         ami = self.ami_finder.spacel_ami(REGION)
 
         self.assertEqual(AMI, ami)
+        request = mock_urlopen.call_args[0][0]
+        self.assertEqual(URL, request.get_full_url())
+        self.assertEqual(10, mock_urlopen.call_args[1]['timeout'])
+        self.cache.set.assert_called_once_with(URL, {
+            'manifest': {REGION: AMI},
+            'etag': ETAG,
+            'last_modified': LAST_MODIFIED,
+            'time': self.cache.set.call_args[0][1]['time']
+        })
 
     @patch('spacel.aws.ami.urlopen')
     def test_ami_found_cache(self, mock_urlopen):
@@ -41,16 +61,105 @@ class TestAmiFinder(unittest.TestCase):
     @patch('spacel.aws.ami.urlopen')
     def test_ami_found_cache_bust(self, mock_urlopen):
         self.ami_finder.cache_bust = True
+        self._mock_cached(0)
         self._mock_response(mock_urlopen)
 
         self.ami_finder.spacel_ami(REGION)
         self.ami_finder.spacel_ami(REGION)
 
-        self.assertEqual(2, mock_urlopen.call_count)
+        self.assertEqual(1, mock_urlopen.call_count)
+        request = mock_urlopen.call_args[0][0]
+        self.assertIn('?cache=', request.get_full_url())
+        self.assertIsNone(request.get_header('If-none-match'))
+
+    @patch('spacel.aws.ami.urlopen')
+    def test_ami_single_flight(self, mock_urlopen):
+        self._mock_response(mock_urlopen)
+        response = mock_urlopen.side_effect
+
+        def slow_response(request, timeout=None):
+            time.sleep(0.05)
+            return response(request, timeout)
+
+        mock_urlopen.side_effect = slow_response
+        threads = [threading.Thread(target=self.ami_finder.spacel_ami,
+                                    args=(REGION,)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, mock_urlopen.call_count)
+
+    @patch('spacel.aws.ami.urlopen')
+    def test_ami_disk_cache(self, mock_urlopen):
+        self._mock_cached(0)
+
+        ami = self.ami_finder.spacel_ami(REGION)
+
+        self.assertEqual(OTHER_AMI, ami)
+        mock_urlopen.assert_not_called()
+
+    @patch('spacel.aws.ami.urlopen')
+    def test_ami_disk_cache_modified(self, mock_urlopen):
+        self._mock_cached(7200)
+        self._mock_response(mock_urlopen)
+
+        ami = self.ami_finder.spacel_ami(REGION)
+
+        self.assertEqual(AMI, ami)
+        request = mock_urlopen.call_args[0][0]
+        self.assertEqual(ETAG, request.get_header('If-none-match'))
+        self.assertEqual(LAST_MODIFIED,
+                         request.get_header('If-modified-since'))
+
+    @patch('spacel.aws.ami.urlopen')
+    def test_ami_disk_cache_not_modified(self, mock_urlopen):
+        self._mock_cached(7200)
+        mock_urlopen.side_effect = HTTPError(URL, 304, 'Not Modified', {},
+                                             None)
+
+        ami = self.ami_finder.spacel_ami(REGION)
+
+        self.assertEqual(OTHER_AMI, ami)
+        cached = self.cache.set.call_args[0][1]
+        self.assertEqual({REGION: OTHER_AMI}, cached['manifest'])
+        self.assertTrue(time.time() - cached['time'] < 60)
+
+    @patch('spacel.aws.ami.urlopen')
+    def test_ami_disk_cache_stale(self, mock_urlopen):
+        self._mock_cached(7200)
+        mock_urlopen.side_effect = socket.timeout('timed out')
+
+        ami = self.ami_finder.spacel_ami(REGION)
+
+        self.assertEqual(OTHER_AMI, ami)
+        self.cache.set.assert_not_called()
+
+    @patch('spacel.aws.ami.urlopen')
+    def test_ami_error(self, mock_urlopen):
+        mock_urlopen.side_effect = URLError('kaboom')
+
+        self.assertRaises(URLError, self.ami_finder.spacel_ami, REGION)
+
+    def _mock_cached(self, age):
+        self.cache.get.return_value = {
+            'manifest': {REGION: OTHER_AMI},
+            'etag': ETAG,
+            'last_modified': LAST_MODIFIED,
+            'time': time.time() - age
+        }
 
     @staticmethod
     def _mock_response(mock_urlopen):
-        response_bytes = json.dumps({
-            REGION: AMI
-        }).encode('utf-8')
-        mock_urlopen.side_effect = lambda x: BytesIO(response_bytes)
+        def response(request, timeout=None):
+            opened = BytesIO(json.dumps({
+                REGION: AMI
+            }).encode('utf-8'))
+            opened.info = lambda: {
+                'ETag': ETAG,
+                'Last-Modified': LAST_MODIFIED
+            }
+            return opened
+
+        mock_urlopen.side_effect = response
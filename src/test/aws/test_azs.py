@@ -0,0 +1,73 @@
+import shutil
+import tempfile
+import unittest
+
+from mock import MagicMock
+
+from spacel.aws import ClientCache
+from spacel.aws.azs import AvailabilityZones
+from spacel.cache import DiskCache
+
+REGION = 'us-west-2'
+ACCOUNT = '1234567890'
+
+
+class TestAvailabilityZones(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.ec2 = MagicMock()
+        self.ec2.describe_availability_zones.return_value = {
+            'AvailabilityZones': [
+                {'ZoneName': 'us-west-2b'},
+                {'ZoneName': 'us-west-2a'}
+            ]
+        }
+        self.clients = MagicMock(spec=ClientCache)
+        self.clients.ec2.return_value = self.ec2
+        self.clients.account.return_value = ACCOUNT
+        self.azs = self._azs()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_azs(self):
+        azs = self.azs.azs(REGION)
+
+        self.assertEquals(['us-west-2a', 'us-west-2b'], azs)
+        self.clients.ec2.assert_called_once_with(REGION)
+
+    def test_azs_memory(self):
+        self.azs.azs(REGION)
+        self.azs.azs(REGION)
+
+        self.ec2.describe_availability_zones.assert_called_once()
+        self.clients.account.assert_called_once_with(REGION)
+
+    def test_azs_disk(self):
+        self.azs.azs(REGION)
+
+        azs = self._azs().azs(REGION)
+
+        self.assertEquals(['us-west-2a', 'us-west-2b'], azs)
+        self.ec2.describe_availability_zones.assert_called_once()
+
+    def test_azs_refresh(self):
+        self.azs.azs(REGION)
+
+        azs = self._azs(refresh=True).azs(REGION)
+
+        self.assertEquals(['us-west-2a', 'us-west-2b'], azs)
+        self.assertEquals(2, self.ec2.describe_availability_zones.call_count)
+
+    def test_azs_per_account(self):
+        self.azs.azs(REGION)
+        self.clients.account.return_value = '0987654321'
+
+        self._azs().azs(REGION)
+
+        self.assertEquals(2, self.ec2.describe_availability_zones.call_count)
+
+    def _azs(self, refresh=False):
+        return AvailabilityZones(self.clients,
+                                 cache=DiskCache('azs', path=self.path),
+                                 refresh=refresh)
@@ -1,6 +1,7 @@
 import unittest
 
-from mock import patch, MagicMock
+from concurrent.futures import ThreadPoolExecutor
+from mock import patch, MagicMock, ANY
 
 from spacel.aws.clients import ClientCache
 from test import ORBIT_REGION
@@ -8,35 +9,73 @@ from test import ORBIT_REGION
 
 class TestClientCache(unittest.TestCase):
     def setUp(self):
-        self.clients = ClientCache()
+        self.session = MagicMock()
+        self.clients = ClientCache(session=self.session)
 
-    @patch('spacel.aws.clients.boto3')
-    def test_cloudformation(self, mock_boto3):
+    def test_cloudformation(self):
         self.clients.cloudformation(ORBIT_REGION)
-        mock_boto3.client.assert_called_once_with('cloudformation',
-                                                  ORBIT_REGION)
+        self.session.client.assert_called_once_with('cloudformation',
+                                                    ORBIT_REGION,
+                                                    config=ANY)
 
-    @patch('spacel.aws.clients.boto3')
-    def test_ec2(self, mock_boto3):
+    def test_ec2(self):
         self.clients.ec2(ORBIT_REGION)
-        mock_boto3.client.assert_called_once_with('ec2', ORBIT_REGION)
+        self.session.client.assert_called_once_with('ec2', ORBIT_REGION,
+                                                    config=ANY)
 
-    @patch('spacel.aws.clients.boto3')
-    def test_ec2_cached(self, mock_boto3):
+    def test_ec2_cached(self):
         self.clients.ec2(ORBIT_REGION)
         self.clients.ec2(ORBIT_REGION)
-        self.assertEqual(1, mock_boto3.client.call_count)
+        self.assertEqual(1, self.session.client.call_count)
 
-    @patch('spacel.aws.clients.boto3')
-    def test_s3(self, mock_boto3):
+    def test_ec2_concurrent(self):
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(self.clients.ec2,
+                                        [ORBIT_REGION] * 8))
+        self.assertEqual(1, self.session.client.call_count)
+        self.assertEqual(1, len(set(id(client) for client in results)))
+
+    def test_s3(self):
         self.clients.s3(ORBIT_REGION)
-        mock_boto3.resource.assert_called_once_with('s3', ORBIT_REGION)
+        self.session.resource.assert_called_once_with('s3', ORBIT_REGION,
+                                                      config=ANY)
 
-    @patch('spacel.aws.clients.boto3')
-    def test_s3_cached(self, mock_boto3):
+    def test_s3_cached(self):
         self.clients.s3(ORBIT_REGION)
         self.clients.s3(ORBIT_REGION)
-        self.assertEqual(1, mock_boto3.resource.call_count)
+        self.assertEqual(1, self.session.resource.call_count)
+
+    def test_s3_client(self):
+        self.clients.s3(ORBIT_REGION)
+        self.clients.s3(ORBIT_REGION, resource=False)
+        self.session.client.assert_called_once_with('s3', ORBIT_REGION,
+                                                    config=ANY)
+        self.assertEqual(1, self.session.resource.call_count)
+
+    def test_config(self):
+        clients = ClientCache(session=self.session, max_pool_connections=5,
+                              retry_mode='standard', max_attempts=3)
+        clients.ec2(ORBIT_REGION)
+
+        config = self.session.client.call_args[1]['config']
+        self.assertEqual(5, config.max_pool_connections)
+        self.assertEqual({'mode': 'standard', 'max_attempts': 3},
+                         config.retries)
+
+    def test_hooks(self):
+        hook = MagicMock()
+        clients = ClientCache(session=self.session, hooks=(hook,))
+
+        ec2 = clients.ec2(ORBIT_REGION)
+        s3 = clients.s3(ORBIT_REGION)
+
+        hook.install.assert_any_call(ec2, 'ec2', ORBIT_REGION)
+        hook.install.assert_any_call(s3.meta.client, 's3', ORBIT_REGION)
+
+    @patch('spacel.aws.clients.boto3')
+    def test_default_session(self, mock_boto3):
+        ClientCache()
+        mock_boto3.Session.assert_called_once_with()
 
     def test_kms(self):
         self.clients._client = MagicMock()
@@ -57,3 +96,29 @@ class TestClientCache(unittest.TestCase):
         self.clients._client = MagicMock()
         self.clients.logs(ORBIT_REGION)
         self.clients._client.assert_called_with('logs', ORBIT_REGION)
+
+    def test_sts(self):
+        self.clients._client = MagicMock()
+        self.clients.sts(ORBIT_REGION)
+        self.clients._client.assert_called_with('sts', ORBIT_REGION)
+
+    def test_account(self):
+        sts = self.session.client.return_value
+        sts.get_caller_identity.return_value = {'Account': '1234567890'}
+
+        account = self.clients.account(ORBIT_REGION)
+
+        self.assertEqual('1234567890', account)
+        self.session.client.assert_called_once_with('sts', ORBIT_REGION,
+                                                    config=ANY)
+
+    def test_account_cached(self):
+        sts = self.session.client.return_value
+        sts.get_caller_identity.return_value = {'Account': '1234567890'}
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            accounts = list(executor.map(self.clients.account,
+                                         [ORBIT_REGION, 'us-east-1'] * 4))
+
+        self.assertEqual(['1234567890'] * 8, accounts)
+        sts.get_caller_identity.assert_called_once_with()
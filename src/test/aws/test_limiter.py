@@ -0,0 +1,143 @@
+import logging
+import unittest
+
+import botocore.session
+from concurrent.futures import ThreadPoolExecutor
+from mock import ANY, MagicMock, patch
+
+from spacel.aws.limiter import RateLimiter, TokenBucket
+from test import ORBIT_REGION
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestTokenBucket(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.sleep = MagicMock(side_effect=self.clock.sleep)
+        self.bucket = TokenBucket(2, 2, clock=self.clock, sleep=self.sleep)
+
+    def test_acquire_burst(self):
+        waits = [self.bucket.acquire() for _ in range(2)]
+        self.assertEquals([0.0, 0.0], waits)
+        self.sleep.assert_not_called()
+
+    def test_acquire_rate(self):
+        waits = [self.bucket.acquire() for _ in range(4)]
+        self.assertEquals([0.0, 0.0, 0.5, 0.5], waits)
+
+    def test_acquire_refill(self):
+        self.bucket.acquire()
+        self.bucket.acquire()
+        self.clock.now += 10
+
+        waits = [self.bucket.acquire() for _ in range(3)]
+
+        self.assertEquals([0.0, 0.0, 0.5], waits)
+
+    def test_acquire_concurrent_reserves(self):
+        bucket = TokenBucket(1, 1, clock=self.clock, sleep=lambda _: None)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            waits = list(executor.map(lambda _: bucket.acquire(), range(4)))
+        self.assertEquals([0.0, 1.0, 2.0, 3.0], sorted(waits))
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limiter = RateLimiter(rate=1, burst=1, clock=self.clock,
+                                   sleep=self.clock.sleep)
+        self.key = ('cloudformation', ORBIT_REGION)
+
+    def test_install(self):
+        client = MagicMock()
+        self.limiter.install(client, 'cloudformation', ORBIT_REGION)
+        self.assertEquals(2, client.meta.events.register.call_count)
+
+    def test_before_send(self):
+        before_send = self.limiter._before_send(self.key)
+        for _ in range(3):
+            self.assertIsNone(before_send(request=MagicMock()))
+
+        stats = self.limiter.stats()[self.key]
+        self.assertEquals(3, stats['requests'])
+        self.assertEquals(2.0, stats['waited'])
+
+    def test_before_send_disabled(self):
+        limiter = RateLimiter(rate=0, sleep=self.fail)
+        before_send = limiter._before_send(self.key)
+        for _ in range(3):
+            before_send()
+        self.assertEquals(3, limiter.stats()[self.key]['requests'])
+
+    def test_before_send_per_region(self):
+        self.limiter._before_send(self.key)()
+        self.limiter._before_send(('cloudformation', 'us-east-1'))()
+
+        waited = [stats['waited'] for stats in self.limiter.stats().values()]
+        self.assertEquals([0.0, 0.0], waited)
+
+    def test_needs_retry_throttled(self):
+        needs_retry = self.limiter._needs_retry(self.key)
+        result = needs_retry(response=(MagicMock(), {
+            'Error': {'Code': 'Throttling'}
+        }), attempts=1)
+
+        self.assertIsNone(result)
+        self.assertEquals(1, self.limiter.stats()[self.key]['throttles'])
+
+    def test_needs_retry_ok(self):
+        needs_retry = self.limiter._needs_retry(self.key)
+        needs_retry(response=(MagicMock(), {}))
+        needs_retry(response=None)
+        self.assertEquals({}, self.limiter.stats())
+
+    @patch('spacel.aws.limiter.logger')
+    def test_log_stats(self, mock_logger):
+        before_send = self.limiter._before_send(self.key)
+        before_send()
+        before_send()
+        self.limiter._needs_retry(self.key)(response=(None, {
+            'Error': {'Code': 'Throttling'}
+        }))
+
+        self.limiter.log_stats()
+
+        mock_logger.log.assert_called_once_with(
+            logging.INFO, ANY, 'cloudformation', ORBIT_REGION, 2, 1, 1.0)
+
+    @patch('spacel.aws.limiter.logger')
+    def test_log_stats_unthrottled(self, mock_logger):
+        self.limiter._before_send(self.key)()
+
+        self.limiter.log_stats()
+
+        mock_logger.log.assert_called_once_with(
+            logging.DEBUG, ANY, 'cloudformation', ORBIT_REGION, 1, 0, 0.0)
+
+    def test_installed_hooks_fire(self):
+        session = botocore.session.get_session()
+        client = session.create_client('cloudformation', ORBIT_REGION,
+                                       aws_access_key_id='test',
+                                       aws_secret_access_key='test')
+        self.limiter.install(client, 'cloudformation', ORBIT_REGION)
+        # Fail before anything reaches the network:
+        client.meta.events.register_last('before-send',
+                                         self._short_circuit)
+
+        self.assertRaises(RuntimeError, client.describe_stacks)
+
+        self.assertEquals(1, self.limiter.stats()[self.key]['requests'])
+
+    @staticmethod
+    def _short_circuit(**_):
+        raise RuntimeError('No network in tests')
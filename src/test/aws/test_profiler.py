@@ -0,0 +1,127 @@
+import json
+import shutil
+import tempfile
+import unittest
+
+import botocore.session
+from botocore.stub import Stubber
+from mock import MagicMock
+
+from spacel.aws.profiler import ApiProfiler
+from test import ORBIT_REGION
+from test.aws.test_limiter import FakeClock
+
+SERVICE = 'cloudformation'
+KEY = (SERVICE, 'DescribeStacks', ORBIT_REGION)
+
+
+class TestApiProfiler(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.profiler = ApiProfiler(clock=self.clock)
+        self.model = MagicMock()
+        self.model.name = 'DescribeStacks'
+        self.after_call = self.profiler._after_call(SERVICE, ORBIT_REGION)
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def _call(self, seconds, status_code=200, retries=0):
+        context = {}
+        self.profiler._before_call(model=self.model, context=context)
+        self.clock.now += seconds
+        http_response = MagicMock(status_code=status_code)
+        self.after_call(http_response=http_response, context=context, parsed={
+            'ResponseMetadata': {'RetryAttempts': retries}
+        })
+
+    def test_install(self):
+        client = MagicMock()
+        self.profiler.install(client, SERVICE, ORBIT_REGION)
+        self.assertEquals(1, client.meta.events.register_first.call_count)
+        self.assertEquals(3, client.meta.events.register.call_count)
+
+    def test_after_call(self):
+        self._call(0.2)
+        self._call(3, status_code=400, retries=2)
+
+        stats = self.profiler.stats()[KEY]
+        self.assertEquals(2, stats['calls'])
+        self.assertEquals(1, stats['errors'])
+        self.assertEquals(2, stats['retries'])
+        self.assertAlmostEquals(3.2, stats['seconds'])
+        self.assertEquals(3, stats['max'])
+        self.assertEquals(1, stats['histogram'][2])
+        self.assertEquals(1, stats['histogram'][6])
+
+    def test_after_call_without_before(self):
+        self.after_call(context={})
+        self.assertEquals({}, self.profiler.stats())
+
+    def test_after_call_error(self):
+        context = {}
+        self.profiler._before_call(model=self.model, context=context)
+        self.profiler._after_call_error(SERVICE, ORBIT_REGION)(context=context)
+
+        self.assertEquals(1, self.profiler.stats()[KEY]['errors'])
+
+    def test_needs_retry_throttled(self):
+        needs_retry = self.profiler._needs_retry(SERVICE, ORBIT_REGION)
+        needs_retry(response=None, operation=self.model)
+        needs_retry(response=(None, {'Error': {'Code': 'Throttling'}}),
+                    operation=self.model)
+        needs_retry(response=(None, {}), operation=self.model)
+
+        self.assertEquals(1, self.profiler.stats()[KEY]['throttles'])
+
+    def test_summary(self):
+        for _ in range(9):
+            self._call(0.01)
+        self._call(20)
+        self.clock.now = 100
+
+        summary = self.profiler.summary()
+
+        self.assertEquals(100, summary['elapsed'])
+        self.assertAlmostEquals(20.09, summary['seconds'])
+        call = summary['calls'][0]
+        self.assertEquals(0.05, call['p50'])
+        self.assertEquals(0.05, call['p90'])
+        self.assertEquals({'0.05': 9, 'inf': 1}, call['histogram'])
+
+    def test_summary_percentile_capped(self):
+        self._call(12)
+
+        call = self.profiler.summary()['calls'][0]
+
+        self.assertEquals(12, call['p50'])
+
+    def test_log_summary(self):
+        self.profiler.log_summary()
+        self._call(0.2)
+        self.profiler.log_summary()
+
+    def test_write(self):
+        self._call(0.2)
+        profile_path = '%s/profile.json' % self.path
+
+        self.profiler.write(profile_path)
+
+        with open(profile_path) as profile_in:
+            profile = json.load(profile_in)
+        self.assertEquals('DescribeStacks', profile['calls'][0]['operation'])
+
+    def test_installed_hooks_fire(self):
+        self.profiler = ApiProfiler()
+        session = botocore.session.get_session()
+        client = session.create_client(SERVICE, ORBIT_REGION,
+                                       aws_access_key_id='test',
+                                       aws_secret_access_key='test')
+        self.profiler.install(client, SERVICE, ORBIT_REGION)
+
+        with Stubber(client) as stubber:
+            stubber.add_response('describe_stacks', {'Stacks': []})
+            client.describe_stacks()
+
+        self.assertEquals(1, self.profiler.stats()[KEY]['calls'])
@@ -0,0 +1,173 @@
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+import boto3
+import botocore.session
+from botocore.exceptions import ClientError
+from botocore.stub import Stubber
+from dateutil.tz import tzutc
+from mock import MagicMock
+
+from spacel.aws.clients import ClientCache
+from spacel.aws.replay import (ApiRecorder, ApiReplayer,
+                               MissingResponseError, _decode, _encode)
+from test import ORBIT_REGION
+
+SERVICE = 'cloudformation'
+STACK = 'test-stack'
+TIMESTAMP = datetime(2016, 1, 2, 3, 4, 5, 6000, tzinfo=tzutc())
+
+
+def _call(status, response, target=STACK, operation='DescribeStacks'):
+    return {
+        'service': SERVICE,
+        'region': ORBIT_REGION,
+        'operation': operation,
+        'target': target,
+        'status': status,
+        'response': _encode(response)
+    }
+
+
+def _status(status):
+    return {'Stacks': [{
+        'StackName': STACK,
+        'StackStatus': status,
+        'CreationTime': TIMESTAMP
+    }]}
+
+
+class TestReplay(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        session = botocore.session.get_session()
+        self.client = session.create_client(SERVICE, ORBIT_REGION,
+                                            aws_access_key_id='test',
+                                            aws_secret_access_key='test')
+        self.sleep = MagicMock()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def _replayer(self, calls, **kwargs):
+        replayer = ApiReplayer(calls, sleep=self.sleep, **kwargs)
+        replayer.install(self.client, SERVICE, ORBIT_REGION)
+        return replayer
+
+    def test_encode_decode(self):
+        value = {
+            'time': TIMESTAMP,
+            'naive': datetime(2016, 1, 2),
+            'blob': b'\x00\x01',
+            'list': ('a', 1, None, True),
+            'stream': object()
+        }
+
+        decoded = _decode(_encode(value))
+
+        self.assertEquals(TIMESTAMP, decoded['time'])
+        self.assertEquals(datetime(2016, 1, 2), decoded['naive'])
+        self.assertEquals(b'\x00\x01', decoded['blob'])
+        self.assertEquals(['a', 1, None, True], decoded['list'])
+        self.assertIsNone(decoded['stream'])
+
+    def test_write_binary(self):
+        recorder = ApiRecorder()
+        model = MagicMock()
+        model.name = 'GenerateDataKey'
+        http_response = MagicMock(status_code=200)
+        after_call = recorder._after_call('kms', ORBIT_REGION)
+        after_call(http_response=http_response, model=model, context={},
+                   parsed={'Plaintext': b'\xff\xfe\x00\x80',
+                           'CiphertextBlob': b'\x81topsecret'})
+        fixture_path = '%s/fixture.json' % self.path
+
+        recorder.write(fixture_path)
+
+        replayer = ApiReplayer.load(fixture_path)
+        response = _decode(
+            replayer._next(('kms', ORBIT_REGION, 'GenerateDataKey', None))[1])
+        self.assertEquals(b'\xff\xfe\x00\x80', response['Plaintext'])
+        self.assertEquals(b'\x81topsecret', response['CiphertextBlob'])
+
+    def test_record_replay(self):
+        recorder = ApiRecorder()
+        recorder.install(self.client, SERVICE, ORBIT_REGION)
+        with Stubber(self.client) as stubber:
+            stubber.add_response('describe_stacks',
+                                 _status('CREATE_IN_PROGRESS'),
+                                 {'StackName': STACK})
+            stubber.add_response('describe_stacks',
+                                 _status('CREATE_COMPLETE'),
+                                 {'StackName': STACK})
+            self.client.describe_stacks(StackName=STACK)
+            self.client.describe_stacks(StackName=STACK)
+        fixture_path = '%s/fixture.json' % self.path
+        recorder.write(fixture_path)
+        self.assertEquals(STACK, recorder.calls()[0]['target'])
+
+        session = botocore.session.get_session()
+        self.client = session.create_client(SERVICE, ORBIT_REGION,
+                                            aws_access_key_id='test',
+                                            aws_secret_access_key='test')
+        replayer = ApiReplayer.load(fixture_path, latency=0.5,
+                                    sleep=self.sleep)
+        replayer.install(self.client, SERVICE, ORBIT_REGION)
+
+        statuses = [self.client.describe_stacks(StackName=STACK)
+                    ['Stacks'][0] for _ in range(3)]
+
+        self.assertEquals(['CREATE_IN_PROGRESS', 'CREATE_COMPLETE',
+                           'CREATE_COMPLETE'],
+                          [stack['StackStatus'] for stack in statuses])
+        self.assertEquals(TIMESTAMP, statuses[0]['CreationTime'])
+        self.assertEquals(3, self.sleep.call_count)
+        self.sleep.assert_called_with(0.5)
+
+    def test_replay_by_target(self):
+        self._replayer([
+            _call(200, _status('CREATE_COMPLETE'), target='other-stack'),
+            _call(200, _status('UPDATE_COMPLETE'))
+        ])
+
+        stack = self.client.describe_stacks(StackName=STACK)['Stacks'][0]
+
+        self.assertEquals('UPDATE_COMPLETE', stack['StackStatus'])
+        self.sleep.assert_not_called()
+
+    def test_replay_error(self):
+        self._replayer([_call(400, {'Error': {
+            'Code': 'ValidationError',
+            'Message': 'Stack [test-stack] does not exist'
+        }})])
+
+        self.assertRaises(ClientError, self.client.describe_stacks,
+                          StackName=STACK)
+
+    def test_replay_latencies(self):
+        self._replayer([_call(200, _status('CREATE_COMPLETE'))], latency=1,
+                       latencies={'DescribeStacks': 2})
+
+        self.client.describe_stacks(StackName=STACK)
+
+        self.sleep.assert_called_once_with(2)
+
+    def test_replay_missing(self):
+        self._replayer([])
+
+        self.assertRaises(MissingResponseError, self.client.describe_stacks,
+                          StackName=STACK)
+
+    def test_replay_client_cache(self):
+        replayer = ApiReplayer([_call(200, _status('CREATE_COMPLETE'))],
+                               sleep=self.sleep)
+        session = boto3.Session(aws_access_key_id='test',
+                                aws_secret_access_key='test')
+        clients = ClientCache(session=session, hooks=(replayer,))
+
+        cf = clients.cloudformation(ORBIT_REGION)
+        stack = cf.describe_stacks(StackName=STACK)['Stacks'][0]
+
+        self.assertEquals('CREATE_COMPLETE', stack['StackStatus'])
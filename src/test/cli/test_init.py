@@ -0,0 +1,49 @@
+import subprocess
+import sys
+import unittest
+
+from click.testing import CliRunner
+
+from spacel.cli import cli, COMMANDS
+
+
+class TestLazyCommands(unittest.TestCase):
+    def setUp(self):
+        self.runner = CliRunner()
+
+    def test_list_commands(self):
+        self.assertEquals(['provision', 'secret'], cli.list_commands(None))
+
+    def test_get_command(self):
+        for cmd_name in COMMANDS:
+            command = cli.get_command(None, cmd_name)
+            self.assertEquals(cmd_name, command.name)
+
+    def test_help_matches_commands(self):
+        for cmd_name, (_, _, help_text) in COMMANDS.items():
+            command = cli.get_command(None, cmd_name)
+            self.assertEquals(command.short_help or command.help, help_text)
+
+    def test_get_command_not_found(self):
+        self.assertIsNone(cli.get_command(None, 'does-not-exist'))
+
+    def test_help(self):
+        result = self.runner.invoke(cli, ['--help'])
+        self.assertEquals(0, result.exit_code)
+        self.assertIn('Encrypt secrets.', result.output)
+
+    def test_help_lazy(self):
+        script = ('import sys; from spacel.cli import cli\n'
+                  'try:\n'
+                  '    cli(["--help"])\n'
+                  'except SystemExit:\n'
+                  '    pass\n'
+                  'loaded = [m for m in ("spacel.cli.provision", '
+                  '"spacel.provision", "boto3", "colorlog") '
+                  'if m in sys.modules]\n'
+                  'sys.stderr.write(",".join(loaded))\n')
+        process = subprocess.Popen([sys.executable, '-c', script],
+                                   stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE)
+        _, stderr = process.communicate()
+        self.assertEquals(b'', stderr)
@@ -1,5 +1,6 @@
 from mock import patch, MagicMock, ANY
 
+from spacel.aws.limiter import DEFAULT_RATE
 from spacel.cli.provision import provision_services
 from test import BaseSpaceAppTest, ORBIT_NAME, APP_NAME
 
@@ -46,4 +47,12 @@ class TestProvisionCommand(BaseSpaceAppTest):
         provision_services(ORBIT_NAME, APP_NAME, (), None, None, None, None,
                            None, None, None, None, 'CRITICAL', None, False)
         mock_provision.assert_called_once_with(ANY, None, None, None, None,
-                                               None, None, None, None, False)
+                                               None, None, None, None, False,
+                                               skip_orbit=False,
+                                               refresh_cache=False,
+                                               api_rate=DEFAULT_RATE,
+                                               api_burst=None,
+                                               trace_out=None,
+                                               api_profile=None,
+                                               api_record=None,
+                                               reuse_data_keys=False)
@@ -19,17 +19,20 @@ class TestCacheFactory(BaseDbTest):
 
     def test_add_caches_noop(self):
         del self.app_region.caches[CACHE_NAME]
-        self.cache_factory.add_caches(self.app_region, self.template)
+        self.cache_factory.add_caches(self.app_region, self.template,
+                                      self.user_data)
         self.assertEquals(1, len(self.resources))
 
     def test_add_caches_invalid_replicas(self):
         self.cache_params['replicas'] = 'meow'
 
-        self.cache_factory.add_caches(self.app_region, self.template)
+        self.cache_factory.add_caches(self.app_region, self.template,
+                                      self.user_data)
         self.assertEquals(1, len(self.resources))
 
     def test_add_caches(self):
-        self.cache_factory.add_caches(self.app_region, self.template)
+        self.cache_factory.add_caches(self.app_region, self.template,
+                                      self.user_data)
         self.assertEquals(4, len(self.resources))
 
         # UserData should be valid JSON, `caches` should reference
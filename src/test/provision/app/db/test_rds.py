@@ -1,12 +1,11 @@
-from botocore.exceptions import ClientError
 from mock import MagicMock, ANY
 
 from spacel.aws import ClientCache
 from spacel.provision.app.db.rds import RdsFactory
+from spacel.provision.app.stack_index import StackResourceIndex
 from spacel.security import EncryptedPayload, PasswordManager
 from test import ORBIT_REGION
 from test.provision.app.db import BaseDbTest
-from test.security import CLIENT_ERROR
 
 DB_NAME = 'test-db'
 OTHER_REGION = 'us-east-1'
@@ -37,29 +36,33 @@ class TestRdsFactory(BaseDbTest):
         ), lambda: 'test-password'
 
         self.clients = MagicMock(spec=ClientCache)
-        self.cloudformation = MagicMock()
-        self.clients.cloudformation.return_value = self.cloudformation
+        self.stacks = MagicMock(spec=StackResourceIndex)
         self.rds_factory = RdsFactory(self.clients, self.ingress,
-                                      self.password_manager)
+                                      self.password_manager,
+                                      stacks=self.stacks)
         self._multi_region()
 
     def test_add_rds_noop(self):
         self.app_region.databases = {}
-        self.rds_factory.add_rds(self.app_region, self.template)
+        self.rds_factory.add_rds(self.app_region, self.template,
+                                 self.user_data)
 
     def test_add_rds_invalid_version(self):
         self.db_params['type'] = 'oracle'
-        self.rds_factory.add_rds(self.app_region, self.template)
+        self.rds_factory.add_rds(self.app_region, self.template,
+                                 self.user_data)
         self.assertEquals(1, len(self.resources))
 
     def test_add_rds_invalid_port(self):
         self.db_params['port'] = 0
-        self.rds_factory.add_rds(self.app_region, self.template)
+        self.rds_factory.add_rds(self.app_region, self.template,
+                                 self.user_data)
         self.assertEquals(1, len(self.resources))
 
     def test_add_rds_storage_type(self):
         self.db_params['iops'] = 100
-        self.rds_factory.add_rds(self.app_region, self.template)
+        self.rds_factory.add_rds(self.app_region, self.template,
+                                 self.user_data)
         self.assertEquals(4, len(self.resources))
         db_properties = self.resources['Dbtestdb']['Properties']
         self.assertEquals(100, db_properties['Iops'])
@@ -67,7 +70,8 @@ class TestRdsFactory(BaseDbTest):
 
     def test_add_rds_encryption(self):
         self.db_params['encrypted'] = True
-        self.rds_factory.add_rds(self.app_region, self.template)
+        self.rds_factory.add_rds(self.app_region, self.template,
+                                 self.user_data)
         self.assertEquals(4, len(self.resources))
         db_properties = self.resources['Dbtestdb']['Properties']
         self.assertEquals('db.t2.large', db_properties['DBInstanceClass'])
@@ -76,7 +80,8 @@ class TestRdsFactory(BaseDbTest):
         self.db_params['global'] = OTHER_REGION
         self.rds_factory._rds_id = MagicMock(return_value=None)
 
-        self.rds_factory.add_rds(self.app_region, self.template)
+        self.rds_factory.add_rds(self.app_region, self.template,
+                                 self.user_data)
 
         # DB resource not added, no mention in user data:
         self.assertEquals(1, len(self.resources))
@@ -86,7 +91,8 @@ class TestRdsFactory(BaseDbTest):
         self.db_params['global'] = OTHER_REGION
         self.password_manager.get_password.return_value = None, None
 
-        self.rds_factory.add_rds(self.app_region, self.template)
+        self.rds_factory.add_rds(self.app_region, self.template,
+                                 self.user_data)
 
         # DB resource not added, no mention in user data:
         self.assertEquals(1, len(self.resources))
@@ -96,7 +102,8 @@ class TestRdsFactory(BaseDbTest):
         self.db_params['global'] = OTHER_REGION
         self.rds_factory._rds_id = MagicMock(return_value=RDS_ID)
 
-        self.rds_factory.add_rds(self.app_region, self.template)
+        self.rds_factory.add_rds(self.app_region, self.template,
+                                 self.user_data)
 
         # DB resource not added, IAM policy is:
         self.assertEquals(2, len(self.resources))
@@ -107,7 +114,8 @@ class TestRdsFactory(BaseDbTest):
     def test_add_rds_global_region(self):
         self.db_params['global'] = ORBIT_REGION
 
-        self.rds_factory.add_rds(self.app_region, self.template)
+        self.rds_factory.add_rds(self.app_region, self.template,
+                                 self.user_data)
 
         self.assertEquals(4, len(self.resources))
         # Password is saved to other regions:
@@ -121,12 +129,14 @@ class TestRdsFactory(BaseDbTest):
         self.db_params['global'] = ORBIT_REGION
         self.db_params['clients'] = []
 
-        self.rds_factory.add_rds(self.app_region, self.template)
+        self.rds_factory.add_rds(self.app_region, self.template,
+                                 self.user_data)
 
         self.assertIn(OTHER_REGION, self.db_params['clients'])
 
     def test_add_rds(self):
-        self.rds_factory.add_rds(self.app_region, self.template)
+        self.rds_factory.add_rds(self.app_region, self.template,
+                                 self.user_data)
         self.assertEquals(4, len(self.resources))
 
         # Resolve {'Ref':}s to a string:
@@ -144,23 +154,13 @@ class TestRdsFactory(BaseDbTest):
         self.assertEquals('db.t2.small', instance_type)
 
     def test_rds_id(self):
-        self.cloudformation.describe_stack_resource.return_value = {
-            'StackResourceDetail': {
-                'PhysicalResourceId': RDS_ID
-            }
-        }
+        self.stacks.resource.return_value = RDS_ID
         rds_id = self.rds_factory._rds_id(self.app, ORBIT_REGION, 'DbTestDb')
         self.assertEquals(RDS_ID, rds_id)
+        self.stacks.resource.assert_called_once_with(
+            ORBIT_REGION, self.app.full_name, 'DbTestDb')
 
     def test_rds_id_not_found(self):
-        self.cloudformation.describe_stack_resource.side_effect = ClientError({
-            'Error': {'Message': 'Stack does not exist'}},
-            'DescribeStackResource')
-
+        self.stacks.resource.return_value = None
         rds_id = self.rds_factory._rds_id(self.app, ORBIT_REGION, 'DbTestDb')
         self.assertIsNone(rds_id)
-
-    def test_rds_id_exception(self):
-        self.cloudformation.describe_stack_resource.side_effect = CLIENT_ERROR
-        self.assertRaises(ClientError, self.rds_factory._rds_id,
-                          self.app, ORBIT_REGION, 'DbTestDb')
@@ -1,5 +1,6 @@
 import json
 
+from spacel.provision.app.user_data import UserData
 from test import BaseSpaceAppTest
 from test.provision import normalize_cf
 
@@ -7,6 +8,7 @@ from test.provision import normalize_cf
 class BaseTemplateDecoratorTest(BaseSpaceAppTest):
     def setUp(self):
         super(BaseTemplateDecoratorTest, self).setUp()
+        self.user_data = UserData()
         self.user_data_params = []
         self.resources = {
             'Lc': {
@@ -28,6 +30,7 @@ class BaseTemplateDecoratorTest(BaseSpaceAppTest):
         }
 
     def _user_data(self):
+        self.user_data.render(self.resources)
         user_data_params = normalize_cf(self.user_data_params)
         user_data_text = ''.join(user_data_params)
         try:
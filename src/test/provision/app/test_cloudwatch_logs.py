@@ -28,14 +28,14 @@ class TestCloudWatchLogsDecorator(BaseTemplateDecoratorTest):
         self.base_resource = len(self.resources)
 
     def test_logs_noop(self):
-        self.cwl.logs(self.app_region, self.resources)
+        self.cwl.logs(self.app_region, self.resources, self.user_data)
         self.assertEquals(self.base_resource, len(self.resources))
 
     def test_logs_docker(self):
         self.app_region.logging['docker'] = {
             'retention': RETENTION
         }
-        self.cwl.logs(self.app_region, self.resources)
+        self.cwl.logs(self.app_region, self.resources, self.user_data)
 
         # LogGroup resource added:
         self.assertEquals(self.base_resource + 1, len(self.resources))
@@ -65,7 +65,7 @@ class TestCloudWatchLogsDecorator(BaseTemplateDecoratorTest):
                 }
             }
         }
-        self.cwl.logs(self.app_region, self.resources)
+        self.cwl.logs(self.app_region, self.resources, self.user_data)
 
         self.assertEquals(self.base_resource + 2, len(self.resources))
 
@@ -1,10 +1,10 @@
 import six
-from botocore.exceptions import ClientError
 from mock import MagicMock
 
 from spacel.aws import ClientCache
 from spacel.provision.app.ingress_resource import (IngressResourceFactory,
                                                    IP_BLOCK)
+from spacel.provision.app.stack_index import StackResourceIndex
 from test import BaseSpaceAppTest, ORBIT_REGION
 
 OTHER_REGION = 'us-east-1'
@@ -17,10 +17,9 @@ ELASTIC_IP = '1.1.1.1'
 class TestIngressResourceFactory(BaseSpaceAppTest):
     def setUp(self):
         super(TestIngressResourceFactory, self).setUp()
-        self.cloudformation = MagicMock()
-        self.clients = MagicMock(speck=ClientCache)
-        self.clients.cloudformation.return_value = self.cloudformation
-        self.ingress = IngressResourceFactory(self.clients)
+        self.clients = MagicMock(spec=ClientCache)
+        self.stacks = MagicMock(spec=StackResourceIndex)
+        self.ingress = IngressResourceFactory(self.clients, stacks=self.stacks)
         for az_index, az in enumerate(self.other_orbit_region.azs.values()):
             az.nat_eip = '{0}.{0}.{0}.{0}'.format(az_index)
         self._multi_region()
@@ -62,53 +61,29 @@ class TestIngressResourceFactory(BaseSpaceAppTest):
         self.assertEquals(0, len(resources))
 
     def test_app_sg(self):
-        self.cloudformation.describe_stack_resource.return_value = {
-            'StackResourceDetail': {
-                'PhysicalResourceId': SECURITY_GROUP
-            }
-        }
+        self.stacks.resource.return_value = SECURITY_GROUP
         sg = self.ingress._app_sg(self.orbit, ORBIT_REGION, 'test-app')
         self.assertEquals(SECURITY_GROUP, sg)
+        self.stacks.resource.assert_called_once_with(
+            ORBIT_REGION, '%s-test-app' % self.orbit.name, 'Sg')
 
     def test_app_sg_not_found(self):
-        self._describe_stack_resource_error('Stack does not exist')
+        self.stacks.resource.return_value = None
         sg = self.ingress._app_sg(self.orbit, ORBIT_REGION, 'test-app')
         self.assertIsNone(sg)
 
-    def test_app_sg_error(self):
-        self._describe_stack_resource_error('Kaboom')
-        self.assertRaises(ClientError, self.ingress._app_sg, self.orbit,
-                          ORBIT_REGION, 'test-app')
-
     def test_app_eips(self):
-        resource_list = [{
-            'StackResourceSummaries': [{
-                'LogicalResourceId': 'ElasticIp01',
-                'PhysicalResourceId': ELASTIC_IP
-            }]
-        }]
-        pages = MagicMock()
-        pages.paginate = MagicMock(return_value=resource_list)
-        self.cloudformation.get_paginator = MagicMock(return_value=pages)
-
+        self.stacks.resources.return_value = {
+            'ElasticIp02': '2.2.2.2',
+            'ElasticIp01': ELASTIC_IP,
+            'ElasticIp01Policy': 'policy',
+            'Sg': SECURITY_GROUP
+        }
         eips = self.ingress._app_eips(self.orbit_region, 'test-app')
-        self.assertIn(ELASTIC_IP, eips)
-
-    def test_app_eips_error(self):
-        self.cloudformation.get_paginator.side_effect = ClientError({
-            'Error': {
-                'Message': 'Kaboom'
-            }
-        }, 'GetPaginator')
-        self.assertRaises(ClientError, self.ingress._app_eips,
-                          self.orbit_region, 'test-app')
-
-    def test_app_eips_cloudformation_stack_does_not_exist(self):
-        self.cloudformation.get_paginator.side_effect = ClientError({
-            'Error': {
-                'Message': 'CloudFormation stack does not exist'
-            }
-        }, 'GetPaginator')
+        self.assertEquals([ELASTIC_IP, '2.2.2.2'], eips)
+
+    def test_app_eips_stack_does_not_exist(self):
+        self.stacks.resources.return_value = None
         eips = self.ingress._app_eips(self.orbit_region, 'test-app')
         self.assertEquals(0, len(eips))
 
@@ -143,13 +118,6 @@ class TestIngressResourceFactory(BaseSpaceAppTest):
         self.assertEquals(1, len(resources))
         return six.next(six.itervalues(resources))
 
-    def _describe_stack_resource_error(self, message):
-        self.cloudformation.describe_stack_resource.side_effect = ClientError({
-            'Error': {
-                'Message': message
-            }
-        }, 'CreateSubnet')
-
     def _availability(self, param, availability, allowed):
         resources = self._http_ingress(param, availability=availability)
         self.assertEquals(allowed and 1 or 0, len(resources))
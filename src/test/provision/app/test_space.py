@@ -6,7 +6,7 @@ from spacel.provision.app.space import SpaceElevatorAppFactory
 from spacel.provision.changesets import ChangeSetEstimator
 from spacel.provision.s3 import TemplateUploader
 from spacel.provision.template import AppTemplate
-from test import BaseSpaceAppTest
+from test import BaseSpaceAppTest, ORBIT_REGION
 
 OTHER_REGION = 'us-east-1'
 
@@ -62,3 +62,21 @@ class TestSpaceElevatorAppFactory(BaseSpaceAppTest):
 
         self.provisioner._stack.assert_not_called()
         self.assertEquals(1, self.provisioner._wait_for_updates.call_count)
+
+    def test_app_serial(self):
+        self.provisioner._max_workers = 1
+        self.provisioner._stack.return_value = 'update'
+        self.provisioner.app(self.app)
+
+        self.assertEquals(2, self.provisioner._stack.call_count)
+        self.provisioner._wait_for_updates.assert_called_once_with(
+            self.app.full_name, {
+                ORBIT_REGION: 'update',
+                OTHER_REGION: 'update'
+            })
+
+    def test_app_region_error(self):
+        self.provisioner._stack.side_effect = ValueError('Kaboom')
+
+        self.assertRaises(ValueError, self.provisioner.app, self.app)
+        self.provisioner._wait_for_updates.assert_not_called()
@@ -0,0 +1,76 @@
+import unittest
+
+from botocore.exceptions import ClientError
+from mock import MagicMock
+
+from spacel.aws import ClientCache
+from spacel.provision.app.stack_index import StackResourceIndex
+from test import ORBIT_REGION
+
+STACK_NAME = 'test-orbit-test-app'
+SECURITY_GROUP = 'sg-123456'
+ELASTIC_IP = '1.1.1.1'
+
+
+class TestStackResourceIndex(unittest.TestCase):
+    def setUp(self):
+        self.cloudformation = MagicMock()
+        self.list_resources = MagicMock()
+        self.list_resources.paginate.return_value = [{
+            'StackResourceSummaries': [
+                {'LogicalResourceId': 'Sg',
+                 'PhysicalResourceId': SECURITY_GROUP},
+                {'LogicalResourceId': 'ElasticIp01',
+                 'PhysicalResourceId': ELASTIC_IP}
+            ]
+        }]
+        self.cloudformation.get_paginator.return_value = self.list_resources
+        self.clients = MagicMock(spec=ClientCache)
+        self.clients.cloudformation.return_value = self.cloudformation
+        self.stacks = StackResourceIndex(self.clients)
+
+    def test_resource(self):
+        sg = self.stacks.resource(ORBIT_REGION, STACK_NAME, 'Sg')
+        self.assertEquals(SECURITY_GROUP, sg)
+        self.list_resources.paginate.assert_called_once_with(
+            StackName=STACK_NAME)
+
+    def test_resource_not_found(self):
+        sg = self.stacks.resource(ORBIT_REGION, STACK_NAME, 'Missing')
+        self.assertIsNone(sg)
+
+    def test_resource_stack_not_found(self):
+        self.list_resources.paginate.side_effect = self._not_found()
+        sg = self.stacks.resource(ORBIT_REGION, STACK_NAME, 'Sg')
+        self.assertIsNone(sg)
+
+    def test_resources_listed_once(self):
+        self.stacks.resource(ORBIT_REGION, STACK_NAME, 'Sg')
+        self.stacks.resource(ORBIT_REGION, STACK_NAME, 'ElasticIp01')
+        self.list_resources.paginate.assert_called_once_with(
+            StackName=STACK_NAME)
+
+    def test_resources_not_found_cached(self):
+        self.list_resources.paginate.side_effect = self._not_found()
+        self.stacks.resources(ORBIT_REGION, STACK_NAME)
+        resources = self.stacks.resources(ORBIT_REGION, STACK_NAME)
+        self.assertIsNone(resources)
+        self.assertEquals(1, self.list_resources.paginate.call_count)
+
+    def test_resources_per_region(self):
+        self.stacks.resources(ORBIT_REGION, STACK_NAME)
+        self.stacks.resources('us-east-1', STACK_NAME)
+        self.assertEquals(2, self.list_resources.paginate.call_count)
+
+    def test_resources_error(self):
+        self.list_resources.paginate.side_effect = self._error('Kaboom')
+        self.assertRaises(ClientError, self.stacks.resources, ORBIT_REGION,
+                          STACK_NAME)
+
+    def _not_found(self):
+        return self._error('Stack with id %s does not exist' % STACK_NAME)
+
+    @staticmethod
+    def _error(message):
+        return ClientError({'Error': {'Message': message}},
+                           'ListStackResources')
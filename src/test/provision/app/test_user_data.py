@@ -0,0 +1,85 @@
+from spacel.provision.app.user_data import UserData
+from spacel.security import EncryptedPayload
+from test.provision.app.test_base_decorator import BaseTemplateDecoratorTest
+
+PASSWORD = EncryptedPayload(b'iv', b'ciphertext', b'key', 'us-west-2',
+                            'utf-8')
+
+
+class TestUserData(BaseTemplateDecoratorTest):
+    def setUp(self):
+        super(TestUserData, self).setUp()
+        self.user_data_params += [
+            '{',
+            '"caches":{',
+            '},',
+            '"databases":{',
+            '},',
+            '"logging":{',
+            '"deploy":{}',
+            '}',
+            '}'
+        ]
+
+    def test_render_empty(self):
+        user_data = self._user_data()
+        self.assertEquals({'caches': {}, 'databases': {},
+                           'logging': {'deploy': {}}}, user_data)
+
+    def test_render(self):
+        self.user_data.add_eip({'Ref': 'ElasticIp01'})
+        self.user_data.add_eip({'Ref': 'ElasticIp02'})
+        self.user_data.add_cache('redis', {'Ref': 'CacheRedis'})
+        self.user_data.add_database('db', {'Ref': 'DbDb'}, PASSWORD,
+                                    'us-west-2')
+        self.user_data.add_log('docker', {'Ref': 'DockerLogGroup'})
+
+        user_data = self._user_data()
+
+        self.assertEquals(['ElasticIp02', 'ElasticIp01'], user_data['eips'])
+        self.assertEquals({'redis': 'CacheRedis'}, user_data['caches'])
+        self.assertEquals('DbDb', user_data['databases']['db']['name'])
+        self.assertEquals(PASSWORD.obj(),
+                          user_data['databases']['db']['password'])
+        self.assertEquals({'docker': {'group': 'DockerLogGroup'},
+                           'deploy': {}}, user_data['logging'])
+
+    def test_render_newest_first(self):
+        for index in range(3):
+            self.user_data.add_cache('cache%s' % index, 'id%s' % index)
+
+        self.user_data.render(self.resources)
+
+        caches = self.user_data_params[0]
+        self.assertLess(caches.index('cache2'), caches.index('cache0'))
+
+    def test_render_merges_strings(self):
+        for index in range(50):
+            self.user_data.add_cache('cache%s' % index,
+                                     {'Ref': 'Cache%s' % index})
+            self.user_data.add_database('db%s' % index, 'db%s' % index,
+                                        PASSWORD, 'us-west-2')
+
+        user_data = self._user_data()
+
+        self.assertEquals(50, len(user_data['caches']))
+        self.assertEquals(50, len(user_data['databases']))
+        # Only references split strings:
+        self.assertEquals(1 + 50 * 2, len(self.user_data_params))
+
+    def test_parameter_empty(self):
+        self.assertEquals('', UserData().parameter())
+
+    def test_parameter(self):
+        user_data = UserData()
+        user_data.systemd['test.service'] = {'body': 'meow'}
+        user_data.files['test.env'] = {'body': 'meow'}
+        user_data.volumes['data'] = {'size': 1}
+        user_data.stats = True
+
+        parameter = user_data.parameter()
+
+        self.assertEquals(',"systemd":{"test.service":{"body":"meow"}}'
+                          ',"files":{"test.env":{"body":"meow"}}'
+                          ',"volumes":{"data":{"size":1}}'
+                          ',"stats":true', parameter.replace(' ', ''))
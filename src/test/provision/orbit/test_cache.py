@@ -0,0 +1,137 @@
+import shutil
+import tempfile
+from datetime import datetime
+
+from botocore.exceptions import ClientError
+from mock import MagicMock
+
+from spacel.aws import ClientCache
+from spacel.cache import DiskCache
+from spacel.provision.orbit.cache import OrbitCache
+from test import BaseSpaceAppTest, ORBIT_REGION, ORBIT_REGION_AZS
+from test.provision.orbit import VPC_ID, IP_ADDRESS
+
+STACK_ID = 'arn:aws:cloudformation:us-west-2:1234567890:stack/test-orbit-vpc'
+SUBNET_ID = 'subnet-123456'
+
+
+class TestOrbitCache(BaseSpaceAppTest):
+    def setUp(self):
+        super(TestOrbitCache, self).setUp()
+        self.path = tempfile.mkdtemp()
+        self.cf = MagicMock()
+        self._vpc_stack(datetime(2016, 1, 1))
+        self.clients = MagicMock(spec=ClientCache)
+        self.clients.cloudformation.return_value = self.cf
+        self.orbit_cache = OrbitCache(self.clients,
+                                      cache=DiskCache('orbits',
+                                                      path=self.path))
+
+        self.orbit_region.vpc_id = VPC_ID
+        self.orbit_region.bastion_eips = [IP_ADDRESS]
+        for orbit_az in self.orbit_region.azs.values():
+            orbit_az.private_instance_subnet = SUBNET_ID
+            orbit_az.nat_eip = IP_ADDRESS
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_load_empty(self):
+        self.assertFalse(self.orbit_cache.load(self.orbit_region))
+        self.cf.describe_stacks.assert_not_called()
+
+    def test_save_load(self):
+        self.orbit_cache.save(self.orbit_region)
+        self.orbit_region.vpc_id = None
+        self.orbit_region.az_keys = []
+
+        loaded = self.orbit_cache.load(self.orbit_region)
+
+        self.assertTrue(loaded)
+        self.assertEquals(VPC_ID, self.orbit_region.vpc_id)
+        self.assertEquals([IP_ADDRESS], self.orbit_region.bastion_eips)
+        self.assertEquals(ORBIT_REGION_AZS, self.orbit_region.az_keys)
+        self.assertEquals([SUBNET_ID] * 3,
+                          self.orbit_region.private_instance_subnets)
+        orbit_az = self.orbit_region.azs[ORBIT_REGION_AZS[0]]
+        self.assertEquals(IP_ADDRESS, orbit_az.nat_eip)
+
+    def test_load_stack_updated(self):
+        self.orbit_cache.save(self.orbit_region)
+        self._vpc_stack(datetime(2016, 1, 1), datetime(2016, 2, 1))
+        self.orbit_region.vpc_id = None
+
+        loaded = self.orbit_cache.load(self.orbit_region)
+
+        self.assertFalse(loaded)
+        self.assertIsNone(self.orbit_region.vpc_id)
+
+    def test_load_bastion_updated(self):
+        self.orbit_cache.save(self.orbit_region)
+        self._bastion_stack(datetime(2016, 2, 1))
+
+        self.assertFalse(self.orbit_cache.load(self.orbit_region))
+
+    def test_load_bastion_created(self):
+        vpc_stack = self.cf.describe_stacks.return_value
+        self.cf.describe_stacks.side_effect = lambda StackName: (
+            StackName.endswith('-vpc') and vpc_stack or self._raise(
+                self._not_found()))
+        self.orbit_cache.save(self.orbit_region)
+        self.assertTrue(self.orbit_cache.load(self.orbit_region))
+
+        self.cf.describe_stacks.side_effect = None
+        self.assertFalse(self.orbit_cache.load(self.orbit_region))
+
+    def test_load_stack_deleted(self):
+        self.orbit_cache.save(self.orbit_region)
+        self.cf.describe_stacks.side_effect = self._not_found()
+
+        self.assertFalse(self.orbit_cache.load(self.orbit_region))
+
+    def test_save_stack_not_found(self):
+        self.cf.describe_stacks.side_effect = self._not_found()
+
+        self.orbit_cache.save(self.orbit_region)
+
+        self.cf.describe_stacks.side_effect = None
+        self.assertFalse(self.orbit_cache.load(self.orbit_region))
+
+    def test_version_error(self):
+        self.cf.describe_stacks.side_effect = ClientError(
+            {'Error': {'Code': 'AccessDenied', 'Message': 'Denied'}},
+            'DescribeStacks')
+
+        self.assertRaises(ClientError, self.orbit_cache.save,
+                          self.orbit_region)
+
+    def test_key(self):
+        key = OrbitCache._key(self.orbit_region)
+        self.assertEquals('test-orbit:%s' % ORBIT_REGION, key)
+
+    def _vpc_stack(self, created, updated=None):
+        stack = {'StackId': STACK_ID, 'CreationTime': created}
+        if updated:
+            stack['LastUpdatedTime'] = updated
+        self.cf.describe_stacks.return_value = {'Stacks': [stack]}
+
+    def _bastion_stack(self, created):
+        vpc_stack = self.cf.describe_stacks.return_value
+        bastion_stack = {'Stacks': [{
+            'StackId': STACK_ID.replace('-vpc', '-bastion'),
+            'CreationTime': created
+        }]}
+        self.cf.describe_stacks.return_value = None
+        self.cf.describe_stacks.side_effect = lambda StackName: (
+            StackName.endswith('-bastion') and bastion_stack or vpc_stack)
+
+    @staticmethod
+    def _raise(e):
+        raise e
+
+    @staticmethod
+    def _not_found():
+        return ClientError({'Error': {
+            'Code': 'ValidationError',
+            'Message': 'Stack with id test-orbit-vpc does not exist'
+        }}, 'DescribeStacks')
@@ -1,7 +1,9 @@
+from botocore.exceptions import ClientError
 from mock import MagicMock
 
+from spacel.provision.orbit.cache import OrbitCache
 from spacel.provision.orbit.provider import ProviderOrbitFactory
-from test import BaseSpaceAppTest, ORBIT_REGION
+from test import BaseSpaceAppTest, ORBIT_REGION, OTHER_REGION
 
 TEST_PROVIDER = 'test'
 
@@ -11,21 +13,77 @@ class TestProviderOrbitFactory(BaseSpaceAppTest):
         super(TestProviderOrbitFactory, self).setUp()
 
         self.provider = MagicMock()
+        self.orbit_cache = MagicMock(spec=OrbitCache)
         self.orbit_factory = ProviderOrbitFactory({
             TEST_PROVIDER: self.provider
-        })
+        }, orbit_cache=self.orbit_cache)
         self.orbit.regions[ORBIT_REGION].provider = TEST_PROVIDER
 
     def test_get_orbit(self):
-        self.orbit_factory.orbit(self.orbit)
+        completed = self.orbit_factory.orbit(self.orbit)
+        self.assertTrue(completed)
         self.provider.orbit.assert_called_once_with(self.orbit,
                                                     regions=[ORBIT_REGION])
 
     def test_get_orbit_provider_not_found(self):
         self.orbit.regions[ORBIT_REGION].provider = 'does-not-exist'
-        self.orbit_factory.orbit(self.orbit)
+        completed = self.orbit_factory.orbit(self.orbit)
+        self.assertTrue(completed)
+        self.provider.orbit.assert_not_called()
+
+    def test_get_orbit_concurrent_providers(self):
+        self._multi_region()
+        other_provider = MagicMock()
+        self.orbit_factory._providers['other'] = other_provider
+        self.orbit.regions[OTHER_REGION].provider = 'other'
+        self.provider.orbit.side_effect = ClientError(
+            {'Error': {'Message': 'Kaboom'}}, 'CreateChangeSet')
+
+        completed = self.orbit_factory.orbit(self.orbit)
+
+        self.assertFalse(completed)
+        self.provider.orbit.assert_called_once_with(self.orbit,
+                                                    regions=[ORBIT_REGION])
+        other_provider.orbit.assert_called_once_with(self.orbit,
+                                                     regions=[OTHER_REGION])
+
+    def test_get_orbit_provider_bug(self):
+        self.provider.orbit.side_effect = ValueError('Kaboom')
+
+        self.assertRaises(ValueError, self.orbit_factory.orbit, self.orbit)
+
+    def test_get_orbit_cached(self):
+        self.orbit.regions[ORBIT_REGION].provider = 'spacel'
+        self.orbit_factory._providers['spacel'] = self.provider
+        self.orbit_cache.load.return_value = True
+
+        completed = self.orbit_factory.orbit(self.orbit, cached=True)
+
+        self.assertTrue(completed)
+        self.orbit_cache.load.assert_called_once_with(
+            self.orbit.regions[ORBIT_REGION])
         self.provider.orbit.assert_not_called()
 
+    def test_get_orbit_cache_miss(self):
+        self.orbit.regions[ORBIT_REGION].provider = 'spacel'
+        self.orbit_factory._providers['spacel'] = self.provider
+        self.orbit_cache.load.return_value = False
+
+        self.orbit_factory.orbit(self.orbit, cached=True)
+
+        self.provider.orbit.assert_called_once_with(self.orbit,
+                                                    regions=[ORBIT_REGION])
+
+    def test_get_orbit_not_cached(self):
+        self.orbit.regions[ORBIT_REGION].provider = 'spacel'
+        self.orbit_factory._providers['spacel'] = self.provider
+
+        self.orbit_factory.orbit(self.orbit)
+
+        self.orbit_cache.load.assert_not_called()
+        self.provider.orbit.assert_called_once_with(self.orbit,
+                                                    regions=[ORBIT_REGION])
+
     def test_get(self):
         orbit_factory = ProviderOrbitFactory.get(None, None, None, None, None,
                                                  None)
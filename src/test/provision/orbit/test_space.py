@@ -1,7 +1,6 @@
-from botocore.exceptions import ClientError
 from mock import MagicMock
 
-from spacel.aws import ClientCache
+from spacel.aws import AvailabilityZones, ClientCache
 from spacel.provision.changesets import ChangeSetEstimator
 from spacel.provision.orbit.space import SpaceElevatorOrbitFactory
 from spacel.provision.s3 import TemplateUploader
@@ -26,15 +25,15 @@ class TestSpaceElevatorOrbitFactory(BaseSpaceAppTest):
         self.clients = MagicMock(spec=ClientCache)
         self.change_sets = MagicMock(spec=ChangeSetEstimator)
         self.templates = MagicMock(spec=TemplateUploader)
-        self.ec2 = MagicMock()
-        self.clients.ec2.return_value = self.ec2
+        self.azs = MagicMock(spec=AvailabilityZones)
 
         self.orbit_factory = SpaceElevatorOrbitFactory(self.clients,
                                                        self.change_sets,
                                                        self.templates,
                                                        self.vpc_template,
                                                        self.bastion_template,
-                                                       self.tables_template)
+                                                       self.tables_template,
+                                                       azs=self.azs)
 
     def test_get_orbit(self):
         self.orbit_region.bastion_eips.append(IP_ADDRESS)
@@ -46,6 +45,18 @@ class TestSpaceElevatorOrbitFactory(BaseSpaceAppTest):
 
         self.orbit_factory._azs.assert_called_once()
         self.assertEquals(3, self.orbit_factory._orbit_stack.call_count)
+        self.orbit_factory._orbit_stack.assert_any_call(
+            self.orbit, [ORBIT_REGION], 'bastion')
+
+    def test_get_orbit_saves_cache(self):
+        orbit_cache = MagicMock()
+        self.orbit_factory._orbit_cache = orbit_cache
+        self.orbit_factory._azs = MagicMock()
+        self.orbit_factory._orbit_stack = MagicMock()
+
+        self.orbit_factory.orbit(self.orbit, self.orbit.regions)
+
+        orbit_cache.save.assert_called_once_with(self.orbit_region)
 
     def test_orbit_stack_vpc_noop(self):
         self.orbit_factory._stack = MagicMock(return_value=None)
@@ -116,40 +127,22 @@ class TestSpaceElevatorOrbitFactory(BaseSpaceAppTest):
         self.orbit_factory._wait_for_updates.assert_not_called()
 
     def test_azs(self):
-        self._create_subnet_error(
-            'us-west-2zzz is invalid. Subnets can currently only be created in '
-            'the following availability zones: us-west-2a, us-west-2b')
+        self.azs.azs.return_value = ['us-west-2a', 'us-west-2b']
 
         self.orbit_factory._azs(self.orbit, self.orbit.regions)
 
-        self.clients.ec2.assert_called_once_with(ORBIT_REGION)
-        self.ec2.create_subnet.assert_called_once()
+        self.azs.azs.assert_called_once_with(ORBIT_REGION)
         self.assertEquals(['us-west-2a', 'us-west-2b'],
                           self.orbit_region.az_keys)
 
     def test_azs_skip(self):
         self.orbit_region.az_keys = []
-        self._create_subnet_error(
-            'us-west-2zzz is invalid. Subnets can currently only be created in '
-            'the following availability zones: us-west-2a, us-west-2b')
 
         self.orbit_factory._azs(self.orbit, ['eu-west-1'])
 
-        self.clients.ec2.assert_not_called()
+        self.azs.azs.assert_not_called()
         self.assertEquals([], self.orbit_region.az_keys)
 
-    def test_azs_error(self):
-        self._create_subnet_error('Kaboom')
-        self.assertRaises(ClientError, self.orbit_factory._azs, self.orbit,
-                          self.orbit.regions)
-
-    def _create_subnet_error(self, message):
-        self.ec2.create_subnet.side_effect = ClientError({
-            'Error': {
-                'Message': message
-            }
-        }, 'CreateSubnet')
-
     def test_orbit_from_vpc(self):
         outputs = {
             'PrivateInstanceSubnet01': 'subnet-000001',
@@ -213,3 +206,7 @@ class TestSpaceElevatorOrbitFactory(BaseSpaceAppTest):
         self.orbit_factory.delete_orbit(self.orbit)
 
         self.assertEquals(3, self.orbit_factory._delete_stack.call_count)
+        deleted = [c[0][0] for c in
+                   self.orbit_factory._delete_stack.call_args_list]
+        self.assertTrue(deleted.index('test-orbit-bastion') <
+                        deleted.index('test-orbit-vpc'))
@@ -3,6 +3,7 @@ from mock import MagicMock
 
 from spacel.aws import ClientCache
 from spacel.provision.s3.base import BaseUploader
+from spacel.provision.s3.index import UploadIndex
 
 REGION = 'us-east-1'
 
@@ -10,7 +11,8 @@ REGION = 'us-east-1'
 class TestBaseUploader(unittest.TestCase):
     def setUp(self):
         self.clients = MagicMock(spec=ClientCache)
-        self.base = BaseUploader(self.clients, REGION, '')
+        self.index = MagicMock(spec=UploadIndex)
+        self.base = BaseUploader(self.clients, REGION, '', index=self.index)
 
     def test_hash_helper(self):
         test_hash = self.base._hash('test')
@@ -19,4 +21,6 @@ class TestBaseUploader(unittest.TestCase):
     def test_upload_helper(self):
         path = 'foo/bf21a9e8fbc5a3846fb05b4fa0859e0917b2202f.template'
         self.base._upload(path, '')
-        self.clients.s3.assert_called_with(REGION)
+        self.clients.s3.assert_called_with(REGION, resource=False)
+        self.index.upload.assert_called_once_with(
+            self.clients.s3.return_value, '', path, '')
@@ -0,0 +1,67 @@
+import unittest
+
+from botocore.exceptions import ClientError
+from mock import MagicMock
+
+from spacel.cache import DiskCache
+from spacel.provision.s3.index import UploadIndex
+
+BUCKET = 'bucket'
+PATH = 'foo/bf21a9e8fbc5a3846fb05b4fa0859e0917b2202f.template'
+KEY = '%s/%s' % (BUCKET, PATH)
+BODY = '{}'
+NOT_FOUND = ClientError({'Error': {'Code': '404'}}, 'HeadObject')
+
+
+class TestUploadIndex(unittest.TestCase):
+    def setUp(self):
+        self.s3 = MagicMock()
+        self.s3.head_object.side_effect = NOT_FOUND
+        self.cache = MagicMock(spec=DiskCache)
+        self.cache.get.return_value = None
+        self.index = UploadIndex(cache=self.cache)
+
+    def test_upload(self):
+        uploaded = self.index.upload(self.s3, BUCKET, PATH, BODY)
+
+        self.assertTrue(uploaded)
+        self.s3.put_object.assert_called_once_with(Bucket=BUCKET, Key=PATH,
+                                                   Body=BODY)
+        self.cache.set.assert_called_once_with(KEY, True)
+        self.assertEqual(1, self.index.uploaded)
+        self.assertEqual(2, self.index.uploaded_bytes)
+
+    def test_upload_known_in_memory(self):
+        self.index.upload(self.s3, BUCKET, PATH, BODY)
+        uploaded = self.index.upload(self.s3, BUCKET, PATH, BODY)
+
+        self.assertFalse(uploaded)
+        self.s3.put_object.assert_called_once()
+        self.s3.head_object.assert_called_once()
+        self.cache.set.assert_called_once()
+        self.assertEqual(1, self.index.skipped)
+        self.assertEqual(2, self.index.skipped_bytes)
+
+    def test_upload_known_on_disk(self):
+        self.cache.get.return_value = True
+
+        uploaded = self.index.upload(self.s3, BUCKET, PATH, BODY)
+
+        self.assertFalse(uploaded)
+        self.cache.get.assert_called_once_with(KEY)
+        self.s3.head_object.assert_not_called()
+        self.s3.put_object.assert_not_called()
+
+    def test_upload_exists(self):
+        self.s3.head_object.side_effect = None
+
+        uploaded = self.index.upload(self.s3, BUCKET, PATH, BODY)
+
+        self.assertFalse(uploaded)
+        self.s3.put_object.assert_not_called()
+        self.cache.set.assert_called_once_with(KEY, True)
+
+    def test_log_stats(self):
+        self.index.log_stats()
+        self.index.upload(self.s3, BUCKET, PATH, BODY)
+        self.index.log_stats()
@@ -1,6 +1,11 @@
 from mock import MagicMock, ANY
 import unittest
+
+from botocore.exceptions import ClientError
+
 from spacel.aws import ClientCache
+from spacel.cache import DiskCache
+from spacel.provision.s3.index import UploadIndex
 from spacel.provision.s3.lambda_uploader import LambdaUploader
 
 BUCKET = 'bucket'
@@ -10,9 +15,15 @@ SAMPLE_SCRIPT = 'sns-to-slack.js'
 class TestLambdaUploader(unittest.TestCase):
     def setUp(self):
         self.s3 = MagicMock()
+        self.s3.head_object.side_effect = ClientError(
+            {'Error': {'Code': '404'}}, 'HeadObject')
         self.clients = MagicMock(spec=ClientCache)
         self.clients.s3.return_value = self.s3
-        self.lambda_uploader = LambdaUploader(self.clients, 'us-west-2', BUCKET)
+        self.cache = MagicMock(spec=DiskCache)
+        self.cache.get.return_value = None
+        self.index = UploadIndex(cache=self.cache)
+        self.lambda_uploader = LambdaUploader(self.clients, 'us-west-2', BUCKET,
+                                              index=self.index)
 
     def test_load_cache(self):
         self.lambda_uploader._load(SAMPLE_SCRIPT)
@@ -23,4 +34,17 @@ class TestLambdaUploader(unittest.TestCase):
             '__FOO__': 'bar'
         })
 
-        self.s3.Object.assert_called_with(BUCKET, ANY)
+        self.s3.put_object.assert_called_with(Bucket=BUCKET, Key=ANY,
+                                              Body=ANY)
+
+    def test_upload_zip_cache(self):
+        bucket, path = self.lambda_uploader.upload(SAMPLE_SCRIPT)
+        self.lambda_uploader.upload(SAMPLE_SCRIPT)
+
+        self.assertEqual(BUCKET, bucket)
+        self.s3.put_object.assert_called_once_with(Bucket=BUCKET, Key=path,
+                                                   Body=ANY)
+        zipped = self.lambda_uploader._zips.values()
+        self.assertEqual(1, len(zipped))
+        self.assertEqual(1, self.index.skipped)
+        self.assertEqual(len(list(zipped)[0]), self.index.skipped_bytes)
@@ -19,6 +19,17 @@ class TestBaseTemplateCache(unittest.TestCase):
         tables = self.cache.get('tables')
         self.assertIsNotNone(tables)
 
+    def test_get_copies(self):
+        tables = self.cache.get('tables')
+        tables['Resources'].clear()
+        tables['Injected'] = True
+
+        tables = self.cache.get('tables')
+
+        self.assertNotIn('Injected', tables)
+        self.assertTrue(tables['Resources'])
+        self.assertIsNot(tables, self.cache.get('tables'))
+
     def test_get_name_tag(self):
         name = self.cache._get_name_tag({
             'Tags': [
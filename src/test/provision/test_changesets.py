@@ -1,6 +1,9 @@
 import unittest
 
+from mock import MagicMock
+
 from spacel.provision.changesets import ChangeSetEstimator
+from spacel.provision.history import DurationHistory
 
 
 class TestChangeSetEstimator(unittest.TestCase):
@@ -30,3 +33,59 @@ class TestChangeSetEstimator(unittest.TestCase):
         self.changes[0]['ResourceChange']['ResourceType'] = 'AWS::IAM::NotReal'
         estimate = self._change_sets.estimate(self.changes)
         self.assertEquals(0, estimate)
+
+    def test_estimate_history(self):
+        history = MagicMock(spec=DurationHistory)
+        history.durations.return_value = [10, 20, 30, 40, 50, 60]
+        change_sets = ChangeSetEstimator(history=history)
+
+        estimate = change_sets.estimate(self.changes, region='us-east-1')
+
+        # Role "Add" costs 75, a prior worth two samples:
+        self.assertEquals(40, estimate)
+        history.durations.assert_called_once_with('AWS::IAM::Role', 'Add',
+                                                  'us-east-1')
+
+    def test_estimate_history_not_available(self):
+        self.changes[0]['ResourceChange']['ResourceType'] = 'AWS::IAM::NotReal'
+        history = MagicMock(spec=DurationHistory)
+        history.durations.return_value = [10]
+        change_sets = ChangeSetEstimator(history=history)
+
+        estimate = change_sets.estimate(self.changes)
+
+        self.assertEquals(10, estimate)
+
+    def test_observed(self):
+        history = MagicMock(spec=DurationHistory)
+        change_sets = ChangeSetEstimator(history=history)
+
+        change_sets.observed([])
+        self._change_sets.observed([])
+
+        history.record.assert_called_once_with([])
+
+    def test_estimate_template(self):
+        template = {'Resources': {'Role': {'Type': 'AWS::IAM::Role'}}}
+        for index in range(40):
+            alarm = 'Alarm%02d' % index
+            template['Resources'][alarm] = {
+                'Type': 'AWS::CloudWatch::Alarm',
+                'DependsOn': 'Role'
+            }
+            self.changes.append({'ResourceChange': {
+                'Action': 'Add',
+                'ResourceType': 'AWS::CloudWatch::Alarm',
+                'LogicalResourceId': alarm
+            }})
+        self.changes.append({'ResourceChange': {
+            'Action': 'Remove',
+            'ResourceType': 'AWS::SNS::Topic',
+            'LogicalResourceId': 'Topic'
+        }})
+
+        summed = self._change_sets.estimate(self.changes)
+        estimate = self._change_sets.estimate(self.changes, template=template)
+
+        self.assertEquals(75 + 40 * 15 + 15, summed)
+        self.assertEquals(75 + 15 + 15, estimate)
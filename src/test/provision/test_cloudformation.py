@@ -2,13 +2,17 @@ import unittest
 from datetime import datetime, timedelta
 
 from botocore.exceptions import ClientError
-from mock import MagicMock, ANY, patch
+from mock import MagicMock, ANY, call, patch
 
 from spacel.aws.clients import ClientCache
 from spacel.provision.changesets import ChangeSetEstimator
+from spacel.provision.fingerprint import TemplateFingerprints
 from spacel.provision.cloudformation import (BaseCloudFormationFactory,
-                                             NO_CHANGES, CF_STACK)
+                                             NO_CHANGES, CF_STACK,
+                                             MAX_STATE_RETRIES)
+from spacel.provision.polling import PollingScheduler
 from spacel.provision.s3.template_uploader import TemplateUploader
+from spacel.provision.trace import DeployTrace
 from test import ORBIT_REGION
 
 NAME = 'test-stack'
@@ -23,6 +27,11 @@ CLIENT_ERROR = ClientError({'Error': {
     'Message': 'Kaboom'
 }}, 'CreateChangeSet')
 
+THROTTLED = ClientError({'Error': {
+    'Code': 'Throttling',
+    'Message': 'Rate exceeded'
+}}, 'DescribeChangeSet')
+
 
 class TestBaseCloudFormationFactory(unittest.TestCase):
     def setUp(self):
@@ -32,10 +41,11 @@ class TestBaseCloudFormationFactory(unittest.TestCase):
         self.change_sets = MagicMock(spec=ChangeSetEstimator)
         self.templates = MagicMock(spec=TemplateUploader)
 
+        self.poller = PollingScheduler(initial=0.00001, maximum=0.00001)
         self.cf_factory = BaseCloudFormationFactory(self.clients,
                                                     self.change_sets,
                                                     self.templates,
-                                                    sleep_time=0.00001)
+                                                    poller=self.poller)
 
     def test_stack_not_found(self):
         not_found = ClientError({'Error': {
@@ -54,9 +64,9 @@ class TestBaseCloudFormationFactory(unittest.TestCase):
         )
         self.change_sets.estimate.assert_not_called()
 
-    @patch('spacel.provision.cloudformation.json')
-    def test_stack_not_found_template_url_used(self, mock_json):
-        mock_json.dumps = MagicMock(return_value='unicorns' * 64001)
+    @patch('spacel.provision.cloudformation.serialize')
+    def test_stack_not_found_template_url_used(self, mock_serialize):
+        mock_serialize.return_value = 'unicorns' * 64001
         self.cloudformation.create_change_set.side_effect = NOT_FOUND
 
         result = self.cf_factory._stack(NAME, ORBIT_REGION, TEMPLATE)
@@ -78,9 +88,9 @@ class TestBaseCloudFormationFactory(unittest.TestCase):
         self.assertIsNone(result)
         self.change_sets.estimate.assert_not_called()
 
-    @patch('spacel.provision.cloudformation.json')
-    def test_stack_no_changes_template_url_used(self, mock_json):
-        mock_json.dumps = MagicMock(return_value='unicorns' * 64001)
+    @patch('spacel.provision.cloudformation.serialize')
+    def test_stack_no_changes_template_url_used(self, mock_serialize):
+        mock_serialize.return_value = 'unicorns' * 64001
         self.cloudformation.describe_change_set.return_value = NO_CHANGE_SET
 
         result = self.cf_factory._stack(NAME, ORBIT_REGION, TEMPLATE)
@@ -96,6 +106,23 @@ class TestBaseCloudFormationFactory(unittest.TestCase):
             TemplateURL=ANY)
         self.templates.upload.assert_called_once()
 
+    def test_stack_minified_template_body_used(self):
+        template = {'Parameters': {'Foo': {
+            'Type': 'String',
+            'Description': 'unicorns' * 64001
+        }}}
+        self.cloudformation.describe_change_set.return_value = NO_CHANGE_SET
+
+        self.cf_factory._stack(NAME, ORBIT_REGION, template)
+
+        self.cloudformation.create_change_set.assert_called_with(
+            Capabilities=ANY,
+            ChangeSetName=ANY,
+            Parameters=ANY,
+            StackName=NAME,
+            TemplateBody=ANY)
+        self.templates.upload.assert_not_called()
+
     def test_stack_change_set_failed(self):
         self.cloudformation.describe_change_set.return_value = {
             'Status': 'FAILED',
@@ -115,9 +142,19 @@ class TestBaseCloudFormationFactory(unittest.TestCase):
 
         result = self.cf_factory._stack(NAME, ORBIT_REGION, TEMPLATE)
 
-        self.change_sets.estimate.assert_called_with(ANY)
+        self.change_sets.estimate.assert_called_with(ANY, region=ORBIT_REGION,
+                                                     template=TEMPLATE)
         self.assertEqual(result, 'update')
 
+    def test_stack_change_set_trace(self):
+        self.cf_factory._trace = MagicMock(spec=DeployTrace)
+        self.cloudformation.describe_change_set.return_value = NO_CHANGE_SET
+
+        self.cf_factory._stack(NAME, ORBIT_REGION, TEMPLATE)
+
+        self.cf_factory._trace.span.assert_called_once_with(
+            ORBIT_REGION, NAME, 'change set', 'phase', ANY, ANY, 'NO_CHANGES')
+
     def test_stack_create_in_progress(self):
         create_in_progress = ClientError({'Error': {
             'Message': self._in_progress('CREATE_IN_PROGRESS')
@@ -126,13 +163,15 @@ class TestBaseCloudFormationFactory(unittest.TestCase):
             create_in_progress,
             None
         ]
+        self.cloudformation.describe_stacks.return_value = self._status(
+            'CREATE_COMPLETE')
         self.cloudformation.describe_change_set.return_value = NO_CHANGE_SET
 
         result = self.cf_factory._stack(NAME, ORBIT_REGION, TEMPLATE)
 
         self.assertIsNone(result)
-        self.cloudformation.get_waiter.assert_called_with(
-            'stack_create_complete')
+        self.cloudformation.describe_stacks.assert_called_with(
+            StackName=NAME)
 
     def test_stack_update_in_progress(self):
         update_in_progress = ClientError({'Error': {
@@ -142,13 +181,16 @@ class TestBaseCloudFormationFactory(unittest.TestCase):
             update_in_progress,
             None
         ]
+        self.cloudformation.describe_stacks.side_effect = [
+            self._status('UPDATE_IN_PROGRESS'),
+            self._status('UPDATE_COMPLETE')
+        ]
         self.cloudformation.describe_change_set.return_value = NO_CHANGE_SET
 
         result = self.cf_factory._stack(NAME, ORBIT_REGION, TEMPLATE)
 
         self.assertIsNone(result)
-        self.cloudformation.get_waiter.assert_called_with(
-            'stack_update_complete')
+        self.assertEquals(2, self.cloudformation.describe_stacks.call_count)
 
     def test_stack_exception(self):
         self.cloudformation.create_change_set.side_effect = CLIENT_ERROR
@@ -165,13 +207,47 @@ class TestBaseCloudFormationFactory(unittest.TestCase):
             rollback_complete,
             None
         ]
+        self.cloudformation.describe_stacks.side_effect = NOT_FOUND
         self.cloudformation.describe_change_set.return_value = NO_CHANGE_SET
 
         result = self.cf_factory._stack(NAME, ORBIT_REGION, TEMPLATE)
 
         self.assertIsNone(result)
-        self.cloudformation.get_waiter.assert_called_with(
-            'stack_delete_complete')
+        self.cloudformation.delete_stack.assert_called_with(StackName=NAME)
+
+    def test_stack_update_rollback_failed(self):
+        self._stack_failed_state('UPDATE_ROLLBACK_FAILED')
+
+    def test_stack_create_failed(self):
+        self._stack_failed_state('CREATE_FAILED')
+
+    def test_stack_in_progress_retries(self):
+        update_in_progress = ClientError({'Error': {
+            'Message': self._in_progress('UPDATE_IN_PROGRESS')
+        }}, 'CreateChangeSet')
+        self.cloudformation.create_change_set.side_effect = update_in_progress
+        self.cloudformation.describe_stacks.return_value = self._status(
+            'UPDATE_COMPLETE')
+
+        result = self.cf_factory._stack(NAME, ORBIT_REGION, TEMPLATE)
+
+        self.assertEqual('failed', result)
+        self.assertEqual(MAX_STATE_RETRIES + 1,
+                         self.cloudformation.create_change_set.call_count)
+
+    def _stack_failed_state(self, state):
+        failed = ClientError({'Error': {
+            'Message': self._in_progress(state)
+        }}, 'CreateChangeSet')
+        self.cloudformation.create_change_set.side_effect = failed
+        self.cloudformation.describe_stacks.return_value = self._status(state)
+
+        result = self.cf_factory._stack(NAME, ORBIT_REGION, TEMPLATE)
+
+        self.assertEqual('failed', result)
+        self.cloudformation.create_change_set.assert_called_once_with(
+            StackName=NAME, ChangeSetName=ANY, Parameters=ANY,
+            Capabilities=ANY, TemplateBody=ANY)
 
     def test_stack_secret_param_generated(self):
         self.cloudformation.describe_change_set.side_effect = [
@@ -259,6 +335,7 @@ class TestBaseCloudFormationFactory(unittest.TestCase):
     def test_wait_for_updates_failed(self):
         self.cloudformation.describe_stack_events.return_value = {
             'StackEvents': [{
+                'EventId': '1',
                 'Timestamp': datetime.utcnow(),
                 'LogicalResourceId': NAME,
                 'ResourceType': CF_STACK,
@@ -268,7 +345,7 @@ class TestBaseCloudFormationFactory(unittest.TestCase):
 
         updated = self.cf_factory._wait_for_updates(NAME, {
             ORBIT_REGION: 'update'
-        }, poll_interval=0.001)
+        })
         self.assertFalse(updated)
 
         self.assertEquals(1,
@@ -288,39 +365,206 @@ class TestBaseCloudFormationFactory(unittest.TestCase):
                           {ORBIT_REGION: 'update'})
 
     def test_wait_for_updates(self):
+        now = datetime.utcnow()
+        in_progress = {'StackEvents': [{
+            'EventId': '2',
+            'Timestamp': now,
+            'LogicalResourceId': 'Eip',
+            'ResourceType': 'AWS::EC2::EIP',
+            'ResourceStatus': 'CREATE_IN_PROGRESS',
+            'ResourceStatusReason': 'Just because'
+        }, {
+            'EventId': '1',
+            'Timestamp': now - timedelta(seconds=10),
+            'LogicalResourceId': NAME,
+            'ResourceType': CF_STACK,
+            'ResourceStatus': 'CREATE_IN_PROGRESS'
+        }]}
+        complete = {'StackEvents': [{
+            'EventId': '4',
+            'Timestamp': now + timedelta(seconds=2),
+            'LogicalResourceId': NAME,
+            'ResourceType': CF_STACK,
+            'ResourceStatus': 'CREATE_COMPLETE'
+        }, {
+            'EventId': '3',
+            'Timestamp': now + timedelta(seconds=1),
+            'LogicalResourceId': 'Eip',
+            'ResourceType': 'AWS::EC2::EIP',
+            'ResourceStatus': 'CREATE_COMPLETE'
+        }] + in_progress['StackEvents']}
+        self.cloudformation.describe_stack_events.side_effect = [
+            in_progress,
+            in_progress,
+            complete
+        ]
+
+        updated = self.cf_factory._wait_for_updates(NAME, {
+            ORBIT_REGION: 'update'
+        })
+        self.assertTrue(updated)
+
+        self.assertEquals(3,
+                          self.cloudformation.describe_stack_events.call_count)
+        self.change_sets.observed.assert_called_once_with([
+            ('AWS::EC2::EIP', 'Add', ORBIT_REGION, 1.0)
+        ])
+
+    def test_wait_for_updates_trace(self):
+        self.cf_factory._trace = MagicMock(spec=DeployTrace)
+
+        self.test_wait_for_updates()
+
+        self.cf_factory._trace.span.assert_has_calls([
+            call(ORBIT_REGION, NAME, 'Eip', 'AWS::EC2::EIP', ANY, ANY,
+                 'CREATE_COMPLETE'),
+            call(ORBIT_REGION, NAME, 'wait', 'phase', ANY, ANY,
+                 'CREATE_COMPLETE')
+        ])
+
+    def test_wait_for_updates_trace_failed(self):
+        self.cf_factory._trace = MagicMock(spec=DeployTrace)
+        now = datetime.utcnow()
+        events = [{
+            'EventId': '3',
+            'Timestamp': now + timedelta(seconds=3),
+            'LogicalResourceId': NAME,
+            'ResourceType': CF_STACK,
+            'ResourceStatus': 'UPDATE_ROLLBACK_COMPLETE'
+        }, {
+            'EventId': '2',
+            'Timestamp': now + timedelta(seconds=2),
+            'LogicalResourceId': 'Eip',
+            'ResourceType': 'AWS::EC2::EIP',
+            'ResourceStatus': 'UPDATE_FAILED'
+        }, {
+            'EventId': '1',
+            'Timestamp': now,
+            'LogicalResourceId': 'Eip',
+            'ResourceType': 'AWS::EC2::EIP',
+            'ResourceStatus': 'UPDATE_IN_PROGRESS'
+        }]
         self.cloudformation.describe_stack_events.return_value = {
-            'StackEvents': [{
-                'Timestamp': datetime.utcnow() - timedelta(seconds=5),
-                'LogicalResourceId': NAME,
-                'ResourceType': CF_STACK,
-                'ResourceStatus': 'CREATE_IN_PROGRESS'
-            }, {
-                'Timestamp': datetime.utcnow(),
-                'LogicalResourceId': NAME,
-                'ResourceType': 'AWS::EC2::EIP',
-                'ResourceStatus': 'CREATE_IN_PROGRESS',
-                'ResourceStatusReason': 'Just because'
-            }, {
-                'Timestamp': datetime.utcnow(),
-                'LogicalResourceId': NAME,
-                'ResourceType': 'AWS::EC2::EIP',
-                'ResourceStatus': 'CREATE_COMPLETE'
-            }, {
+            'StackEvents': events
+        }
+
+        self.cf_factory._wait_for_updates(NAME, {ORBIT_REGION: 'update'})
+
+        self.cf_factory._trace.span.assert_any_call(
+            ORBIT_REGION, NAME, 'Eip', 'AWS::EC2::EIP', ANY, ANY,
+            'UPDATE_FAILED')
+        # Failures aren't learned from:
+        self.change_sets.observed.assert_called_once_with([])
+
+    def test_stack_change_set_throttled(self):
+        self.cloudformation.describe_change_set.side_effect = [
+            THROTTLED,
+            {'Status': 'CREATE_COMPLETE', 'Changes': []}
+        ]
+
+        result = self.cf_factory._stack(NAME, ORBIT_REGION, TEMPLATE)
+
+        self.assertEqual(result, 'update')
+        self.assertEquals(2,
+                          self.cloudformation.describe_change_set.call_count)
+
+    def test_wait_for_stack_throttled(self):
+        self.cloudformation.describe_stacks.side_effect = [
+            THROTTLED,
+            self._status('UPDATE_ROLLBACK_COMPLETE')
+        ]
+
+        status = self.cf_factory._wait_for_stack(self.cloudformation, NAME)
+
+        self.assertEquals('UPDATE_ROLLBACK_COMPLETE', status)
+
+    def test_wait_for_stack_error(self):
+        self.cloudformation.describe_stacks.side_effect = CLIENT_ERROR
+
+        self.assertRaises(ClientError, self.cf_factory._wait_for_stack,
+                          self.cloudformation, NAME)
+
+    def test_wait_for_updates_throttled(self):
+        self.cloudformation.describe_stack_events.side_effect = [
+            THROTTLED,
+            {'StackEvents': [{
+                'EventId': '1',
                 'Timestamp': datetime.utcnow(),
                 'LogicalResourceId': NAME,
                 'ResourceType': CF_STACK,
-                'ResourceStatus': 'CREATE_COMPLETE'
-            }]
-        }
+                'ResourceStatus': 'UPDATE_COMPLETE'
+            }]}
+        ]
 
         updated = self.cf_factory._wait_for_updates(NAME, {
             ORBIT_REGION: 'update'
-        }, poll_interval=0.001)
+        })
         self.assertTrue(updated)
 
-        self.assertEquals(3,
+        self.assertEquals(2,
                           self.cloudformation.describe_stack_events.call_count)
 
+    def test_stack_fingerprint_unchanged(self):
+        fingerprints = self._fingerprints()
+        fingerprints.unchanged.return_value = True
+
+        result = self.cf_factory._stack(NAME, ORBIT_REGION, TEMPLATE)
+
+        self.assertIsNone(result)
+        self.cloudformation.create_change_set.assert_not_called()
+        self.templates.upload.assert_not_called()
+
+    def test_stack_fingerprint_no_changes(self):
+        fingerprints = self._fingerprints()
+        self.cloudformation.describe_change_set.return_value = NO_CHANGE_SET
+
+        self.cf_factory._stack(NAME, ORBIT_REGION, TEMPLATE)
+
+        fingerprints.applied.assert_called_once_with(NAME, ORBIT_REGION,
+                                                     'NO_CHANGES', 'abc')
+
+    def test_stack_fingerprint_pending(self):
+        fingerprints = self._fingerprints()
+        self.cloudformation.describe_change_set.return_value = \
+            {'Status': 'CREATE_COMPLETE', 'Changes': []}
+
+        self.cf_factory._stack(NAME, ORBIT_REGION, TEMPLATE)
+
+        fingerprints.pending.assert_called_once_with(NAME, ORBIT_REGION, 'abc')
+
+    def test_wait_for_updates_fingerprint_applied(self):
+        fingerprints = self._fingerprints()
+        self.cloudformation.describe_stack_events.return_value = {
+            'StackEvents': [{
+                'EventId': '1',
+                'Timestamp': datetime.utcnow(),
+                'LogicalResourceId': NAME,
+                'ResourceType': CF_STACK,
+                'ResourceStatus': 'UPDATE_COMPLETE'
+            }]
+        }
+
+        self.cf_factory._wait_for_updates(NAME, {ORBIT_REGION: 'update'})
+
+        fingerprints.applied.assert_called_once_with(NAME, ORBIT_REGION,
+                                                     'UPDATE_COMPLETE')
+
+    def test_delete_stack_fingerprint_forgotten(self):
+        fingerprints = self._fingerprints()
+        self.cf_factory._delete_stack(NAME, ORBIT_REGION)
+        fingerprints.forget.assert_called_once_with(NAME, ORBIT_REGION)
+
+    def _fingerprints(self):
+        fingerprints = MagicMock(spec=TemplateFingerprints)
+        fingerprints.fingerprint.return_value = 'abc'
+        fingerprints.unchanged.return_value = False
+        self.cf_factory._fingerprints = fingerprints
+        return fingerprints
+
+    @staticmethod
+    def _status(status):
+        return {'Stacks': [{'StackStatus': status}]}
+
     @staticmethod
     def _in_progress(state):
         return 'test-stack is in %s state and can not be updated.' % state
@@ -0,0 +1,145 @@
+import threading
+import unittest
+
+from spacel.provision.dag import (StackGraph, critical_path,
+                                  template_dependencies)
+
+REGIONS = ('us-east-1', 'us-west-2')
+
+
+class TestStackGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = StackGraph({
+            'vpc': (),
+            'tables': (),
+            'bastion': ('vpc',)
+        })
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def _record(self, region, stack):
+        with self.lock:
+            self.calls.append((region, stack))
+        return stack
+
+    def test_run(self):
+        results = self.graph.run(REGIONS, self._record)
+
+        self.assertEquals(6, len(results))
+        self.assertEquals('bastion', results[('us-east-1', 'bastion')])
+        for region in REGIONS:
+            self.assertTrue(self.calls.index((region, 'vpc')) <
+                            self.calls.index((region, 'bastion')))
+
+    def test_run_region_isolated(self):
+        west_vpc = threading.Event()
+
+        def slow_west(region, stack):
+            if (region, stack) == ('us-west-2', 'vpc'):
+                # Blocks until us-east-1 has its bastion:
+                self.assertTrue(west_vpc.wait(5))
+            if (region, stack) == ('us-east-1', 'bastion'):
+                west_vpc.set()
+            return self._record(region, stack)
+
+        self.graph.run(REGIONS, slow_west)
+
+        self.assertTrue(self.calls.index(('us-east-1', 'bastion')) <
+                        self.calls.index(('us-west-2', 'vpc')))
+
+    def test_run_error_skips_dependents(self):
+        def vpc_error(region, stack):
+            if (region, stack) == ('us-east-1', 'vpc'):
+                raise ValueError('Kaboom')
+            return self._record(region, stack)
+
+        self.assertRaises(ValueError, self.graph.run, REGIONS, vpc_error)
+
+        self.assertNotIn(('us-east-1', 'bastion'), self.calls)
+        self.assertIn(('us-east-1', 'tables'), self.calls)
+        self.assertIn(('us-west-2', 'bastion'), self.calls)
+
+    def test_reverse(self):
+        self.graph.reverse().run(REGIONS, self._record)
+
+        for region in REGIONS:
+            self.assertTrue(self.calls.index((region, 'bastion')) <
+                            self.calls.index((region, 'vpc')))
+
+    def test_cycle(self):
+        self.assertRaises(ValueError, StackGraph, {
+            'a': ('b',),
+            'b': ('a',)
+        })
+
+
+TEMPLATE = {
+    'Parameters': {'VpcId': {'Type': 'String'}},
+    'Resources': {
+        'Role': {'Type': 'AWS::IAM::Role'},
+        'Sg': {
+            'Type': 'AWS::EC2::SecurityGroup',
+            'Properties': {'VpcId': {'Ref': 'VpcId'}}
+        },
+        'Policy': {
+            'Type': 'AWS::IAM::Policy',
+            'DependsOn': 'Role',
+            'Properties': {'Roles': [{'Ref': 'AWS::NoValue'}]}
+        },
+        'Lc': {
+            'Type': 'AWS::AutoScaling::LaunchConfiguration',
+            'DependsOn': ['Policy'],
+            'Properties': {
+                'SecurityGroups': [{'Fn::GetAtt': ['Sg', 'GroupId']}],
+                'IamInstanceProfile': {'Fn::GetAtt': 'Role.Arn'}
+            }
+        },
+        'Asg': {
+            'Type': 'AWS::AutoScaling::AutoScalingGroup',
+            'Properties': {'LaunchConfigurationName': {'Ref': 'Lc'}}
+        }
+    }
+}
+
+
+class TestCriticalPath(unittest.TestCase):
+    def setUp(self):
+        self.dependencies = template_dependencies(TEMPLATE)
+
+    def test_template_dependencies(self):
+        self.assertEquals({
+            'Role': set(),
+            'Sg': set(),
+            'Policy': {'Role'},
+            'Lc': {'Policy', 'Role', 'Sg'},
+            'Asg': {'Lc'}
+        }, self.dependencies)
+
+    def test_critical_path(self):
+        seconds, path = critical_path(self.dependencies, {
+            'Role': 75,
+            'Sg': 140,
+            'Policy': 120,
+            'Asg': 300
+        })
+
+        self.assertEquals(495, seconds)
+        self.assertEquals(['Role', 'Policy', 'Asg'], path)
+
+    def test_critical_path_parallel(self):
+        dependencies = dict(('Alarm%02d' % i, set()) for i in range(40))
+        costs = dict((alarm, 15) for alarm in dependencies)
+
+        seconds, path = critical_path(dependencies, costs)
+
+        self.assertEquals(15, seconds)
+        self.assertEquals(1, len(path))
+
+    def test_critical_path_empty(self):
+        self.assertEquals((0, []), critical_path(self.dependencies, {}))
+
+    def test_critical_path_cycle(self):
+        self.assertRaises(ValueError, critical_path, {
+            'a': ('b',),
+            'b': ('a',)
+        }, {'a': 1})
@@ -0,0 +1,74 @@
+import unittest
+from datetime import datetime, timedelta
+
+from mock import MagicMock
+
+from spacel.provision.events import StackEventCursor
+
+NAME = 'test-stack'
+NOW = datetime.utcnow()
+
+
+def stack_event(event_id, seconds_ago=0):
+    return {
+        'EventId': event_id,
+        'Timestamp': NOW - timedelta(seconds=seconds_ago)
+    }
+
+
+class TestStackEventCursor(unittest.TestCase):
+    def setUp(self):
+        self.cloudformation = MagicMock()
+        self.cursor = StackEventCursor(self.cloudformation, NAME)
+
+    def test_events_chronological(self):
+        self.cloudformation.describe_stack_events.return_value = {
+            'StackEvents': [stack_event('2'), stack_event('1', 1)]
+        }
+
+        events = list(self.cursor.events())
+
+        self.assertEquals(['1', '2'], [e['EventId'] for e in events])
+        self.assertEquals('2', self.cursor.last_event_id)
+
+    def test_events_since(self):
+        self.cursor = StackEventCursor(self.cloudformation, NAME,
+                                       since=NOW - timedelta(seconds=5))
+        self.cloudformation.describe_stack_events.return_value = {
+            'StackEvents': [stack_event('2'), stack_event('1', 10)],
+            'NextToken': 'more'
+        }
+
+        events = list(self.cursor.events())
+
+        self.assertEquals(['2'], [e['EventId'] for e in events])
+        self.cloudformation.describe_stack_events.assert_called_once_with(
+            StackName=NAME)
+
+    def test_events_pages_until_seen(self):
+        self.cursor.last_event_id = '1'
+        self.cloudformation.describe_stack_events.side_effect = [
+            {'StackEvents': [stack_event('4'), stack_event('3')],
+             'NextToken': 'page2'},
+            {'StackEvents': [stack_event('2'), stack_event('1')],
+             'NextToken': 'page3'}
+        ]
+
+        events = list(self.cursor.events())
+
+        self.assertEquals(['2', '3', '4'], [e['EventId'] for e in events])
+        self.assertEquals(2,
+                          self.cloudformation.describe_stack_events.call_count)
+        self.cloudformation.describe_stack_events.assert_called_with(
+            StackName=NAME, NextToken='page2')
+
+    def test_events_no_new(self):
+        self.cursor.last_event_id = '1'
+        self.cloudformation.describe_stack_events.return_value = {
+            'StackEvents': [stack_event('1')]
+        }
+
+        events = list(self.cursor.events())
+
+        self.assertEquals([], events)
+        self.assertEquals('1', self.cursor.last_event_id)
@@ -0,0 +1,149 @@
+import unittest
+from datetime import datetime
+
+from botocore.exceptions import ClientError
+from mock import MagicMock
+
+from spacel.aws import ClientCache
+from spacel.cache import DiskCache
+from spacel.provision.fingerprint import TemplateFingerprints
+from test import ORBIT_REGION
+
+NAME = 'test-stack'
+BODY = '{"Resources": {}}'
+ACCOUNT = '1234567890'
+KEY = '%s:%s:%s' % (ACCOUNT, ORBIT_REGION, NAME)
+STACK_ID = 'arn:aws:cloudformation:us-west-2:1234567890:stack/test-stack/1'
+UPDATED = datetime(2016, 1, 1)
+STACK = '%s@%s' % (STACK_ID, UPDATED.isoformat())
+
+
+class TestTemplateFingerprints(unittest.TestCase):
+    def setUp(self):
+        self.clients = MagicMock(spec=ClientCache)
+        self.clients.account.return_value = ACCOUNT
+        self.cf = MagicMock()
+        self._stack('UPDATE_COMPLETE')
+        self.clients.cloudformation.return_value = self.cf
+        self.cache = MagicMock(spec=DiskCache)
+        self.cache.get.return_value = None
+        self.fingerprints = TemplateFingerprints(self.clients,
+                                                 cache=self.cache)
+        self.fingerprint = self.fingerprints.fingerprint(BODY, {}, {})
+
+    def test_fingerprint_parameters(self):
+        with_params = self.fingerprints.fingerprint(BODY, {'Foo': 'bar'}, {})
+        self.assertNotEqual(self.fingerprint, with_params)
+
+    def test_fingerprint_secret_names(self):
+        secret_a = self.fingerprints.fingerprint(BODY, {}, {'Foo': lambda: 1})
+        secret_b = self.fingerprints.fingerprint(BODY, {}, {'Foo': lambda: 2})
+        self.assertEqual(secret_a, secret_b)
+        self.assertNotEqual(self.fingerprint, secret_a)
+
+    def test_unchanged_missing(self):
+        self.assertFalse(self.fingerprints.unchanged(NAME, ORBIT_REGION,
+                                                     self.fingerprint))
+        self.cache.get.assert_called_once_with(KEY)
+
+    def test_unchanged(self):
+        self._applied('UPDATE_COMPLETE')
+        self.assertTrue(self.fingerprints.unchanged(NAME, ORBIT_REGION,
+                                                    self.fingerprint))
+
+    def test_unchanged_stack_updated(self):
+        self._applied('UPDATE_COMPLETE')
+        self._stack('UPDATE_COMPLETE', updated=datetime(2016, 2, 1))
+        self.assertFalse(self.fingerprints.unchanged(NAME, ORBIT_REGION,
+                                                     self.fingerprint))
+
+    def test_unchanged_stack_replaced(self):
+        self._applied('UPDATE_COMPLETE')
+        self._stack('UPDATE_COMPLETE', stack_id=STACK_ID[:-1] + '2')
+        self.assertFalse(self.fingerprints.unchanged(NAME, ORBIT_REGION,
+                                                     self.fingerprint))
+
+    def test_unchanged_stack_rolled_back(self):
+        self._applied('UPDATE_COMPLETE')
+        self._stack('UPDATE_ROLLBACK_COMPLETE')
+        self.assertFalse(self.fingerprints.unchanged(NAME, ORBIT_REGION,
+                                                     self.fingerprint))
+
+    def test_unchanged_stack_deleted(self):
+        self._applied('UPDATE_COMPLETE')
+        self.cf.describe_stacks.side_effect = self._not_found()
+        self.assertFalse(self.fingerprints.unchanged(NAME, ORBIT_REGION,
+                                                     self.fingerprint))
+
+    def test_unchanged_no_stack_recorded(self):
+        self._applied('UPDATE_COMPLETE')
+        del self.cache.get.return_value['stack']
+        self.assertFalse(self.fingerprints.unchanged(NAME, ORBIT_REGION,
+                                                     self.fingerprint))
+        self.cf.describe_stacks.assert_not_called()
+
+    def test_unchanged_force(self):
+        self.fingerprints = TemplateFingerprints(self.clients,
+                                                 cache=self.cache, force=True)
+        self._applied('UPDATE_COMPLETE')
+        self.assertFalse(self.fingerprints.unchanged(NAME, ORBIT_REGION,
+                                                     self.fingerprint))
+
+    def test_unchanged_status(self):
+        self._applied('UPDATE_ROLLBACK_COMPLETE')
+        self.assertFalse(self.fingerprints.unchanged(NAME, ORBIT_REGION,
+                                                     self.fingerprint))
+
+    def test_applied_pending(self):
+        self.fingerprints.pending(NAME, ORBIT_REGION, self.fingerprint)
+        self.fingerprints.applied(NAME, ORBIT_REGION, 'CREATE_COMPLETE')
+        self.cache.set.assert_called_once_with(KEY, {
+            'fingerprint': self.fingerprint,
+            'status': 'CREATE_COMPLETE',
+            'stack': STACK
+        })
+        self.cf.describe_stacks.assert_called_once_with(StackName=NAME)
+
+    def test_applied_stack_deleted(self):
+        self.cf.describe_stacks.side_effect = self._not_found()
+        self.fingerprints.pending(NAME, ORBIT_REGION, self.fingerprint)
+        self.fingerprints.applied(NAME, ORBIT_REGION, 'CREATE_COMPLETE')
+        self.cache.set.assert_not_called()
+        self.cache.delete.assert_called_once_with(KEY)
+
+    def test_applied_not_pending(self):
+        self.fingerprints.applied(NAME, ORBIT_REGION, 'CREATE_COMPLETE')
+        self.cache.set.assert_not_called()
+
+    def test_applied_rollback(self):
+        self.fingerprints.pending(NAME, ORBIT_REGION, self.fingerprint)
+        self.fingerprints.applied(NAME, ORBIT_REGION,
+                                  'UPDATE_ROLLBACK_COMPLETE')
+        self.cache.set.assert_not_called()
+        self.cache.delete.assert_called_once_with(KEY)
+
+    def test_key_per_account(self):
+        self.fingerprints.forget(NAME, ORBIT_REGION)
+        self.clients.account.assert_called_once_with(ORBIT_REGION)
+        self.cache.delete.assert_called_once_with(KEY)
+
+    def _applied(self, status):
+        self.cache.get.return_value = {
+            'fingerprint': self.fingerprint,
+            'status': status,
+            'stack': STACK
+        }
+
+    def _stack(self, status, stack_id=STACK_ID, updated=UPDATED):
+        self.cf.describe_stacks.return_value = {'Stacks': [{
+            'StackId': stack_id,
+            'StackStatus': status,
+            'CreationTime': datetime(2015, 1, 1),
+            'LastUpdatedTime': updated
+        }]}
+
+    @staticmethod
+    def _not_found():
+        return ClientError({'Error': {
+            'Message': 'Stack with id test-stack does not exist'
+        }}, 'DescribeStacks')
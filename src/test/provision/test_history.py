@@ -0,0 +1,56 @@
+import unittest
+
+from mock import MagicMock
+
+from spacel.cache import DiskCache
+from spacel.provision.history import (DurationHistory, action, percentile)
+
+RESOURCE_TYPE = 'AWS::IAM::Role'
+REGION = 'us-east-1'
+
+
+class TestDurationHistory(unittest.TestCase):
+    def setUp(self):
+        self.entries = {}
+        self.cache = MagicMock(spec=DiskCache)
+        self.cache.get.side_effect = self.entries.get
+        self.cache.set_many.side_effect = self.entries.update
+        self.history = DurationHistory(cache=self.cache, max_samples=3)
+
+    def test_action(self):
+        self.assertEqual('Add', action('CREATE_IN_PROGRESS'))
+        self.assertEqual('Modify', action('UPDATE_COMPLETE'))
+        self.assertEqual('Remove', action('DELETE_COMPLETE'))
+        self.assertIsNone(action('ROLLBACK_IN_PROGRESS'))
+
+    def test_percentile(self):
+        samples = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+        self.assertEqual(5, percentile(samples, 50))
+        self.assertEqual(9, percentile(samples, 90))
+        self.assertEqual(1, percentile(samples, 0))
+        self.assertEqual(7, percentile([7], 90))
+
+    def test_durations_empty(self):
+        self.assertEqual([], self.history.durations(RESOURCE_TYPE, 'Add',
+                                                    REGION))
+
+    def test_record(self):
+        self.history.record([(RESOURCE_TYPE, 'Add', REGION, 10.04)])
+        self.history.record([])
+
+        self.assertEqual([10.0], self.history.durations(RESOURCE_TYPE, 'Add',
+                                                        REGION))
+        self.cache.set_many.assert_called_once()
+
+    def test_record_other_region(self):
+        self.history.record([(RESOURCE_TYPE, 'Add', 'us-west-2', 10)])
+
+        self.assertEqual([10], self.history.durations(RESOURCE_TYPE, 'Add',
+                                                      REGION))
+
+    def test_record_max_samples(self):
+        self.history.record([(RESOURCE_TYPE, 'Add', REGION, seconds)
+                             for seconds in range(5)])
+
+        self.assertEqual([2, 3, 4], self.history.durations(RESOURCE_TYPE,
+                                                           'Add', REGION))
@@ -0,0 +1,62 @@
+import unittest
+
+from botocore.exceptions import ClientError
+from mock import MagicMock
+
+from spacel.provision.polling import PollingScheduler, is_throttle
+
+
+class TestPollingScheduler(unittest.TestCase):
+    def setUp(self):
+        self.sleep = MagicMock()
+        self.poller = PollingScheduler(initial=1, maximum=30, factor=2,
+                                       jitter=0, sleep=self.sleep)
+
+    def test_backoff_exponential(self):
+        backoff = self.poller.backoff()
+        delays = [backoff.next_delay() for _ in range(7)]
+        self.assertEquals([1, 2, 4, 8, 16, 30, 30], delays)
+
+    def test_backoff_jitter(self):
+        self.poller.jitter = 0.5
+        backoff = self.poller.backoff()
+        for _ in range(100):
+            backoff.progress()
+            delay = backoff.next_delay()
+            self.assertTrue(0.5 <= delay <= 1.5)
+
+    def test_backoff_progress(self):
+        backoff = self.poller.backoff()
+        backoff.next_delay()
+        backoff.next_delay()
+        backoff.progress()
+        self.assertEquals(1, backoff.next_delay())
+
+    def test_backoff_expected_short(self):
+        backoff = self.poller.backoff(expected=15)
+        delays = [backoff.next_delay() for _ in range(3)]
+        self.assertEquals([1, 1.5, 1.5], delays)
+
+    def test_backoff_expected_long(self):
+        backoff = self.poller.backoff(expected=3000)
+        delays = [backoff.next_delay() for _ in range(7)]
+        self.assertEquals(30, delays[-1])
+
+    def test_backoff_throttled(self):
+        backoff = self.poller.backoff(expected=15)
+        backoff.throttled()
+        self.assertEquals(2, backoff.next_delay())
+        self.assertEquals(2, backoff.next_delay())
+
+    def test_backoff_sleep(self):
+        backoff = self.poller.backoff()
+        backoff.sleep()
+        self.sleep.assert_called_once_with(1)
+
+    def test_is_throttle(self):
+        throttled = ClientError({'Error': {'Code': 'Throttling'}}, 'Describe')
+        self.assertTrue(is_throttle(throttled))
+
+    def test_is_throttle_other(self):
+        kaboom = ClientError({'Error': {'Message': 'Kaboom'}}, 'Describe')
+        self.assertFalse(is_throttle(kaboom))
@@ -0,0 +1,102 @@
+import logging
+import unittest
+
+from spacel.provision.size import (MAX_DESCRIPTION, SizeReport, logger,
+                                   minify, serialize)
+
+DOCUMENT = {
+    'Statement': [{
+        'Effect': 'Allow',
+        'Action': 'kms:Decrypt',
+        'Resource': '*'
+    }]
+}
+
+
+def _policy(role, document=DOCUMENT):
+    return {
+        'DependsOn': role,
+        'Type': 'AWS::IAM::Policy',
+        'Properties': {
+            'PolicyName': 'Policy%s' % role,
+            'Roles': [{'Ref': role}],
+            'PolicyDocument': document
+        }
+    }
+
+
+class TestSize(unittest.TestCase):
+    def setUp(self):
+        self.template = {
+            'Parameters': {
+                'Short': {'Type': 'String', 'Description': 'Short.'},
+                'Long': {'Type': 'String', 'Description': 'x' * 100}
+            },
+            'Resources': {
+                'Sg': {
+                    'Type': 'AWS::EC2::SecurityGroup',
+                    'Properties': {'GroupDescription': 'x' * 100}
+                },
+                'APolicy': _policy('RoleA'),
+                'BPolicy': _policy('RoleB'),
+                'CPolicy': _policy('RoleC', {'Statement': []}),
+                'Waiter': {
+                    'Type': 'AWS::CloudFormation::WaitCondition',
+                    'DependsOn': ['APolicy', 'BPolicy'],
+                    'Properties': {'Handle': {'Ref': 'BPolicy'}}
+                }
+            },
+            'Outputs': {
+                'Long': {'Value': 'foo', 'Description': 'x' * 100}
+            }
+        }
+
+    def test_serialize(self):
+        self.assertEqual('{"a":[1,2],"b":"c"}',
+                         serialize({'b': 'c', 'a': [1, 2]}))
+
+    def test_minify_descriptions(self):
+        minified = minify(self.template)
+
+        params = minified['Parameters']
+        self.assertEqual('Short.', params['Short']['Description'])
+        self.assertEqual(MAX_DESCRIPTION, len(params['Long']['Description']))
+        self.assertEqual(MAX_DESCRIPTION,
+                         len(minified['Outputs']['Long']['Description']))
+        # Resources are never changed:
+        sg = minified['Resources']['Sg']['Properties']
+        self.assertEqual(100, len(sg['GroupDescription']))
+
+    def test_minify_resources_unchanged(self):
+        minified = minify(self.template)
+        self.assertEqual(serialize(self.template['Resources']),
+                         serialize(minified['Resources']))
+
+    def test_minify_copy(self):
+        before = serialize(self.template)
+        minify(self.template)
+        self.assertEqual(before, serialize(self.template))
+
+    def test_minify_smaller(self):
+        self.assertLess(len(serialize(minify(self.template))),
+                        len(serialize(self.template)))
+
+    def test_report_disabled(self):
+        report = SizeReport('test', self.template)
+        report.measure('test', self.template)
+        report.log()
+        self.assertEqual([], report.steps)
+
+    def test_report(self):
+        level = logger.level
+        logger.setLevel(logging.DEBUG)
+        try:
+            report = SizeReport('test', {})
+            report.measure('a', {'a': 1})
+            report.measure('b', {'a': 1})
+            report.log()
+        finally:
+            logger.setLevel(level)
+
+        self.assertEqual([('a', 5), ('b', 0)], report.steps)
+        self.assertEqual(7, report.size)
@@ -0,0 +1,85 @@
+import csv
+import json
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+from spacel.provision.trace import DeployTrace, timestamp
+
+REGION = 'us-east-1'
+STACK = 'test-stack'
+
+
+class TestDeployTrace(unittest.TestCase):
+    def setUp(self):
+        self.trace = DeployTrace()
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_timestamp(self):
+        self.assertEquals(1.5, timestamp(datetime(1970, 1, 1, 0, 0, 1,
+                                                  500000)))
+
+    def test_span(self):
+        self.trace.span(REGION, STACK, 'change set', 'phase', 100, 103)
+
+        events = self.trace.trace_events(self.trace._spans)['traceEvents']
+        self.assertEquals(3, len(events))
+        self.assertEquals('phase', events[2]['cat'])
+        self.assertEquals(3000000, events[2]['dur'])
+        self.assertEquals('test-stack/phases', events[1]['args']['name'])
+
+    def test_trace_events_empty(self):
+        self.assertEquals({'traceEvents': []}, self.trace.trace_events([]))
+
+    def test_trace_events(self):
+        self.trace.span(REGION, STACK, 'Role', 'AWS::IAM::Role', 10, 85,
+                        'CREATE_COMPLETE')
+        self.trace.span('us-west-2', STACK, 'Role', 'AWS::IAM::Role', 12, 80,
+                        'CREATE_COMPLETE')
+        self.trace.span(REGION, STACK, 'Sg', 'AWS::EC2::SecurityGroup', 11,
+                        20, 'CREATE_COMPLETE')
+
+        trace = self.trace.trace_events(sorted(self.trace._spans,
+                                               key=lambda s: s['start']))
+
+        spans = [e for e in trace['traceEvents'] if e['ph'] == 'X']
+        self.assertEquals(3, len(spans))
+        self.assertEquals(0, spans[0]['ts'])
+        self.assertEquals(75000000, spans[0]['dur'])
+        # Regions are processes, resources are threads:
+        self.assertEquals(spans[0]['pid'], spans[1]['pid'])
+        self.assertNotEquals(spans[0]['tid'], spans[1]['tid'])
+        self.assertNotEquals(spans[0]['pid'], spans[2]['pid'])
+
+    def test_write(self):
+        self.trace.span(REGION, STACK, 'Role', 'AWS::IAM::Role', 10, 85,
+                        'CREATE_COMPLETE')
+        trace_path = '%s/trace.json' % self.path
+
+        self.trace.write(trace_path)
+
+        with open(trace_path) as trace_in:
+            trace = json.load(trace_in)
+        self.assertEquals(3, len(trace['traceEvents']))
+        with open('%s/trace.csv' % self.path) as csv_in:
+            rows = list(csv.DictReader(csv_in))
+        self.assertEquals(1, len(rows))
+        self.assertEquals('Role', rows[0]['name'])
+        self.assertEquals('75', rows[0]['seconds'])
+
+    def test_write_csv_path(self):
+        self.trace.span(REGION, STACK, 'Role', 'AWS::IAM::Role', 10, 85,
+                        'CREATE_COMPLETE')
+        trace_path = '%s/trace.csv' % self.path
+
+        self.trace.write(trace_path)
+
+        with open(trace_path) as trace_in:
+            trace = json.load(trace_in)
+        self.assertEquals(3, len(trace['traceEvents']))
+        with open('%s/trace.csv.csv' % self.path) as csv_in:
+            self.assertEquals(1, len(list(csv.DictReader(csv_in))))
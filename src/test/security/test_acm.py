@@ -1,8 +1,10 @@
 from mock import MagicMock
+import threading
 import unittest
 
 from spacel.aws import ClientCache
-from spacel.security.acm import AcmCertificates
+from spacel.cache import DiskCache
+from spacel.security.acm import AcmCertificates, CertificateIndex
 from test import ORBIT_REGION
 
 TEST_EXAMPLE_COM = '111111'
@@ -24,21 +26,6 @@ class TestAcmCertificates(unittest.TestCase):
         self.clients = MagicMock(spec=ClientCache)
         self.acm_certs = AcmCertificates(self.clients)
 
-    def test_get_wildcards(self):
-        wildcards = self.acm_certs._get_wildcards('foo.bar.com')
-        self.assertEquals(['*.bar.com'], wildcards)
-
-    def test_get_wildcards_none(self):
-        wildcards = self.acm_certs._get_wildcards('bar.com')
-        self.assertEquals([], wildcards)
-
-    def test_get_wildcards_subdomains(self):
-        wildcards = self.acm_certs._get_wildcards('baz.foo.bar.com')
-        self.assertEquals([
-            '*.foo.bar.com',
-            '*.*.bar.com'
-        ], wildcards)
-
     def test_get_certificates(self):
         paginator = MagicMock()
 
@@ -68,6 +55,131 @@ class TestAcmCertificates(unittest.TestCase):
         # Both STAR_STAR and STAR_TEST will work, we want the most specific:
         self.assertEquals(cert, STAR_TEST_DOUBLE_COM)
 
+    def test_get_certificate_none(self):
+        self._mock_certs()
+        cert = self.acm_certs.get_certificate(ORBIT_REGION, 'example.com')
+        self.assertIsNone(cert)
+
+    def test_get_certificate_lists_once(self):
+        self._mock_certs()
+        self.acm_certs.get_certificate(ORBIT_REGION, 'test.example.com')
+        self.acm_certs.get_certificate(ORBIT_REGION, 'other.example.com')
+        self.acm_certs.get_certificate(ORBIT_REGION, 'missing.com')
+        self.acm_certs._get_certificates.assert_called_once_with(
+            self.clients.acm.return_value)
+
+    def test_get_certificate_per_region(self):
+        self._mock_certs()
+        self.acm_certs.get_certificate(ORBIT_REGION, 'test.example.com')
+        self.acm_certs.get_certificate('eu-west-1', 'test.example.com')
+        self.assertEquals(2, self.acm_certs._get_certificates.call_count)
+
+    def test_get_certificate_regions_concurrent(self):
+        listing = threading.Event()
+        listed = threading.Event()
+
+        def get_certificates(acm):
+            if not listing.is_set():
+                # First region blocks until the second region is listed:
+                listing.set()
+                self.assertTrue(listed.wait(5))
+            else:
+                listed.set()
+            return CERTIFICATE_LIST
+
+        self.acm_certs._get_certificates = MagicMock(
+            side_effect=get_certificates)
+        first = threading.Thread(target=self.acm_certs.get_certificate,
+                                 args=(ORBIT_REGION, 'test.example.com'))
+        first.start()
+        listing.wait(5)
+        cert = self.acm_certs.get_certificate('eu-west-1', 'test.example.com')
+        first.join()
+
+        self.assertEquals(TEST_EXAMPLE_COM, cert)
+        self.assertTrue(listed.is_set())
+
+    def test_get_certificate_disk_cache(self):
+        cache = self._disk_cache(CERTIFICATE_LIST)
+        self._mock_certs()
+
+        cert = self.acm_certs.get_certificate(ORBIT_REGION, 'test.example.com')
+        self.assertEquals(cert, TEST_EXAMPLE_COM)
+        self.acm_certs._get_certificates.assert_not_called()
+        cache.get.assert_called_once_with('123456789012:' + ORBIT_REGION)
+
+    def test_get_certificate_disk_cache_miss(self):
+        cache = self._disk_cache(None)
+        self._mock_certs()
+
+        cert = self.acm_certs.get_certificate(ORBIT_REGION, 'test.example.com')
+        self.assertEquals(cert, TEST_EXAMPLE_COM)
+        cache.set.assert_called_once_with('123456789012:' + ORBIT_REGION,
+                                          CERTIFICATE_LIST)
+
+    def test_get_certificate_disk_cache_stale(self):
+        self._disk_cache(CERTIFICATE_LIST[2:])
+        self._mock_certs()
+
+        # Not in the cached list, listed again:
+        cert = self.acm_certs.get_certificate(ORBIT_REGION, 'test.example.com')
+        self.assertEquals(cert, TEST_EXAMPLE_COM)
+        cert = self.acm_certs.get_certificate(ORBIT_REGION, 'missing.com')
+        self.assertIsNone(cert)
+        self.acm_certs._get_certificates.assert_called_once_with(
+            self.clients.acm.return_value)
+
+    def test_get_certificate_disk_cache_refresh(self):
+        cache = self._disk_cache(CERTIFICATE_LIST)
+        self.acm_certs._refresh = True
+        self._mock_certs()
+
+        self.acm_certs.get_certificate(ORBIT_REGION, 'test.example.com')
+        cache.get.assert_not_called()
+        self.acm_certs._get_certificates.assert_called_once_with(
+            self.clients.acm.return_value)
+
+    def _disk_cache(self, cached):
+        cache = MagicMock(spec=DiskCache)
+        cache.get.return_value = cached
+        self.clients.account.return_value = '123456789012'
+        self.acm_certs = AcmCertificates(self.clients, cache=cache)
+        return cache
+
     def _mock_certs(self):
         self.acm_certs._get_certificates = MagicMock(
             return_value=CERTIFICATE_LIST)
+
+
+class TestCertificateIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = CertificateIndex(CERTIFICATE_LIST)
+
+    def test_get_exact(self):
+        self.assertEquals(TEST_EXAMPLE_COM, self.index.get('test.example.com'))
+
+    def test_get_wildcard(self):
+        self.assertEquals(STAR_EXAMPLE_COM, self.index.get('foo.example.com'))
+
+    def test_get_wildcard_one_label(self):
+        self.assertIsNone(self.index.get('bar.foo.example.com'))
+
+    def test_get_wildcard_not_domain(self):
+        self.assertIsNone(self.index.get('example.com'))
+
+    def test_get_wildcard_fewest_stars(self):
+        self.assertEquals(STAR_TEST_DOUBLE_COM,
+                          self.index.get('foo.test.double.com'))
+        self.assertEquals(STAR_STAR_DOUBLE_COM,
+                          self.index.get('foo.bar.double.com'))
+
+    def test_get_first_listed(self):
+        index = CertificateIndex(CERTIFICATE_LIST + [
+            {'DomainName': 'test.example.com', 'CertificateArn': 'dupe'},
+            {'DomainName': '*.example.com', 'CertificateArn': 'dupe'}
+        ])
+        self.assertEquals(TEST_EXAMPLE_COM, index.get('test.example.com'))
+        self.assertEquals(STAR_EXAMPLE_COM, index.get('foo.example.com'))
+
+    def test_get_missing(self):
+        self.assertIsNone(self.index.get('test.example.org'))
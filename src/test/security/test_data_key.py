@@ -0,0 +1,54 @@
+import unittest
+
+from mock import MagicMock
+
+from spacel.security.data_key import DataKeyCache
+
+KEY = ('alias/test-orbit-test-app', 'us-west-2')
+DATA_KEY = {'Plaintext': b'0' * 32, 'CiphertextBlob': b'topsecret'}
+
+
+class TestDataKeyCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = MagicMock(return_value=0.0)
+        self.data_keys = DataKeyCache(max_messages=3, max_bytes=64,
+                                      max_age=60, clock=self.clock)
+
+    def test_get_missing(self):
+        self.assertIsNone(self.data_keys.get(KEY, 16))
+
+    def test_get(self):
+        self.data_keys.put(KEY, DATA_KEY, 16)
+        self.assertEquals(DATA_KEY, self.data_keys.get(KEY, 16))
+
+    def test_get_other_key(self):
+        self.data_keys.put(KEY, DATA_KEY, 16)
+        self.assertIsNone(self.data_keys.get(('alias/other', KEY[1]), 16))
+
+    def test_get_max_messages(self):
+        self.data_keys.put(KEY, DATA_KEY, 16)
+        self.assertEquals(DATA_KEY, self.data_keys.get(KEY, 16))
+        self.assertEquals(DATA_KEY, self.data_keys.get(KEY, 16))
+        self.assertIsNone(self.data_keys.get(KEY, 16))
+
+    def test_get_max_bytes(self):
+        self.data_keys.put(KEY, DATA_KEY, 32)
+        self.assertEquals(DATA_KEY, self.data_keys.get(KEY, 32))
+        self.assertIsNone(self.data_keys.get(KEY, 16))
+
+    def test_get_max_age(self):
+        self.data_keys.put(KEY, DATA_KEY, 16)
+        self.clock.return_value = 61.0
+        self.assertIsNone(self.data_keys.get(KEY, 16))
+
+    def test_get_discarded(self):
+        self.data_keys.put(KEY, DATA_KEY, 16)
+        self.clock.return_value = 61.0
+        self.data_keys.get(KEY, 16)
+        self.clock.return_value = 0.0
+        self.assertIsNone(self.data_keys.get(KEY, 16))
+
+    def test_clear(self):
+        self.data_keys.put(KEY, DATA_KEY, 16)
+        self.data_keys.clear()
+        self.assertIsNone(self.data_keys.get(KEY, 16))
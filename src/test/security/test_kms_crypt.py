@@ -2,6 +2,7 @@ import six
 from botocore.exceptions import ClientError
 from mock import MagicMock
 
+from spacel.security.data_key import DataKeyCache
 from spacel.security.kms_crypt import KmsCrypto
 from spacel.security.kms_key import KmsKeyFactory
 from test import ORBIT_REGION
@@ -62,6 +63,47 @@ class TestKmsCrypto(BaseKmsTest):
         self.assertRaises(ClientError, self.kms_crypt.encrypt, self.app_region,
                           'test')
 
+    def test_encrypt_reuse_data_key(self):
+        self._bytes_data_key()
+        self.kms_crypt = KmsCrypto(self.clients, self.kms_key,
+                                   data_keys=DataKeyCache())
+
+        first = self.kms_crypt.encrypt(self.app_region, six.b('first'))
+        second = self.kms_crypt.encrypt(self.app_region, six.b('second'))
+
+        self.assertEquals(1, self.kms.generate_data_key.call_count)
+        self.assertEquals(first.key, second.key)
+        self.assertNotEquals(first.iv, second.iv)
+        self.assertEquals(six.b('first'),
+                          self.kms_crypt.decrypt_payload(first))
+        self.assertEquals(six.b('second'),
+                          self.kms_crypt.decrypt_payload(second))
+
+    def test_encrypt_reuse_data_key_used_up(self):
+        self._bytes_data_key()
+        self.kms_crypt = KmsCrypto(self.clients, self.kms_key,
+                                   data_keys=DataKeyCache(max_messages=1))
+
+        self.kms_crypt.encrypt(self.app_region, six.b('first'))
+        self.kms_crypt.encrypt(self.app_region, six.b('second'))
+
+        self.assertEquals(2, self.kms.generate_data_key.call_count)
+
+    def test_encrypt_no_reuse(self):
+        self._bytes_data_key()
+
+        self.kms_crypt.encrypt(self.app_region, six.b('first'))
+        self.kms_crypt.encrypt(self.app_region, six.b('second'))
+
+        self.assertEquals(2, self.kms.generate_data_key.call_count)
+
+    def _bytes_data_key(self):
+        self.kms.generate_data_key.return_value = {
+            'Plaintext': b'0' * 32,
+            'CiphertextBlob': b'topsecret'
+        }
+        self.kms.decrypt.return_value = {'Plaintext': b'0' * 32}
+
     def _round_trip(self, data):
         item = self.kms_crypt.encrypt(self.app_region, data)
         self.assertEquals(ENCRYPTED_KEY, item.key)
@@ -31,8 +31,9 @@ class TestKmsKeyFactory(BaseKmsTest):
         self.kms.create_key.assert_not_called()
 
     def test_get_key_exists_disabled(self):
-        key_metadata = KEY_METADATA.copy()
-        key_metadata['KeyMetadata']['Enabled'] = False
+        key_metadata = {
+            'KeyMetadata': dict(KEY_METADATA['KeyMetadata'], Enabled=False)
+        }
         self.kms.describe_key.return_value = key_metadata
 
         key = self.kms_factory.get_key(self.app_region)
@@ -55,6 +56,55 @@ class TestKmsKeyFactory(BaseKmsTest):
         # Key is created:
         self.kms.create_key.assert_called_once_with()
 
+    def test_get_key_cached(self):
+        self.kms.describe_key.return_value = KEY_METADATA
+
+        self.kms_factory.get_key(self.app_region)
+        key = self.kms_factory.get_key(self.app_region)
+        self.assertEquals(KEY_ARN, key)
+
+        self.kms.describe_key.assert_called_once_with(KeyId=ALIAS)
+
+    def test_get_key_not_found_cached(self):
+        self._key_not_found()
+
+        self.kms_factory.get_key(self.app_region, create=False)
+        key = self.kms_factory.get_key(self.app_region, create=False)
+        self.assertIsNone(key)
+
+        self.kms.describe_key.assert_called_once_with(KeyId=ALIAS)
+
+    def test_get_key_not_found_created(self):
+        self._key_not_found()
+        self.kms.create_key.return_value = KEY_METADATA
+
+        self.kms_factory.get_key(self.app_region, create=False)
+        self.kms_factory.create_key(self.app_region)
+        key = self.kms_factory.get_key(self.app_region, create=False)
+        self.assertEquals(KEY_ARN, key)
+
+        self.kms.describe_key.assert_called_once_with(KeyId=ALIAS)
+
+    def test_prefetch(self):
+        self._multi_region()
+        self.kms.describe_key.return_value = KEY_METADATA
+
+        keys = self.kms_factory.prefetch(self.app.regions.values())
+        self.assertEquals(dict((region, KEY_ARN)
+                               for region in self.app.regions), keys)
+        self.kms_factory.get_key(self.app_region)
+
+        self.assertEquals(len(self.app.regions),
+                          self.kms.describe_key.call_count)
+
+    def test_prefetch_not_found(self):
+        self._key_not_found()
+
+        keys = self.kms_factory.prefetch([self.app_region])
+        self.assertEquals({self.app_region.region: None}, keys)
+
+        self.kms.create_key.assert_not_called()
+
     def test_get_key_exception(self):
         self.kms.describe_key.side_effect = CLIENT_ERROR
 
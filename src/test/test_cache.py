@@ -0,0 +1,92 @@
+import shutil
+import tempfile
+import unittest
+
+from mock import patch
+
+from spacel.cache import DiskCache, KeyedLocks, cache_dir
+
+KEY = 'some-key'
+
+
+class TestDiskCache(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.cache = DiskCache('test', path=self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_get_missing(self):
+        self.assertIsNone(self.cache.get(KEY))
+
+    def test_set_get(self):
+        self.cache.set(KEY, {'foo': 'bar'})
+        self.assertEquals({'foo': 'bar'}, self.cache.get(KEY))
+
+    def test_set_many(self):
+        self.cache.set_many({KEY: 'value', 'other': 'other-value'})
+        other_cache = DiskCache('test', path=self.path)
+        self.assertEquals('value', other_cache.get(KEY))
+        self.assertEquals('other-value', other_cache.get('other'))
+
+    def test_persisted(self):
+        self.cache.set(KEY, 'value')
+        other_cache = DiskCache('test', path=self.path)
+        self.assertEquals('value', other_cache.get(KEY))
+
+    def test_merges_other_writers(self):
+        other_cache = DiskCache('test', path=self.path)
+        self.cache.get(KEY)
+        other_cache.set('other', 'value')
+        self.cache.set(KEY, 'value')
+
+        self.assertEquals('value', self.cache.get('other'))
+
+    @patch('spacel.cache.time')
+    def test_ttl(self, mock_time):
+        mock_time.time.return_value = 1000
+        self.cache.set(KEY, 'value')
+        mock_time.time.return_value = 1100
+
+        self.assertEquals('value', self.cache.get(KEY, ttl=200))
+        self.assertIsNone(self.cache.get(KEY, ttl=50))
+
+    def test_delete(self):
+        self.cache.set(KEY, 'value')
+        self.cache.delete(KEY)
+        self.assertIsNone(self.cache.get(KEY))
+
+    def test_clear(self):
+        self.cache.set(KEY, 'value')
+        self.cache.clear()
+        self.assertIsNone(DiskCache('test', path=self.path).get(KEY))
+
+    def test_corrupt(self):
+        with open('%s/test.json' % self.path, 'w') as cache_out:
+            cache_out.write('{')
+        self.assertIsNone(self.cache.get(KEY))
+
+    def test_unwritable(self):
+        cache = DiskCache('test', path='/dev/null/spacel')
+        cache.set(KEY, 'value')
+        self.assertEquals('value', cache.get(KEY))
+
+    @patch.dict('os.environ', {'SPACEL_CACHE_DIR': '/tmp/spacel-test'})
+    def test_cache_dir(self):
+        self.assertEquals('/tmp/spacel-test', cache_dir())
+
+
+class TestKeyedLocks(unittest.TestCase):
+    def setUp(self):
+        self.locks = KeyedLocks()
+
+    def test_get_same_key(self):
+        self.assertIs(self.locks.get(KEY), self.locks.get(KEY))
+
+    def test_get_other_key(self):
+        with self.locks.get(KEY):
+            other = self.locks.get('other')
+            self.assertIsNot(self.locks.get(KEY), other)
+            self.assertTrue(other.acquire(False))
+            other.release()